@@ -0,0 +1,308 @@
+"""
+API 엔드포인트 벤치마크
+
+크기를 지정한 더미 데이터를 적재한 뒤 대시보드/거래 테이블/정산/로그인 API를 반복 호출해
+엔드포인트별 지연 시간(p50/p95/p99), 처리량, 요청당 SQL 실행 수를 JSON 기준값(baseline)으로 저장하고,
+두 기준값을 비교한다. (SQL 실행 수는 DEBUG 환경에서 붙는 X-DB-Query-Count 헤더 기준)
+
+사용법 (local_run_example.sh/test_example.sh의 환경 변수 설정 상태에서)
+    # 앱을 프로세스 안(TestClient)에서 호출, RUNNING_ENV=test면 스키마를 새로 만들고 적재
+    python -m app.benchmarks.benchmark_endpoints run --users 20 --months 6 --transactions-per-day 500 --output base.json
+    # 구동 중인 로컬 uvicorn 호출 (서버와 같은 DB 환경 변수, 이미 적재했다면 --no-seed)
+    python -m app.benchmarks.benchmark_endpoints run --url http://localhost:8000 --no-seed --output new.json
+    # 기준값 비교 (p95가 threshold% 이상 느려지거나 SQL 실행 수가 늘면 종료 코드 1)
+    python -m app.benchmarks.benchmark_endpoints compare base.json new.json --threshold 10
+"""
+from argparse import ArgumentParser
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from functools import partial
+import json
+import sys
+from time import perf_counter
+from typing import Callable, Optional
+
+from dateutil.relativedelta import relativedelta
+import requests
+
+from app.benchmarks.harness import measure, percentile, timed
+from app.common.consts import SUPERUSER_EMAIL, SUPERUSER_PW
+from app.utils.create_dummy_data import USER_EMAILS, DummyDataConfig
+from app.utils.date import get_now_datetime
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: str
+    params: dict = field(default_factory=dict)
+    json: Optional[dict] = None
+    authorized: bool = True
+
+
+def get_endpoints(start_date: date, end_date: date, user_id: int) -> list:
+    """
+    벤치마크 대상 API 목록 (정산 조회는 정산이 생성된 첫 달 기준)
+    """
+    year, month = str(start_date.year), f"{start_date.month:02}"
+    table_request = dict(start_date=start_date.isoformat(), end_date=end_date.isoformat(), limit=15)
+    return [
+        Endpoint("dashboard.summary", "GET", "/api/dashboard/summary"),
+        Endpoint("dashboard.current-month-revenue", "GET", "/api/dashboard/current-month-revenue"),
+        Endpoint("dashboard.current-day-revenue", "GET", "/api/dashboard/current-day-revenue"),
+        Endpoint("dashboard.current-month-transaction-count", "GET", "/api/dashboard/current-month-transaction-count"),
+        Endpoint("dashboard.current-day-transaction-count", "GET", "/api/dashboard/current-day-transaction-count"),
+        Endpoint("dashboard.monthly-revenue", "GET", "/api/dashboard/monthly-revenue/12"),
+        Endpoint("dashboard.monthly-member-revenue", "GET", "/api/dashboard/monthly-member-revenue"),
+        Endpoint(
+            "dashboard.current-month-member-revenue-rate", "GET", "/api/dashboard/current-month-member-revenue-rate"
+        ),
+        Endpoint(
+            "dashboard.current-month-invoice-company-rate", "GET", "/api/dashboard/current-month-invoice-company-rate"
+        ),
+        Endpoint("transaction.table", "POST", "/api/transaction/table", json=table_request),
+        Endpoint(
+            "transaction.table.cursor",
+            "POST",
+            "/api/transaction/table",
+            json=dict(table_request, pagination="cursor"),
+        ),
+        Endpoint("invoice.user", "GET", "/api/invoice/user", params=dict(user_id=user_id, year=year, month=month)),
+        Endpoint("invoice.company", "GET", "/api/invoice/company", params=dict(year=year, month=month)),
+        Endpoint(
+            "user.login",
+            "POST",
+            "/api/user/login",
+            json=dict(email=SUPERUSER_EMAIL, password=SUPERUSER_PW),
+            authorized=False,
+        ),
+    ]
+
+
+def measure_endpoint(
+    send: Callable, endpoint: Endpoint, headers: dict, count: int, warmup: int, concurrency: int
+) -> dict:
+    call = partial(
+        timed,
+        send,
+        endpoint.method,
+        endpoint.path,
+        params=endpoint.params or None,
+        json=endpoint.json,
+        headers=headers if endpoint.authorized else None,
+    )
+    elapsed, results = measure(call, count, warmup=warmup, concurrency=concurrency)
+
+    latencies = [result[0] * 1000 for result in results]
+    status_codes = Counter(response.status_code for _, response in results)
+    query_counts = [
+        int(response.headers["X-DB-Query-Count"]) for _, response in results if "X-DB-Query-Count" in response.headers
+    ]
+    return {
+        "count": count,
+        "errors": sum(n for code, n in status_codes.items() if code >= 400),
+        "status": {str(code): n for code, n in sorted(status_codes.items())},
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "sql_count": round(sum(query_counts) / len(query_counts), 2) if query_counts else None,
+        "sql_count_max": max(query_counts) if query_counts else None,
+    }
+
+
+def run(
+    url: Optional[str],
+    config: DummyDataConfig,
+    seed: bool,
+    count: int,
+    warmup: int,
+    concurrency: int,
+    only: Optional[list],
+    output: Optional[str],
+    cold_cache: bool = False,
+) -> dict:
+    # app.main을 import하면 현재 환경 변수 기준으로 DB가 초기화됨 (RUNNING_ENV=test면 스키마 재생성)
+    from app.database.conn import Base, db
+    from app.database.schema import Transaction, User
+    from app.main import app
+
+    dataset = None
+    if seed:
+        from app.utils.create_dummy_data import create_dummy_data
+
+        Base.metadata.create_all(db.engine)
+        started_at = perf_counter()
+        dataset = create_dummy_data(db, config)
+        print(f"seeded {dataset} ({perf_counter() - started_at:.1f}s)")
+
+    session = next(db.session())
+    driver = User.get(session=session, email=USER_EMAILS[0])
+    transaction_count = session.query(Transaction.id).count()
+    session.close()
+
+    if url:
+        http_session = requests.Session()
+
+        def send(method: str, path: str, **kwargs):
+            return http_session.request(method, f"{url}{path}", timeout=60, **kwargs)
+
+        target = url
+    else:
+        from fastapi.testclient import TestClient
+
+        client = TestClient(app)
+        target = "in-process"
+
+        if cold_cache:
+            from app.utils.dashboard_cache import dashboard_cache
+
+            # 매 요청 전에 대시보드 캐시를 비워 집계 쿼리 자체를 측정
+            def send(method: str, path: str, **kwargs):
+                dashboard_cache.clear()
+                return client.request(method, path, **kwargs)
+
+        else:
+            send = client.request
+
+    login = send("POST", "/api/user/login", json=dict(email=SUPERUSER_EMAIL, password=SUPERUSER_PW))
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    start_date = date.fromisoformat(f"{config.start_month}-01")
+    end_date = start_date + relativedelta(months=config.months) - relativedelta(days=1)
+    endpoints = get_endpoints(start_date, end_date, user_id=driver.id if driver else 1)
+    if only:
+        endpoints = [endpoint for endpoint in endpoints if any(name in endpoint.name for name in only)]
+
+    results = {}
+    for endpoint in endpoints:
+        results[endpoint.name] = measure_endpoint(send, endpoint, headers, count, warmup, concurrency)
+        summarize(endpoint.name, results[endpoint.name])
+
+    report = {
+        "created_at": get_now_datetime().isoformat(),
+        "target": target,
+        "count": count,
+        "warmup": warmup,
+        "concurrency": concurrency,
+        "cold_cache": cold_cache,
+        "dataset": {"config": asdict(config) if seed else None, "seeded": dataset, "transactions": transaction_count},
+        "endpoints": results,
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"saved {output}")
+    return report
+
+
+def summarize(name: str, result: dict) -> None:
+    sql_count = "-" if result["sql_count"] is None else f"{result['sql_count']:g}"
+    print(
+        f"{name:<46} p50={result['p50_ms']:8.1f}ms p95={result['p95_ms']:8.1f}ms p99={result['p99_ms']:8.1f}ms "
+        + f"rps={result['throughput_rps']:8.1f} sql={sql_count:>5} status={result['status']}"
+    )
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> bool:
+    """
+    기준값 비교 출력
+    :return: p95가 threshold% 이상 느려졌거나 SQL 실행 수가 늘어난 엔드포인트가 있으면 False
+    """
+    with open(base_path, encoding="utf-8") as file:
+        base = json.load(file)
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)
+
+    if base["dataset"]["transactions"] != new["dataset"]["transactions"]:
+        print(f"dataset differs: transactions {base['dataset']['transactions']} -> {new['dataset']['transactions']}")
+
+    def change(before, after) -> str:
+        if before is None or after is None:
+            return f"{'-':>18}"
+        rate = (after - before) / before * 100 if before else 0.0
+        return f"{before:>7g}->{after:<7g}{rate:+5.0f}%"
+
+    passed = True
+    print(f"{'endpoint':<46} {'p50(ms)':>18} {'p95(ms)':>18} {'p99(ms)':>18} {'rps':>18} {'sql':>18}")
+    for name, after in new["endpoints"].items():
+        before = base["endpoints"].get(name)
+        if before is None:
+            print(f"{name:<46} (new)")
+            continue
+
+        regressed = before["p95_ms"] and (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 >= threshold
+        more_queries = (
+            before["sql_count"] is not None
+            and after["sql_count"] is not None
+            and after["sql_count"] > before["sql_count"]
+        )
+        if regressed or more_queries:
+            passed = False
+        print(
+            f"{name:<46} {change(before['p50_ms'], after['p50_ms'])} {change(before['p95_ms'], after['p95_ms'])} "
+            + f"{change(before['p99_ms'], after['p99_ms'])} "
+            + f"{change(before['throughput_rps'], after['throughput_rps'])} "
+            + f"{change(before['sql_count'], after['sql_count'])}"
+            + (" REGRESSED" if regressed or more_queries else "")
+        )
+    return passed
+
+
+if __name__ == "__main__":
+    now = get_now_datetime()
+    default = DummyDataConfig()
+
+    parser = ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="벤치마크 실행")
+    run_parser.add_argument("--url", default=None, help="구동 중인 서버 주소 (생략하면 TestClient로 프로세스 안에서 호출)")
+    run_parser.add_argument("--no-seed", action="store_true", help="더미 데이터 적재 생략 (이미 적재된 DB 사용)")
+    run_parser.add_argument("--users", type=int, default=default.users)
+    run_parser.add_argument("--months", type=int, default=default.months)
+    run_parser.add_argument("--transactions-per-day", type=int, default=default.transactions_per_day)
+    run_parser.add_argument("--cancel-ratio", type=float, default=default.cancel_ratio)
+    run_parser.add_argument("--seed", type=int, default=default.seed)
+    run_parser.add_argument("--count", type=int, default=200, help="엔드포인트별 측정 요청 수")
+    run_parser.add_argument("--warmup", type=int, default=10, help="엔드포인트별 측정 전 요청 수")
+    run_parser.add_argument("--concurrency", type=int, default=1)
+    run_parser.add_argument("--cold-cache", action="store_true", help="요청마다 대시보드 캐시 비우기 (프로세스 안 호출만)")
+    run_parser.add_argument("--only", nargs="*", default=None, help="이름에 포함된 문자열로 대상 엔드포인트 필터")
+    run_parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+
+    compare_parser = subparsers.add_parser("compare", help="두 결과 JSON 비교")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="p95 회귀로 판단할 증가율(%%)")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        sys.exit(0 if compare(args.base, args.new, args.threshold) else 1)
+
+    if args.cold_cache and args.url:
+        parser.error("--cold-cache는 프로세스 안(TestClient) 호출에서만 사용할 수 있습니다.")
+
+    # 대시보드가 이번 달 기준이므로 데이터가 이번 달에 끝나도록 시작 연월을 맞춤
+    start_month = (now - relativedelta(months=args.months - 1)).strftime("%Y-%m")
+    run(
+        url=args.url.rstrip("/") if args.url else None,
+        config=DummyDataConfig(
+            users=args.users,
+            start_month=start_month,
+            months=args.months,
+            transactions_per_day=args.transactions_per_day,
+            cancel_ratio=args.cancel_ratio,
+            seed=args.seed,
+        ),
+        seed=not args.no_seed,
+        count=args.count,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        only=args.only,
+        output=args.output,
+        cold_cache=args.cold_cache,
+    )
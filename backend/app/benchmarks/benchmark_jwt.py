@@ -0,0 +1,44 @@
+"""
+JWT decode 마이크로 벤치마크
+
+같은 access token을 반복 decode할 때 검증 캐시 사용 여부에 따른 처리량과
+토큰 발급 시 사용하는 현재 시각 조회(timezone 매번 생성 vs 모듈 상수)를 비교한다.
+
+사용법 (local_run_example.sh의 환경 변수 설정 상태에서)
+    python -m app.benchmarks.benchmark_jwt --count 100000
+"""
+from argparse import ArgumentParser
+from datetime import datetime
+from functools import partial
+
+from pytz import timezone
+
+from app.benchmarks.harness import format_throughput, measure
+from app.utils.date import get_now_datetime
+from app.utils.jwt import auth_handler
+
+
+def report(name: str, func, count: int) -> None:
+    elapsed, _ = measure(func, count)
+    print(f"{name:<10} {format_throughput(count, elapsed)}")
+
+
+def run(count: int, tokens: int) -> None:
+    token_list = [auth_handler.encode_token(subject=str(user_id)) for user_id in range(1, tokens + 1)]
+
+    for token in token_list:
+        report("no-cache", partial(auth_handler.verify_token, token=token), count // tokens)
+    for token in token_list:
+        report("cache", partial(auth_handler.decode_token, token=token), count // tokens)
+
+    report("tz-lookup", lambda: datetime.now(timezone("Asia/Seoul")), count)
+    report("tz-const", get_now_datetime, count)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--tokens", type=int, default=1)
+    args = parser.parse_args()
+
+    run(count=args.count, tokens=args.tokens)
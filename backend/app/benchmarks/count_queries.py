@@ -0,0 +1,194 @@
+"""
+거래/정산 API SQL 실행 수 벤치마크
+
+더미 데이터를 적재한 뒤 거래, 정산 API를 한 번씩 호출하고 요청마다 실행된 SQL 수와
+그중 BaseMixin.get(User.get, Transaction.get 등 단건 조회)에서 실행된 SQL 수를 출력한다.
+(--output으로 저장한 두 결과를 --compare로 비교)
+
+사용법 (test_example.sh의 환경 변수 설정 상태에서, RUNNING_ENV=test면 스키마를 새로 만들고 적재)
+    python -m app.benchmarks.count_queries --output base.json
+    python -m app.benchmarks.count_queries --compare base.json
+"""
+from argparse import ArgumentParser
+from dataclasses import asdict
+from datetime import date
+import json
+from threading import local
+from typing import Callable, Optional
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import event
+
+from app.common.consts import SUPERUSER_EMAIL, SUPERUSER_PW
+from app.utils.create_dummy_data import USER_EMAILS, DummyDataConfig
+
+
+class QueryCounter:
+    """
+    engine에서 실행된 SQL 수 집계 (BaseMixin.get 안에서 실행된 SQL은 lookups로 따로 집계)
+    """
+
+    def __init__(self):
+        self._state = local()
+        self.statements = 0
+        self.lookups = 0
+        self.lookup_calls = 0
+
+    def reset(self) -> None:
+        self.statements = 0
+        self.lookups = 0
+        self.lookup_calls = 0
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements += 1
+        if getattr(self._state, "depth", 0):
+            self.lookups += 1
+
+    def wrap_get(self, get: Callable) -> classmethod:
+        counter = self
+
+        def counted_get(cls, *args, **kwargs):
+            counter.lookup_calls += 1
+            counter._state.depth = getattr(counter._state, "depth", 0) + 1
+            try:
+                return get(cls, *args, **kwargs)
+            finally:
+                counter._state.depth -= 1
+
+        return classmethod(counted_get)
+
+
+def run_scenario(
+    send: Callable, counter: QueryCounter, user_id: int, company_id: int, month: date, closed_month: date
+) -> dict:
+    """
+    거래 생성 -> 조회 -> 수정 -> 테이블 -> 삭제, 정산 추가 항목 생성 -> 조회 -> 수정 -> 삭제, 정산/월별 조회 순서로 호출
+    :param month: 정산 전인 달 (거래, 추가 항목 변경)
+    :param closed_month: 정산이 끝난 달 (정산 조회)
+    """
+    year, month_str = str(month.year), f"{month.month:02}"
+    results = {}
+
+    def call(name: str, method: str, path: str, **kwargs):
+        counter.reset()
+        response = send(method, path, **kwargs)
+        results[name] = {
+            "status": response.status_code,
+            "sql": counter.statements,
+            "lookup_sql": counter.lookups,
+            "lookup_calls": counter.lookup_calls,
+        }
+        return response
+
+    transaction = dict(
+        user_id=user_id,
+        insurance_company_id=company_id,
+        vehicle_id="12가3456",
+        vehicle_model="벤치마크",
+        date=month.isoformat(),
+        price=100000,
+        memo="벤치마크",
+    )
+    response = call("transaction.create", "POST", "/api/transaction", json=transaction)
+    transaction_id = response.json()["result"]["created_object_id"]
+    call("transaction.get", "GET", f"/api/transaction/{transaction_id}")
+    call("transaction.update", "PUT", f"/api/transaction/{transaction_id}", json=dict(canceled=True, cancel_fee=1000))
+    call("transaction.table", "POST", "/api/transaction/table", json=dict(start_date=month.isoformat(), limit=15))
+    call("transaction.delete", "DELETE", f"/api/transaction/{transaction_id}")
+    call("transaction.insurancecompany", "GET", "/api/transaction/insurancecompany")
+
+    extra = dict(user_id=user_id, year=year, month=month_str, name="벤치마크", price=1000)
+    response = call("invoice.user.extra.create", "POST", "/api/invoice/user/extra", json=extra)
+    extra_id = response.json()["result"]["created_object_id"]
+    params = dict(user_id=user_id, year=year, month=month_str)
+    call("invoice.user.extra.get", "GET", "/api/invoice/user/extra", params=params)
+    call("invoice.user.extra.update", "PUT", f"/api/invoice/user/extra/{extra_id}", json=dict(name="수정", price=2000))
+    call("invoice.user.extra.delete", "DELETE", f"/api/invoice/user/extra/{extra_id}")
+    year, month_str = str(closed_month.year), f"{closed_month.month:02}"
+    call("invoice.user", "GET", "/api/invoice/user", params=dict(user_id=user_id, year=year, month=month_str))
+    call("invoice.company", "GET", "/api/invoice/company", params=dict(year=year, month=month_str))
+    call("invoice.monthly.revenue", "GET", "/api/invoice/monthly/revenue", params=dict(year=year, month=month_str))
+    return results
+
+
+def run(config: DummyDataConfig, output: Optional[str], compare: Optional[str]) -> dict:
+    # app.main을 import하면 현재 환경 변수 기준으로 DB가 초기화됨 (RUNNING_ENV=test면 스키마 재생성)
+    from fastapi.testclient import TestClient
+
+    from app.database.conn import Base, db
+    from app.database.schema import BaseMixin, InsuranceCompany, User
+    from app.main import app
+    from app.utils.create_dummy_data import create_dummy_data
+
+    Base.metadata.create_all(db.engine)
+    create_dummy_data(db, config)
+
+    session = next(db.session())
+    user_id = User.get(session=session, email=USER_EMAILS[0]).id
+    company_id = session.query(InsuranceCompany.id).order_by(InsuranceCompany.id).first()[0]
+    session.close()
+
+    client = TestClient(app)
+    login = client.post("/api/user/login", json=dict(email=SUPERUSER_EMAIL, password=SUPERUSER_PW))
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    def send(method: str, path: str, **kwargs):
+        return client.request(method, path, headers=headers, **kwargs)
+
+    counter = QueryCounter()
+    original_get = BaseMixin.__dict__["get"].__func__
+    BaseMixin.get = counter.wrap_get(original_get)
+    event.listen(db.engine, "before_cursor_execute", counter.before_cursor_execute)
+    try:
+        # 더미 데이터는 마지막 달을 제외한 모든 달을 정산해 둠
+        closed_month = date.fromisoformat(f"{config.start_month}-01")
+        month = closed_month + relativedelta(months=config.months - 1)
+        results = run_scenario(send, counter, user_id, company_id, month, closed_month)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", counter.before_cursor_execute)
+        BaseMixin.get = classmethod(original_get)
+
+    base = None
+    if compare:
+        with open(compare, encoding="utf-8") as file:
+            base = json.load(file)["routes"]
+
+    print(f"{'route':<32} {'status':>6} {'sql':>10} {'lookup sql':>12} {'lookups':>8}")
+    for name, result in results.items():
+        before = base.get(name) if base else None
+        sql = f"{before['sql']}->{result['sql']}" if before else str(result["sql"])
+        lookup_sql = f"{before['lookup_sql']}->{result['lookup_sql']}" if before else str(result["lookup_sql"])
+        print(f"{name:<32} {result['status']:>6} {sql:>10} {lookup_sql:>12} {result['lookup_calls']:>8}")
+    total = {key: sum(result[key] for result in results.values()) for key in ("sql", "lookup_sql", "lookup_calls")}
+    print(f"{'total':<32} {'':>6} {total['sql']:>10} {total['lookup_sql']:>12} {total['lookup_calls']:>8}")
+
+    report = {"dataset": asdict(config), "routes": results, "total": total}
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"saved {output}")
+    return report
+
+
+if __name__ == "__main__":
+    default = DummyDataConfig()
+
+    parser = ArgumentParser()
+    parser.add_argument("--users", type=int, default=default.users)
+    parser.add_argument("--months", type=int, default=2)
+    parser.add_argument("--transactions-per-day", type=int, default=default.transactions_per_day)
+    parser.add_argument("--start-month", default=default.start_month)
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON 경로")
+    args = parser.parse_args()
+
+    run(
+        config=DummyDataConfig(
+            users=args.users,
+            start_month=args.start_month,
+            months=args.months,
+            transactions_per_day=args.transactions_per_day,
+        ),
+        output=args.output,
+        compare=args.compare,
+    )
@@ -0,0 +1,57 @@
+"""
+벤치마크 공통 측정/출력 도구
+
+app.benchmarks의 각 스크립트가 반복 호출, 지연 시간 백분위, 결과 한 줄 출력 형식을 같이 쓰도록 모아 둔다.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable
+
+
+def percentile(values: list, rate: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(rate / 100 * len(values)) - 1))
+    return values[index]
+
+
+def timed(func: Callable, *args, **kwargs) -> tuple:
+    """
+    함수 1회 호출
+    :return: (소요 시간(초), 반환값)
+    """
+    started_at = perf_counter()
+    result = func(*args, **kwargs)
+    return perf_counter() - started_at, result
+
+
+def measure(func: Callable, count: int, warmup: int = 0, concurrency: int = 1) -> tuple:
+    """
+    인자 없는 함수를 warmup번 호출한 뒤 count번 호출 (concurrency가 2 이상이면 스레드 풀에서 동시 호출)
+    호출별 지연 시간이 필요하면 func 안에서 timed로 감싼다. (마이크로 벤치마크는 호출마다 시각을 재지 않음)
+    :return: (측정 구간 전체 소요 시간(초), 반환값 목록)
+    """
+    for _ in range(warmup):
+        func()
+
+    started_at = perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda _: func(), range(count)))
+    else:
+        results = [func() for _ in range(count)]
+    return perf_counter() - started_at, results
+
+
+def format_percentiles(latencies_ms: list) -> str:
+    return (
+        f"p50={percentile(latencies_ms, 50):8.1f}ms p95={percentile(latencies_ms, 95):8.1f}ms "
+        + f"p99={percentile(latencies_ms, 99):8.1f}ms"
+    )
+
+
+def format_throughput(count: int, elapsed: float) -> str:
+    per_call_us = elapsed / count * 1e6 if count else 0.0
+    ops = count / elapsed if elapsed else 0.0
+    return f"n={count:<8} total={elapsed:8.3f}s per_call={per_call_us:8.2f}us ops={ops:12.0f}/s"
@@ -0,0 +1,83 @@
+"""
+로그인 부하 테스트
+
+로그인 요청을 몰아서 보내는 동안 대시보드 API를 동시에 호출해
+로그인 지연 시간과 대시보드 응답 시간(p50/p95/p99)을 함께 출력한다.
+
+사용법 (서버 구동 후, local_run_example.sh의 환경 변수 설정 상태에서)
+    python -m app.benchmarks.load_test_login --url http://localhost:8000 --logins 100 --dashboard 300
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Event
+from time import perf_counter
+
+import requests
+
+from app.benchmarks.harness import format_percentiles, measure, timed
+from app.common.consts import SUPERUSER_EMAIL, SUPERUSER_PW
+
+
+def summarize(name: str, results: list) -> None:
+    """
+    :param results: timed로 감싼 요청 결과 목록 [(소요 시간(초), 응답)]
+    """
+    latencies = [elapsed * 1000 for elapsed, _ in results]
+    status_codes = [response.status_code for _, response in results]
+    status_summary = {code: status_codes.count(code) for code in sorted(set(status_codes))}
+    print(f"{name:<10} n={len(latencies):<5} {format_percentiles(latencies)} status={status_summary}")
+
+
+def run(url: str, email: str, password: str, logins: int, dashboard_calls: int, concurrency: int) -> None:
+    access_token = requests.post(f"{url}/api/user/login", json=dict(email=email, password=password)).json()[
+        "access_token"
+    ]
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    login_done = Event()
+    login_results = []
+    dashboard_results = []
+
+    login_request = partial(
+        timed, requests.post, f"{url}/api/user/login", json=dict(email=email, password=password), timeout=60
+    )
+    dashboard_request = partial(timed, requests.get, f"{url}/api/dashboard/summary", headers=headers, timeout=60)
+
+    def login_burst():
+        login_results.extend(measure(login_request, logins, concurrency=concurrency)[1])
+        login_done.set()
+
+    def dashboard_calls_during_burst():
+        dashboard_results.extend(measure(dashboard_request, dashboard_calls, concurrency=concurrency)[1])
+
+    started_at = perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(login_burst)
+        executor.submit(dashboard_calls_during_burst).result()
+    login_done.wait()
+    elapsed = perf_counter() - started_at
+
+    print(f"elapsed={elapsed:.2f}s concurrency={concurrency}")
+    summarize("login", login_results)
+    summarize("dashboard", dashboard_results)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default=SUPERUSER_EMAIL)
+    parser.add_argument("--password", default=SUPERUSER_PW)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--dashboard", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    run(
+        url=args.url.rstrip("/"),
+        email=args.email,
+        password=args.password,
+        logins=args.logins,
+        dashboard_calls=args.dashboard,
+        concurrency=args.concurrency,
+    )
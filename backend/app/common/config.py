@@ -22,27 +22,62 @@ class Config:
         f"mysql+pymysql://root:{quote(environ.get('MYSQL_ROOT_PASSWORD'))}@{environ.get('MYSQL_HOST')}:"
         + f"{environ.get('MYSQL_PORT')}/{environ.get('MYSQL_DATABASE')}?charset=utf8mb4"
     )
+    DB_READ_URL: Optional[str] = environ.get("DB_READ_URL")
     DB_ECHO: bool = False
     DB_POOL_RECYCLE: int = 900
     DB_POOL_SIZE: int = 30
     DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECTION_BUDGET: Optional[int] = None
+    DB_WORKER_COUNT: Optional[int] = None
+    DB_ASYNC: bool = False
+    DB_ASYNC_URL: Optional[str] = None
+    DB_SCHEMA_SUFFIX: Optional[str] = None
+    QUERY_METRICS_PATH: Optional[str] = "/metrics"
+    QUERY_METRICS_SLOW_QUERY_MS: Optional[int] = 500
+    PERMISSION_CACHE_TTL: int = 30
+    PERMISSION_CACHE_SIZE: int = 1024
+    DASHBOARD_CACHE_TTL: int = 60
+    DASHBOARD_CACHE_SIZE: int = 256
+    DASHBOARD_CACHE_URL: Optional[str] = environ.get("DASHBOARD_CACHE_URL")
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 8
+    EMAIL_TRANSPORT: str = "gmail"
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_POLL_INTERVAL: int = 10
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 6
+    EMAIL_OUTBOX_RETRY_DELAY: int = 30
+    EMAIL_OUTBOX_RETRY_MAX_DELAY: int = 3600
+    SPA_SHELL_RELOAD: bool = False
+    STATIC_CACHE_TTL: int = 60
+    STATIC_CACHE_SIZE: int = 512
     TEST_MODE: bool = False
     DEBUG: bool = False
 
 
 @dataclass
 class LocalConfig(Config):
+    SPA_SHELL_RELOAD: bool = True
     DEBUG: bool = True
 
 
 @dataclass
 class ProdConfig(Config):
+    # max_connections(151) 중 배포 시 이전/신규 컨테이너가 겹치는 구간과 관리용 연결 여유분을 남김
+    DB_CONNECTION_BUDGET: int = 60
+    # /metrics는 인증 없이 라우트별 지표를 노출하므로 운영에서는 끄고, 필요하면 내부망 전용 경로로 지정
+    QUERY_METRICS_PATH: Optional[str] = None
     SWAGGER_URL: str = None
     REDOC_URL: str = None
 
 
 @dataclass
 class TestConfig(Config):
+    # pytest-xdist 워커 id(gw0, gw1, ...)를 스키마 이름 뒤에 붙여 워커마다 별도 DB 사용
+    DB_SCHEMA_SUFFIX: Optional[str] = environ.get("PYTEST_XDIST_WORKER")
+    # 공유 캐시(Redis)는 워커끼리 키가 겹치므로 테스트에서는 프로세스 내 캐시만 사용
+    DASHBOARD_CACHE_URL: Optional[str] = None
+    EMAIL_TRANSPORT: str = "local"
     TEST_MODE: bool = True
     DEBUG: bool = True
 
@@ -1,9 +1,18 @@
 import logging
+import re
+from os import cpu_count, environ
 
 from fastapi import FastAPI
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.permission_cache import permission_cache
+from app.utils.pool_metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, pool_metrics
+from app.utils.query_metrics import query_metrics
+
 
 def _database_exist(engine, schema_name):
     query = f"SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA WHERE SCHEMA_NAME = '{schema_name}'"
@@ -23,10 +32,65 @@ def _create_database(engine, schema_name):
         conn.execute(f"CREATE DATABASE {schema_name} CHARACTER SET utf8mb4 COLLATE utf8mb4_bin;")
 
 
+def _get_worker_count() -> int:
+    """
+    gunicorn 워커 수 (tiangolo/uvicorn-gunicorn 이미지의 gunicorn_conf.py와 같은 규칙)
+    """
+    web_concurrency = environ.get("WEB_CONCURRENCY")
+    if web_concurrency:
+        return max(int(web_concurrency), 1)
+    workers = max(int(float(environ.get("WORKERS_PER_CORE", "1")) * (cpu_count() or 1)), 2)
+    max_workers = environ.get("MAX_WORKERS")
+    if max_workers:
+        workers = min(workers, int(max_workers))
+    return workers
+
+
+def _get_pool_size(connection_budget: int, worker_count: int, pool_count: int = 1) -> tuple:
+    """
+    전체 커넥션 예산을 워커 수(와 워커당 풀 수)로 나눠 (pool_size, max_overflow) 계산
+    평상시 연결은 3/4, 나머지는 overflow로 두어 부하가 없을 때는 연결을 덜 유지한다.
+    """
+    per_pool = connection_budget // (worker_count * pool_count)
+    if per_pool < 1:
+        # 풀마다 최소 1개는 필요하므로 예산을 넘게 됨 (워커 수를 줄이거나 예산을 늘려야 함)
+        per_pool = 1
+        logging.warning(
+            f"DB connection budget {connection_budget} is smaller than {worker_count} workers x {pool_count} pools, "
+            + f"up to {worker_count * pool_count} connections will be opened"
+        )
+    pool_size = max(per_pool * 3 // 4, 1)
+    return pool_size, per_pool - pool_size
+
+
+def _to_async_url(database_url: str) -> str:
+    """
+    mysql+pymysql://... -> mysql+aiomysql://...
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "mysql":
+        url = url.set(drivername="mysql+aiomysql")
+    return url.render_as_string(hide_password=False)
+
+
+def _with_schema_suffix(database_url: str, suffix: str) -> str:
+    """
+    mysql+pymysql://.../db_name -> mysql+pymysql://.../db_name_{suffix}
+    """
+    if not re.fullmatch(r"\w+", suffix):
+        raise Exception("db schema suffix must be alphanumeric or '_'")
+    url = make_url(database_url)
+    return url.set(database=f"{url.database}_{suffix}").render_as_string(hide_password=False)
+
+
 class SQLAlchemy:
     def __init__(self, app: FastAPI = None, **kwargs):
         self._engine = None
         self._session = None
+        self._async_engine = None
+        self._async_session = None
+        self._read_engine = None
+        self._read_session = None
         if app is not None:
             self.init_app(app=app, **kwargs)
 
@@ -42,21 +106,51 @@ class SQLAlchemy:
         pool_recycle = kwargs.setdefault("DB_POOL_RECYCLE", 900)
         pool_size = kwargs.setdefault("DB_POOL_SIZE", 30)
         max_overflow = kwargs.setdefault("DB_MAX_OVERFLOW", 10)
+        pool_pre_ping = kwargs.setdefault("DB_POOL_PRE_PING", True)
+        connection_budget = kwargs.setdefault("DB_CONNECTION_BUDGET", None)
+        worker_count = kwargs.setdefault("DB_WORKER_COUNT", None) or _get_worker_count()
         is_testing = kwargs.setdefault("TEST_MODE", False)
+        is_async = kwargs.setdefault("DB_ASYNC", False)
+        async_database_url = kwargs.setdefault("DB_ASYNC_URL", None)
+        read_database_url = kwargs.setdefault("DB_READ_URL", None)
+        schema_suffix = kwargs.setdefault("DB_SCHEMA_SUFFIX", None)
 
+        if is_testing and schema_suffix:
+            # 병렬 테스트(pytest-xdist)에서 워커끼리 같은 스키마를 지우고 만들지 않도록 워커별 스키마 사용
+            database_url, read_database_url, async_database_url = (
+                _with_schema_suffix(url, schema_suffix) if url else url
+                for url in (database_url, read_database_url, async_database_url)
+            )
+        async_database_url = async_database_url or _to_async_url(database_url)
+
+        if connection_budget:
+            # 워커마다 고정 크기 풀을 만들면 워커 수만큼 연결이 늘어나므로 전체 예산 안에서 나눠 가짐
+            # (주 DB, 복제 DB, 비동기 풀은 각자 연결을 가지므로 워커의 풀 수로도 나눔)
+            pool_count = 1 + bool(read_database_url) + bool(is_async)
+            pool_size, max_overflow = _get_pool_size(connection_budget, worker_count, pool_count)
+            logging.info(
+                f"DB pool size {pool_size} (+{max_overflow}) per pool "
+                + f"(budget {connection_budget}, workers {worker_count}, pools per worker {pool_count})"
+            )
+
+        # pre-ping을 끄면 체크아웃마다 왕복하는 대신 pool_recycle(서버 wait_timeout보다 짧게)로 오래된 연결을 교체
+        # pre-ping은 비용을 따로 집계하도록 SQLAlchemy 대신 pool_metrics의 checkout 이벤트에서 실행
         self._engine = create_engine(
             url=database_url,
             echo=echo,
             pool_recycle=pool_recycle,
-            pool_pre_ping=True,
+            pool_pre_ping=False,
             pool_size=pool_size,
             max_overflow=max_overflow,
+            poolclass=InstrumentedQueuePool,
         )
 
         if is_testing:
             db_url = self._engine.url
             if db_url.host != "localhost":
                 raise Exception("db host must be 'localhost' in test environment")
+            if read_database_url and make_url(read_database_url).host != "localhost":
+                raise Exception("read db host must be 'localhost' in test environment")
             schema_name = db_url.database
             temp_engine = create_engine(
                 url=database_url,
@@ -70,18 +164,71 @@ class SQLAlchemy:
                 _drop_database(temp_engine, schema_name)
             _create_database(temp_engine, schema_name)
             temp_engine.dispose()
+            permission_cache.clear()
+            dashboard_cache.clear()
 
+        query_metrics.init_app(app, **kwargs)
+        query_metrics.instrument(self._engine)
+        query_metrics.register_collector(pool_metrics.render)
+        pool_metrics.instrument(self._engine, "primary", pre_ping=pool_pre_ping)
         self._session = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
 
+        self._read_engine = None
+        self._read_session = None
+        if read_database_url:
+            # 집계 위주의 조회 API는 복제 DB에서 처리해 주 DB의 쓰기와 경합하지 않도록 함
+            self._read_engine = create_engine(
+                url=read_database_url,
+                echo=echo,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=False,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                poolclass=InstrumentedQueuePool,
+            )
+            query_metrics.instrument(self._read_engine)
+            pool_metrics.instrument(self._read_engine, "read", pre_ping=pool_pre_ping)
+            self._read_session = sessionmaker(autocommit=False, autoflush=False, bind=self._read_engine)
+
+        if is_async:
+            # 동기 엔진은 그대로 두고, 비동기로 옮긴 API만 별도 풀(async 드라이버)을 사용
+            self._async_engine = create_async_engine(
+                async_database_url,
+                echo=echo,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=False,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                poolclass=InstrumentedAsyncAdaptedQueuePool,
+            )
+            self._async_session = sessionmaker(
+                autocommit=False,
+                autoflush=False,
+                expire_on_commit=False,
+                bind=self._async_engine,
+                class_=AsyncSession,
+            )
+            query_metrics.instrument(self._async_engine.sync_engine)
+            pool_metrics.instrument(self._async_engine.sync_engine, "primary_async", pre_ping=pool_pre_ping)
+
+            @app.on_event("shutdown")
+            async def async_shutdown():
+                await self._async_engine.dispose()
+                logging.info("Async DB disconnected")
+
         @app.on_event("startup")
         def startup():
-            self._engine.connect()
+            # 연결 확인만 하고 바로 풀에 반환 (워커마다 연결 하나를 계속 점유하지 않도록)
+            with self._engine.connect():
+                pass
             logging.info("DB connected.")
 
         @app.on_event("shutdown")
         def shutdown():
             self._session.close_all()
             self._engine.dispose()
+            if self._read_engine is not None:
+                self._read_engine.dispose()
             logging.info("DB disconnected")
 
     def get_db(self):
@@ -98,14 +245,56 @@ class SQLAlchemy:
         finally:
             db_session.close()
 
+    def get_read_db(self):
+        """
+        읽기 전용 API용 DB 세션 유지 함수
+        DB_READ_URL이 없으면 주 DB 세션을 사용한다.
+        :return:
+        """
+        if self._read_session is None:
+            yield from self.get_db()
+            return
+        db_session = None
+        try:
+            db_session = self._read_session()
+            yield db_session
+        finally:
+            db_session.close()
+
+    async def get_async_db(self):
+        """
+        요청마다 비동기 DB 세션 유지 함수 (DB_ASYNC 설정 시에만 사용 가능)
+        :return:
+        """
+        if self._async_session is None:
+            raise Exception("must be called 'init_app' with DB_ASYNC")
+        async with self._async_session() as db_session:
+            yield db_session
+
     @property
     def session(self):
         return self.get_db
 
+    @property
+    def read_session(self):
+        return self.get_read_db
+
+    @property
+    def async_session(self):
+        return self.get_async_db
+
     @property
     def engine(self):
         return self._engine
 
+    @property
+    def read_engine(self):
+        return self._read_engine or self._engine
+
+    @property
+    def async_engine(self):
+        return self._async_engine
+
 
 db = SQLAlchemy()
 Base = declarative_base()
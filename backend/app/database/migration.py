@@ -0,0 +1,113 @@
+from argparse import ArgumentParser
+import logging
+from dataclasses import asdict
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from app.common.config import conf
+from app.database.conn import Base
+from app.database import schema  # noqa: F401 (테이블 메타데이터 등록)
+from app.database.schema import DailyRevenue, Transaction
+
+
+def create_missing_columns(engine: Engine) -> list:
+    """
+    schema.py에 선언된 column 중 기존 DB에 없는 column 추가
+    (create_all은 이미 존재하는 테이블에 column을 추가하지 않음, 생성 column은 기존 Row도 계산됨)
+    :param engine:
+    :return: 추가한 column 이름 목록 (table.column)
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+            logging.info(f"Column created: {table.name}.{column.name}")
+            created.append(f"{table.name}.{column.name}")
+    return created
+
+
+def create_missing_indexes(engine: Engine) -> list:
+    """
+    schema.py에 선언된 index 중 기존 DB에 없는 index 생성
+    (create_all은 이미 존재하는 테이블의 index를 추가하지 않음)
+    :param engine:
+    :return: 생성한 index 이름 목록
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            # MariaDB(InnoDB)는 secondary index 추가를 online DDL(ALGORITHM=INPLACE, LOCK=NONE)로 처리
+            index.create(bind=engine)
+            logging.info(f"Index created: {table.name}.{index.name}")
+            created.append(index.name)
+    return created
+
+
+def fill_empty_daily_revenue(engine: Engine) -> int:
+    """
+    daily_revenue 테이블이 비어 있고 거래가 존재하면 전체 집계 생성 (테이블 추가 직후 1회)
+    :param engine:
+    :return: 생성한 집계 Row 수
+    """
+    with Session(bind=engine) as session:
+        if session.query(DailyRevenue.id).first() or not session.query(Transaction.id).first():
+            return 0
+        return DailyRevenue.rebuild(session=session)
+
+
+def migrate() -> None:
+    conf_dict = asdict(conf())
+    engine = create_engine(url=conf_dict["DB_URL"], echo=conf_dict["DB_ECHO"])
+    Base.metadata.create_all(engine)
+    columns = create_missing_columns(engine)
+    print(f"{len(columns)} column(s) created: {columns}")
+    created = create_missing_indexes(engine)
+    print(f"{len(created)} index(es) created: {created}")
+    filled = fill_empty_daily_revenue(engine)
+    print(f"{filled} daily revenue row(s) created")
+    engine.dispose()
+
+
+def rebuild_daily_revenue(start_date: str = None, end_date: str = None) -> None:
+    conf_dict = asdict(conf())
+    engine = create_engine(url=conf_dict["DB_URL"], echo=conf_dict["DB_ECHO"])
+    with Session(bind=engine) as session:
+        rebuilt = DailyRevenue.rebuild(session=session, start_date=start_date, end_date=end_date)
+    print(f"{rebuilt} daily revenue row(s) rebuilt ({start_date or '처음'} ~ {end_date or '마지막'})")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--rebuild-daily-revenue",
+        action="store_true",
+        help="거래 원본으로 일별 매출 집계 재계산 (재계산 동안 기간 내 거래 쓰기가 대기하므로 점검 시간에 실행)",
+    )
+    parser.add_argument("--start-date", default=None, help="재계산 시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end-date", default=None, help="재계산 종료일 (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    if args.rebuild_daily_revenue:
+        rebuild_daily_revenue(start_date=args.start_date, end_date=args.end_date)
+    else:
+        migrate()
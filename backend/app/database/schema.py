@@ -1,19 +1,34 @@
-from datetime import datetime
-from pytz import timezone
+from datetime import date, datetime
 from sqlalchemy import (
     Boolean,
     Column,
+    Computed,
     Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     String,
+    Text,
+    UniqueConstraint,
+    case,
+    func,
+    insert,
+    literal,
 )
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.database.conn import Base, db
+from app.utils.date import get_now_datetime
+from app.utils.permission_cache import permission_cache
+
+true = True
+false = False
 
 
 class BaseMixin:
@@ -46,8 +61,8 @@ class BaseMixin:
             col_name = col.name
             if col_name in kwargs:
                 setattr(obj, col_name, kwargs.get(col_name))
-        setattr(obj, "created_at", datetime.now(timezone("Asia/Seoul")))
-        setattr(obj, "updated_at", datetime.now(timezone("Asia/Seoul")))
+        setattr(obj, "created_at", get_now_datetime())
+        setattr(obj, "updated_at", get_now_datetime())
         session.add(obj)
         session.flush()
         if auto_commit:
@@ -58,23 +73,30 @@ class BaseMixin:
     def get(cls, session: Session = None, with_entities: list = None, **kwargs):
         """
         Simply get a Row
+        id 하나만으로 조회하는 경우 session.get(identity map 우선)을 사용하고,
+        그 외에는 LIMIT 2 조회 한 번으로 "2개 이상의 Row" 여부까지 확인한다.
         :param session:
         :param kwargs:
         :return:
         """
         sess = next(db.session()) if not session else session
-        query = sess.query(cls)
-        for key, val in kwargs.items():
-            col = getattr(cls, key)
-            query = query.filter(col == val)
-        if with_entities:
-            query = query.with_entities(*with_entities)
-        if query.count() > 1:
-            raise Exception("Only one row is supposed to be returned, but got more than one.")
-        result = query.first()
-        if not session:
-            sess.close()
-        return result
+        try:
+            if not with_entities and list(kwargs) == ["id"]:
+                return sess.get(cls, kwargs["id"])
+
+            query = sess.query(cls)
+            for key, val in kwargs.items():
+                col = getattr(cls, key)
+                query = query.filter(col == val)
+            if with_entities:
+                query = query.with_entities(*with_entities)
+            rows = query.limit(2).all()
+            if len(rows) > 1:
+                raise Exception("Only one row is supposed to be returned, but got more than one.")
+            return rows[0] if rows else None
+        finally:
+            if not session:
+                sess.close()
 
     @classmethod
     def filter(cls, session: Session = None, with_entities: list = None, **kwargs):
@@ -116,6 +138,44 @@ class BaseMixin:
         obj._q = query
         return obj
 
+    @classmethod
+    async def acreate(cls, session: AsyncSession, auto_commit=False, **kwargs):
+        """
+        create의 비동기 버전
+        run_sync로 동기 create(모델별 재정의 포함)를 그대로 실행한다.
+        :param session: AsyncSession
+        :param auto_commit: 자동 커밋 여부
+        :param kwargs: 적재 할 데이터
+        :return:
+        """
+        obj = await session.run_sync(lambda sync_session: cls.create(session=sync_session, **kwargs))
+        if auto_commit:
+            await session.commit()
+        return obj
+
+    @classmethod
+    async def aget(cls, session: AsyncSession, with_entities: list = None, **kwargs):
+        """
+        get의 비동기 버전
+        :param session: AsyncSession
+        :param kwargs:
+        :return:
+        """
+        return await session.run_sync(
+            lambda sync_session: cls.get(session=sync_session, with_entities=with_entities, **kwargs)
+        )
+
+    @classmethod
+    def afilter(cls, session: AsyncSession, with_entities: list = None, **kwargs):
+        """
+        filter의 비동기 버전
+        e.g. await Transaction.afilter(session, user_id=1).order_by("-date").all()
+        :param session: AsyncSession
+        :param kwargs:
+        :return:
+        """
+        return AsyncFilter(cls, session=session, with_entities=with_entities, **kwargs)
+
     @classmethod
     def cls_attr(cls, col_name=None):
         if col_name:
@@ -137,7 +197,7 @@ class BaseMixin:
         return self
 
     def update(self, auto_commit: bool = False, **kwargs):
-        kwargs["updated_at"] = datetime.now(timezone("Asia/Seoul"))
+        kwargs["updated_at"] = get_now_datetime()
         qs = self._q.update(kwargs)
         ret = None
 
@@ -175,6 +235,50 @@ class BaseMixin:
             self._session.flush()
 
 
+class AsyncFilter:
+    """
+    BaseMixin.filter 결과를 AsyncSession에서 사용하기 위한 래퍼
+    조건과 정렬만 모아 두었다가 first/all/count/update/delete 시점에 run_sync로 동기 헬퍼를 실행한다.
+    """
+
+    def __init__(self, model, session: AsyncSession, with_entities: list = None, **kwargs):
+        self._model = model
+        self._session = session
+        self._with_entities = with_entities
+        self._kwargs = kwargs
+        self._order_by = ()
+
+    def order_by(self, *args: str):
+        self._order_by += args
+        return self
+
+    def _filter(self, sync_session: Session):
+        obj = self._model.filter(session=sync_session, with_entities=self._with_entities, **self._kwargs)
+        if self._order_by:
+            obj.order_by(*self._order_by)
+        return obj
+
+    async def first(self):
+        return await self._session.run_sync(lambda sync_session: self._filter(sync_session).first())
+
+    async def all(self):
+        return await self._session.run_sync(lambda sync_session: self._filter(sync_session).all())
+
+    async def count(self):
+        return await self._session.run_sync(lambda sync_session: self._filter(sync_session).count())
+
+    async def update(self, auto_commit: bool = False, **kwargs):
+        ret = await self._session.run_sync(lambda sync_session: self._filter(sync_session).update(**kwargs))
+        if auto_commit:
+            await self._session.commit()
+        return ret
+
+    async def delete(self, auto_commit: bool = False):
+        await self._session.run_sync(lambda sync_session: self._filter(sync_session).delete())
+        if auto_commit:
+            await self._session.commit()
+
+
 class UserRole(Base, BaseMixin):
     __tablename__ = "user_role"
     name = Column(String(length=10), nullable=False, unique=True)
@@ -193,6 +297,19 @@ class Permission(Base, BaseMixin):
         ARW = All Read and Write(모든 user.id에 대한 CRUD 가능)
     """
 
+    @classmethod
+    def create(cls, session: Session, auto_commit=False, **kwargs):
+        permission_cache.invalidate_on_commit(session, kwargs.get("user_id"))
+        return super().create(session=session, auto_commit=auto_commit, **kwargs)
+
+    def update(self, auto_commit: bool = False, **kwargs):
+        permission_cache.invalidate_on_commit(self._session)
+        return super().update(auto_commit=auto_commit, **kwargs)
+
+    def delete(self, auto_commit: bool = False):
+        permission_cache.invalidate_on_commit(self._session)
+        super().delete(auto_commit=auto_commit)
+
 
 class User(Base, BaseMixin):
     __tablename__ = "user"
@@ -213,6 +330,14 @@ class InsuranceCompany(Base, BaseMixin):
 
 class Transaction(Base, BaseMixin):
     __tablename__ = "transaction"
+    __table_args__ = (
+        # 기간(+취소 여부) 집계: 대시보드, 회사 정산 (price, cancel_fee 포함 covering index)
+        Index("ix_transaction_date_canceled_amount", "date", "canceled", "price", "cancel_fee"),
+        # 직원별 기간 집계: 직원 정산, 직원별 매출 (price, cancel_fee 포함 covering index)
+        Index("ix_transaction_user_id_date_canceled_amount", "user_id", "date", "canceled", "price", "cancel_fee"),
+        # 보험사별 기간 조회: 거래 테이블, 보험사별 비율
+        Index("ix_transaction_insurance_company_id_date", "insurance_company_id", "date"),
+    )
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     insurance_company_id = Column(Integer, ForeignKey("insurance_company.id"), nullable=False)
     vehicle_id = Column(String(length=10), nullable=False)
@@ -223,14 +348,183 @@ class Transaction(Base, BaseMixin):
     canceled = Column(Boolean, default=False)
     cancel_fee = Column(Integer, default=0)
 
+    @classmethod
+    def create(cls, session: Session, auto_commit=False, **kwargs):
+        obj = super().create(session=session, auto_commit=False, **kwargs)
+        DailyRevenue.apply(session=session, added=[kwargs])
+        if auto_commit:
+            session.commit()
+        return obj
+
+    def update(self, auto_commit: bool = False, **kwargs):
+        before = self._rollup_rows()
+        ret = super().update(auto_commit=False, **kwargs)
+        DailyRevenue.apply(session=self._session, added=[{**row, **kwargs} for row in before], removed=before)
+        if auto_commit:
+            self._session.commit()
+        return ret
+
+    def delete(self, auto_commit: bool = False):
+        before = self._rollup_rows()
+        super().delete(auto_commit=False)
+        DailyRevenue.apply(session=self._session, removed=before)
+        if auto_commit:
+            self._session.commit()
+
+    def _rollup_rows(self) -> list:
+        """
+        daily_revenue 집계에 필요한 컬럼만 조회 (수정/삭제 전 값)
+        수정/삭제가 끝날 때까지 다른 트랜잭션이 같은 거래를 바꾸지 못하도록 잠근 채로 읽는다.
+        """
+        rows = self._q.with_for_update().with_entities(
+            Transaction.date,
+            Transaction.user_id,
+            Transaction.insurance_company_id,
+            Transaction.canceled,
+            Transaction.price,
+            Transaction.cancel_fee,
+        ).all()
+        return [row._asdict() for row in rows]
+
+
+class DailyRevenue(Base, BaseMixin):
+    """
+    일별 매출 집계 (Transaction 생성/수정/삭제 시 증분 반영, 어긋난 경우 rebuild로 재계산)
+    """
+
+    __tablename__ = "daily_revenue"
+    __table_args__ = (UniqueConstraint("date", "user_id", "insurance_company_id", name="uq_daily_revenue_key"),)
+    date = Column(Date, nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    insurance_company_id = Column(Integer, ForeignKey("insurance_company.id"), nullable=False)
+    transaction_count = Column(Integer, nullable=False, default=0)  # 취소 건 포함 transaction 개수
+    canceled_transaction_count = Column(Integer, nullable=False, default=0)  # 취소 건 개수
+    revenue = Column(Integer, nullable=False, default=0)  # 취소되지 않은 거래 금액 합계
+    cancel_fee = Column(Integer, nullable=False, default=0)  # 취소 수수료 합계
+
+    @classmethod
+    def apply(cls, session: Session, added: list = (), removed: list = ()) -> None:
+        """
+        Transaction 변경분을 집계에 반영 (커밋은 호출한 쪽의 트랜잭션에서)
+        :param session:
+        :param added: 새로 반영할 거래 값(dict) 목록
+        :param removed: 집계에서 뺄 거래 값(dict) 목록
+        :return:
+        """
+        deltas = {}
+        for rows, sign in [(added, 1), (removed, -1)]:
+            for row in rows:
+                canceled = bool(row.get("canceled") or False)
+                key = (_to_date(row["date"]), int(row["user_id"]), int(row["insurance_company_id"]))
+                delta = deltas.setdefault(key, [0, 0, 0, 0])
+                delta[0] += sign
+                delta[1] += sign if canceled else 0
+                delta[2] += 0 if canceled else sign * int(row.get("price") or 0)
+                delta[3] += sign * int(row.get("cancel_fee") or 0) if canceled else 0
+
+        now = get_now_datetime()
+        values = [
+            dict(
+                date=key[0],
+                user_id=key[1],
+                insurance_company_id=key[2],
+                transaction_count=delta[0],
+                canceled_transaction_count=delta[1],
+                revenue=delta[2],
+                cancel_fee=delta[3],
+                created_at=now,
+                updated_at=now,
+            )
+            for key, delta in deltas.items()
+            if any(delta)
+        ]
+        if not values:
+            return
+
+        counter_columns = ["transaction_count", "canceled_transaction_count", "revenue", "cancel_fee"]
+        stmt = mysql_insert(cls.__table__).values(values)
+        stmt = stmt.on_duplicate_key_update(
+            updated_at=stmt.inserted.updated_at,
+            **{col: getattr(cls, col) + getattr(stmt.inserted, col) for col in counter_columns},
+        )
+        session.execute(stmt)
+
+    @classmethod
+    def rebuild(cls, session: Session, start_date: str = None, end_date: str = None) -> int:
+        """
+        Transaction 원본으로 기간 내 집계를 다시 계산 (기간 미지정 시 전체)
+        재계산이 끝날 때(커밋)까지 기간 내 거래를 SELECT ... FOR UPDATE로 잠가 그동안의 거래 생성/수정/삭제는 대기한다.
+        잠금이 기간 내 거래 전체에 걸리므로 쓰기가 몰리는 시간에는 실행하지 말 것 (점검 시간, 마이그레이션 직후 등)
+        :return: 재계산된 집계 Row 수
+        """
+        lock_query = session.query(func.count(Transaction.id))
+        delete_query = session.query(cls)
+        aggregate_query = session.query(
+            Transaction.date,
+            Transaction.user_id,
+            Transaction.insurance_company_id,
+            func.count(Transaction.id),
+            func.sum(case((Transaction.canceled == true, 1), else_=0)),
+            func.sum(case((Transaction.canceled == false, Transaction.price), else_=0)),
+            func.sum(case((Transaction.canceled == true, Transaction.cancel_fee), else_=0)),
+            literal(get_now_datetime()),
+            literal(get_now_datetime()),
+        )
+        if start_date is not None:
+            lock_query = lock_query.filter(Transaction.date >= start_date)
+            delete_query = delete_query.filter(cls.date >= start_date)
+            aggregate_query = aggregate_query.filter(Transaction.date >= start_date)
+        if end_date is not None:
+            lock_query = lock_query.filter(Transaction.date <= end_date)
+            delete_query = delete_query.filter(cls.date <= end_date)
+            aggregate_query = aggregate_query.filter(Transaction.date <= end_date)
+        aggregate_query = aggregate_query.group_by(
+            Transaction.date, Transaction.user_id, Transaction.insurance_company_id
+        )
+
+        # 기간 내 거래 Row와 그 사이 간격(next-key)을 잠가, 재계산 도중 반영된 증분이 지워지거나 두 번 집계되지 않도록 함
+        lock_query.with_for_update().scalar()
+        delete_query.delete(synchronize_session=False)
+        result = session.execute(
+            insert(cls.__table__).from_select(
+                [
+                    "date",
+                    "user_id",
+                    "insurance_company_id",
+                    "transaction_count",
+                    "canceled_transaction_count",
+                    "revenue",
+                    "cancel_fee",
+                    "created_at",
+                    "updated_at",
+                ],
+                aggregate_query.subquery().select(),
+            )
+        )
+        session.commit()
+        return result.rowcount
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
 
 class UserInvoice(Base, BaseMixin):
     __tablename__ = "user_invoice"
+    __table_args__ = (
+        # 기간별 매출 집계: 대시보드 월별 매출 (revenue 포함 covering index)
+        Index("ix_user_invoice_period_revenue", "period", "revenue"),
+    )
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     contract_fee = Column(Float, nullable=False)  # 수수료 퍼센트(e.g. 15)
     plate_fee = Column(Integer, nullable=False)  # 지입료(e.g. 220000)
     year = Column(Integer, nullable=False)  # 연도 (e.g. 2022)
     month = Column(Integer, nullable=False)  # 월 (e.g. 6)
+    period = Column(Integer, Computed("year * 100 + month", persisted=True))  # 연월 키 (e.g. 202206)
     transaction_count = Column(Integer, nullable=False)  # 취소 건 포함 총 transaction 개수
     canceled_transaction_count = Column(Integer, nullable=False)  # 취소 건 개수
     revenue = Column(Integer, nullable=False)  # 취소 수수료 제외 매출
@@ -255,8 +549,10 @@ class UserInvoiceExtra(Base, BaseMixin):
 
 class CompanyInvoice(Base, BaseMixin):
     __tablename__ = "company_invoice"
+    __table_args__ = (Index("ix_company_invoice_period", "period"),)
     year = Column(Integer, nullable=False)
     month = Column(Integer, nullable=False)
+    period = Column(Integer, Computed("year * 100 + month", persisted=True))  # 연월 키 (e.g. 202206)
     revenue = Column(Integer, nullable=False)  # 모든 직원의 매출 합계(취소 수수료 포함)
     plate_fee = Column(Integer, nullable=False)  # 모든 직원의 지입료 합계
     employee_salary = Column(Integer, nullable=False)  # 모든 직원의 급여 합계
@@ -271,3 +567,21 @@ class CompanyInvoiceExtra(Base, BaseMixin):
     month = Column(Integer, nullable=False)
     name = Column(String(length=15), nullable=False)
     price = Column(Integer, nullable=False)
+
+
+class EmailOutbox(Base, BaseMixin):
+    """
+    발송 대기 메일 (요청에서는 저장만 하고 email_outbox 워커가 모아서 발송, 실패 시 지수 백오프로 재시도)
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),)
+    destination = Column(String(length=255), nullable=False)
+    subject = Column(String(length=255), nullable=False)
+    body = Column(Text, nullable=False)  # HTML 본문
+    attachments = Column(JSON)  # 첨부 파일 경로 목록
+    status = Column(Enum("pending", "sent", "failed"), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)  # 발송 시도 횟수
+    next_attempt_at = Column(DateTime, nullable=False)  # 다음 발송 가능 시각
+    last_error = Column(String(length=255))  # 마지막 실패 사유
+    sent_at = Column(DateTime)
@@ -2,17 +2,24 @@ from dataclasses import asdict
 from os import path
 import sys
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
 import uvicorn
 
 from app.common.config import conf
 from app.database.conn import db, Base
+from app.database.migration import create_missing_columns, create_missing_indexes
+from app.database.schema import DailyRevenue
 from app.routes import dashboard, invoice, transaction, user
+from app.utils.auth import PermissionDenied, permission_denied_handler
 from app.utils.create_dummy_data import create_dummy_data
 from app.utils.create_superuser import create_superuser
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.email_outbox import email_outbox
+from app.utils.password import password_hasher
+from app.utils.permission_cache import permission_cache
+from app.utils.spa import spa_shell
+from app.utils.static_files import CachedStaticFiles
 
 
 conf_dict = asdict(conf())
@@ -24,27 +31,42 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_exception_handler(PermissionDenied, permission_denied_handler)
 app.include_router(dashboard.router, tags=["Dashboard"], prefix="/api")
 app.include_router(invoice.router, tags=["Invoice"], prefix="/api")
 app.include_router(transaction.router, tags=["Transaction"], prefix="/api")
 app.include_router(user.router, tags=["User"], prefix="/api")
-app.mount("/build", StaticFiles(directory=path.join(conf_dict["BASE_DIR"], "app", "templates", "build")), name="build")
 app.mount(
-    "/static", StaticFiles(directory=path.join(conf_dict["BASE_DIR"], "app", "templates", "static")), name="static"
+    "/build",
+    CachedStaticFiles(
+        directory=path.join(conf_dict["BASE_DIR"], "app", "templates", "build"),
+        cache_ttl=conf_dict["STATIC_CACHE_TTL"],
+        cache_size=conf_dict["STATIC_CACHE_SIZE"],
+    ),
+    name="build",
+)
+app.mount(
+    "/static",
+    CachedStaticFiles(
+        directory=path.join(conf_dict["BASE_DIR"], "app", "templates", "static"),
+        cache_ttl=conf_dict["STATIC_CACHE_TTL"],
+        cache_size=conf_dict["STATIC_CACHE_SIZE"],
+    ),
+    name="static",
 )
 
 
 @app.get("/{full_path:path}")
-async def render_spa(full_path: str):
-    index_html_path = path.join(conf_dict["BASE_DIR"], "app", "templates", "index.html")
-
-    with open(index_html_path, "rt", encoding="UTF-8") as f:
-        index_html = f.read()
-
-    return HTMLResponse(content=index_html, status_code=200)
+async def render_spa(full_path: str, request: Request):
+    return spa_shell.response(request)
 
 
 db.init_app(app, **conf_dict)
+permission_cache.init_app(app, **conf_dict)
+dashboard_cache.init_app(app, **conf_dict)
+password_hasher.init_app(app, **conf_dict)
+email_outbox.init_app(app, **conf_dict)
+spa_shell.init_app(app, **conf_dict)
 
 # local env
 if __name__ == "__main__":
@@ -60,7 +82,7 @@ if __name__ == "__main__":
     if is_create_dummy_data:
         Base.metadata.create_all(db.engine)
         session = next(db.session())
-        print("Dummy data 생성으로 인해 서버 구동까지 약 1~3분 소요됩니다.")
+        print("Dummy data 생성 중입니다. (규모 조정: python -m app.utils.create_dummy_data --help)")
         create_dummy_data(db)
 
     else:
@@ -82,6 +104,13 @@ if __name__ == "__main__":
             # Create Superuser
             create_superuser(session)
 
+        else:
+            # dummy_data.sql에는 daily_revenue, 정산 연월 키(period)가 없으므로 추가 후 거래 원본으로 다시 집계
+            Base.metadata.create_all(db.engine)
+            create_missing_columns(db.engine)
+            create_missing_indexes(db.engine)
+            DailyRevenue.rebuild(session=next(db.session()))
+
     # Run uvicorn
     uvicorn.run(
         "main:app", host="0.0.0.0", port=8000, reload=True, reload_dirs=[path.join(conf_dict["BASE_DIR"], "app")]
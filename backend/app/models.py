@@ -88,6 +88,8 @@ class TransactionTable(BaseModel):
     canceled_type: str = "ALL"
     order_by: str = "transaction_id"
     order_type: str = "desc"
+    pagination: str = "offset"
+    cursor: str = None
 
     @validator("canceled_type")
     def validate_canceled_type(cls, val):
@@ -110,6 +112,17 @@ class TransactionTable(BaseModel):
             raise ValueError(f"order_type은(는) {available_list}중 하나여야 합니다.")
         return val
 
+    @validator("pagination")
+    def validate_pagination(cls, val):
+        available_list = ["offset", "cursor"]
+        if val not in available_list:
+            raise ValueError(f"pagination은(는) {available_list}중 하나여야 합니다.")
+        return val
+
+
+class TransactionExport(TransactionTable):
+    gzip: bool = False
+
 
 class TransactionUpdate(BaseModel):
     user_id: int = None
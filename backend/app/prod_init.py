@@ -5,6 +5,7 @@ from sqlalchemy.orm import sessionmaker
 
 from app.common.config import conf
 from app.database.conn import Base
+from app.database.migration import create_missing_columns, create_missing_indexes, fill_empty_daily_revenue
 from app.utils.create_superuser import create_superuser
 
 
@@ -26,6 +27,9 @@ def init_db() -> None:
     )
 
     Base.metadata.create_all(engine)
+    create_missing_columns(engine)
+    create_missing_indexes(engine)
+    fill_empty_daily_revenue(engine)
     session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db_session = session()
     create_superuser(db_session)
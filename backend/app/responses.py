@@ -39,6 +39,11 @@ DEFAULT_RESPONSES = {
     },
 }
 
+PASSWORD_HASHER_BUSY_RESPONSE = {
+    "description": "비밀번호 해싱 요청이 몰려 처리 대기열이 가득 찬 경우",
+    "content": {"application/json": {"example": {"success": False, "message": "요청이 많습니다. 잠시 후 다시 시도해 주세요!"}}},
+}
+
 
 def create_role_response():
     result = deepcopy(DEFAULT_RESPONSES)
@@ -133,6 +138,7 @@ def create_user_response():
     to_delete = [200, 401, 403]
     for key in to_delete:
         del result[key]
+    result[503] = deepcopy(PASSWORD_HASHER_BUSY_RESPONSE)
     return result
 
 
@@ -213,6 +219,7 @@ def update_user_response():
     to_delete = [201]
     for key in to_delete:
         del result[key]
+    result[503] = deepcopy(PASSWORD_HASHER_BUSY_RESPONSE)
     result[200] = {
         "description": "요청이 성공적으로 처리되었을 경우",
         "content": {
@@ -260,6 +267,7 @@ def login_response():
     to_delete = [201, 401, 403, 409]
     for key in to_delete:
         del result[key]
+    result[503] = deepcopy(PASSWORD_HASHER_BUSY_RESPONSE)
     result[200] = {
         "description": "요청이 성공적으로 처리되었을 경우",
         "content": {
@@ -339,6 +347,7 @@ def reset_password_response():
     to_delete = [201, 401, 403]
     for key in to_delete:
         del result[key]
+    result[503] = deepcopy(PASSWORD_HASHER_BUSY_RESPONSE)
     result[200] = {
         "description": "요청이 성공적으로 처리되었을 경우",
         "content": {
@@ -450,61 +459,134 @@ def create_transaction_response():
     return result
 
 
+def bulk_create_transaction_response():
+    result = deepcopy(DEFAULT_RESPONSES)
+    to_delete = [200, 422]
+    for key in to_delete:
+        del result[key]
+    result[201] = {
+        "description": "요청 리소스가 성공적으로 생성되었을 경우",
+        "content": {
+            "application/json": {"example": {"success": True, "message": "OK", "result": {"created_count": 2}}}
+        },
+    }
+    result[400] = {
+        "description": "형식이 올바르지 않거나, 유효하지 않은 행이 하나라도 포함된 경우 (아무것도 생성되지 않음)",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "유효하지 않은 거래가 포함되어 있습니다!",
+                    "result": {
+                        "error_list": [
+                            {"row": 2, "message": "존재하지 않는 보험사입니다!"},
+                            {"row": 5, "message": "값이 올바르지 않습니다! (price)"},
+                        ]
+                    },
+                }
+            }
+        },
+    }
+    return result
+
+
+def bulk_create_transaction_request_body():
+    example = {
+        "user_id": 2,
+        "insurance_company_id": 1,
+        "vehicle_id": "123가1234",
+        "vehicle_model": "소나타",
+        "date": "2022-06-04",
+        "price": 50000,
+        "memo": "야간",
+    }
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/TransactionCreate"}},
+                    "example": [example],
+                },
+                "text/csv": {
+                    "schema": {"type": "string"},
+                    "example": ",".join(example) + "\n" + ",".join(str(val) for val in example.values()),
+                },
+            },
+        }
+    }
+
+
 def get_transaction_table_response():
     result = deepcopy(DEFAULT_RESPONSES)
     to_delete = [201]
     for key in to_delete:
         del result[key]
+    transaction_list = [
+        {
+            "id": 3,
+            "date": "2022-02-22",
+            "created_at": "2022-06-04T20:09:49",
+            "insurance_company": "제휴사",
+            "vehicle_id": "222이 2222",
+            "vehicle_model": "홍진호카",
+            "user_name": "김대표",
+            "user_id": 1,
+            "price": 22,
+            "memo": "",
+            "canceled": True,
+            "cancel_fee": 123456,
+        },
+        {
+            "id": 2,
+            "date": "2022-06-04",
+            "created_at": "2022-06-04T20:08:47",
+            "insurance_company": "제휴사",
+            "vehicle_id": "234나 5678",
+            "vehicle_model": "롤스로이스",
+            "user_name": "김대표",
+            "user_id": 1,
+            "price": 99999,
+            "memo": "",
+            "canceled": False,
+            "cancel_fee": 0,
+        },
+        {
+            "id": 1,
+            "date": "2022-06-04",
+            "created_at": "2022-06-04T20:08:16",
+            "insurance_company": "애니카",
+            "vehicle_id": "123가 1234",
+            "vehicle_model": "벤츠 S500",
+            "user_name": "김대표",
+            "user_id": 1,
+            "price": 1234,
+            "memo": "",
+            "canceled": False,
+            "cancel_fee": 0,
+        },
+    ]
     result[200] = {
         "description": "요청이 성공적으로 처리되었을 경우",
         "content": {
             "application/json": {
-                "example": {
-                    "success": True,
-                    "message": "OK",
-                    "result": {
-                        "total_length": 3,
-                        "transaction_list": [
-                            {
-                                "id": 3,
-                                "date": "2022-02-22",
-                                "created_at": "2022-06-04T20:09:49",
-                                "insurance_company": "제휴사",
-                                "vehicle_id": "222이 2222",
-                                "vehicle_model": "홍진호카",
-                                "user_name": "김대표",
-                                "price": 22,
-                                "memo": "",
-                                "canceled": True,
-                                "cancel_fee": 123456,
-                            },
-                            {
-                                "id": 2,
-                                "date": "2022-06-04",
-                                "created_at": "2022-06-04T20:08:47",
-                                "insurance_company": "제휴사",
-                                "vehicle_id": "234나 5678",
-                                "vehicle_model": "롤스로이스",
-                                "user_name": "김대표",
-                                "price": 99999,
-                                "memo": "",
-                                "canceled": False,
-                                "cancel_fee": 0,
-                            },
-                            {
-                                "id": 1,
-                                "date": "2022-06-04",
-                                "created_at": "2022-06-04T20:08:16",
-                                "insurance_company": "애니카",
-                                "vehicle_id": "123가 1234",
-                                "vehicle_model": "벤츠 S500",
-                                "user_name": "김대표",
-                                "price": 1234,
-                                "memo": "",
-                                "canceled": False,
-                                "cancel_fee": 0,
+                "examples": {
+                    "pagination이 'offset'인 경우": {
+                        "value": {
+                            "success": True,
+                            "message": "OK",
+                            "result": {"total_length": 3, "transaction_list": transaction_list},
+                        }
+                    },
+                    "pagination이 'cursor'인 경우 (마지막 페이지라면 next_cursor는 null)": {
+                        "value": {
+                            "success": True,
+                            "message": "OK",
+                            "result": {
+                                "next_cursor": "WyJ0cmFuc2FjdGlvbl9pZCIsImRlc2MiLDIsMl0",
+                                "transaction_list": transaction_list[:2],
                             },
-                        ],
+                        }
                     },
                 }
             }
@@ -513,6 +595,36 @@ def get_transaction_table_response():
     return result
 
 
+def get_transaction_table_count_response():
+    result = deepcopy(DEFAULT_RESPONSES)
+    to_delete = [201]
+    for key in to_delete:
+        del result[key]
+    result[200] = {
+        "description": "요청이 성공적으로 처리되었을 경우",
+        "content": {"application/json": {"example": {"success": True, "message": "OK", "result": {"total_length": 3}}}},
+    }
+    return result
+
+
+def export_transaction_response():
+    result = deepcopy(DEFAULT_RESPONSES)
+    to_delete = [201]
+    for key in to_delete:
+        del result[key]
+    result[200] = {
+        "description": "요청이 성공적으로 처리되었을 경우 (gzip이 true이면 application/gzip으로 압축된 CSV)",
+        "content": {
+            "text/csv": {
+                "example": "id,date,created_at,insurance_company_name,vehicle_id,vehicle_model,user_name,user_id,"
+                + "price,memo,canceled,cancel_fee\n"
+                + "3,2022-02-22,2022-06-04 20:09:49,제휴사,222이 2222,홍진호카,김대표,1,22,,1,123456\n"
+            }
+        },
+    }
+    return result
+
+
 def get_specific_transaction_response():
     result = deepcopy(DEFAULT_RESPONSES)
     to_delete = [201, 409]
@@ -845,6 +957,26 @@ def create_company_invoice_response():
     return result
 
 
+def close_month_response():
+    result = deepcopy(DEFAULT_RESPONSES)
+    to_delete = [200]
+    for key in to_delete:
+        del result[key]
+    result[201] = {
+        "description": "요청 리소스가 성공적으로 생성되었을 경우 (created_object_id는 생성된 Company invoice의 id)",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "OK",
+                    "result": {"created_object_id": 1, "created_user_invoice_count": 12},
+                }
+            }
+        },
+    }
+    return result
+
+
 def get_company_invoice_response():
     result = deepcopy(DEFAULT_RESPONSES)
     to_delete = [201, 409]
@@ -1019,6 +1151,31 @@ def get_current_transaction_count_response():
     return result
 
 
+def get_dashboard_summary_response():
+    result = deepcopy(DEFAULT_RESPONSES)
+    to_delete = [201, 409, 422]
+    for key in to_delete:
+        del result[key]
+    result[200] = {
+        "description": "요청이 성공적으로 처리되었을 경우",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "OK",
+                    "result": {
+                        "current_month_revenue": {"revenue": 3000000, "difference_percentage": 20},
+                        "current_day_revenue": {"revenue": 300000, "difference_percentage": -10},
+                        "current_month_transaction_count": {"transaction_count": 120, "difference_count": 20},
+                        "current_day_transaction_count": {"transaction_count": 12, "difference_count": -2},
+                    },
+                }
+            }
+        },
+    }
+    return result
+
+
 def get_monthly_revenue_response():
     result = deepcopy(DEFAULT_RESPONSES)
     to_delete = [201, 409, 422]
@@ -1,306 +1,109 @@
 from calendar import monthrange
-from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
-from fastapi import APIRouter, Depends, Security
+from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
-from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy import desc, cast, Integer, String
+from sqlalchemy import case, desc, cast, Integer
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func, label
 
 from app.database.conn import db
-from app.database.schema import User, Transaction, UserInvoice, InsuranceCompany
+from app.database.schema import DailyRevenue, User, Transaction, UserInvoice, InsuranceCompany
 from app.responses import (
     get_current_month_member_revenue_rate_response,
     get_current_month_insurance_company_rate_response,
     get_current_revenue_response,
     get_current_transaction_count_response,
+    get_dashboard_summary_response,
     get_monthly_member_revenue_response,
     get_monthly_revenue_response,
 )
-from app.utils.auth import get_permission_info
-from app.utils.date import get_now_datetime
-from app.utils.jwt import auth_handler, authorization
+from app.utils.auth import AuthContext, require_permission
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.date import get_now_datetime, get_period_key
 
 router = APIRouter(prefix="/dashboard")
 true = True
 false = False
 
 
-@router.get("/current-month-revenue", status_code=200, responses=get_current_revenue_response())
-def get_current_month_revenue(
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+@router.get("/summary", status_code=200, responses=get_dashboard_summary_response())
+@dashboard_cache.cached()
+def get_dashboard_summary(
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    now = get_now_datetime()
-    current_start_date = now.strftime("%Y-%m-") + "01"
-    current_end_date = now.strftime("%Y-%m-%d")
-
-    previous_start_date = (now - relativedelta(months=1)).strftime("%Y-%m-") + "01"
-    previous_end_date = now - relativedelta(months=1)
-    previous_end_date = (
-        previous_end_date.strftime("%Y-%m-") + f"{monthrange(previous_end_date.year, previous_end_date.month)[1]:02}"
-    )
-
-    previous_non_canceled_revenue = (
-        session.query(func.sum(Transaction.price).label("previous_non_canceled_revenue"))
-        .filter(
-            Transaction.date.between(previous_start_date, previous_end_date),
-            Transaction.canceled == false,
-        )
-        .first()
-    )[0] or 0
-
-    previous_canceled_revenue = (
-        session.query(func.sum(Transaction.cancel_fee).label("previous_canceled_revenue"))
-        .filter(
-            Transaction.date.between(previous_start_date, previous_end_date),
-            Transaction.canceled == true,
-        )
-        .first()
-    )[0] or 0
-
-    previous_revenue = previous_non_canceled_revenue + previous_canceled_revenue
-
-    current_non_canceled_revenue = (
-        session.query(func.sum(Transaction.price).label("current_non_canceled_revenue"))
-        .filter(
-            Transaction.date.between(current_start_date, current_end_date),
-            Transaction.canceled == false,
-        )
-        .first()
-    )[0] or 0
-
-    current_canceled_revenue = (
-        session.query(func.sum(Transaction.cancel_fee).label("current_canceled_revenue"))
-        .filter(
-            Transaction.date.between(current_start_date, current_end_date),
-            Transaction.canceled == true,
-        )
-        .first()
-    )[0] or 0
-
-    current_revenue = int(current_non_canceled_revenue) + int(current_canceled_revenue)
+    result = {
+        "success": True,
+        "message": "OK",
+        "result": calculate_dashboard_summary(session=session),
+    }
+    return result
 
-    difference_percentage = (
-        round((current_revenue - previous_revenue) / previous_revenue * 100)
-        if current_revenue - previous_revenue
-        else 0
-    )
 
+@router.get("/current-month-revenue", status_code=200, responses=get_current_revenue_response())
+@dashboard_cache.cached()
+def get_current_month_revenue(
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
+) -> JSONResponse:
     result = {
         "success": True,
         "message": "OK",
-        "result": {
-            "revenue": current_revenue,
-            "difference_percentage": difference_percentage,
-        },
+        "result": calculate_dashboard_summary(session=session)["current_month_revenue"],
     }
     return result
 
 
 @router.get("/current-day-revenue", status_code=200, responses=get_current_revenue_response())
+@dashboard_cache.cached()
 def get_current_day_revenue(
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    now = get_now_datetime()
-    current_day = now.strftime("%Y-%m-%d")
-
-    previous_day = (now - relativedelta(days=1)).strftime("%Y-%m-%d")
-
-    previous_non_canceled_revenue = (
-        session.query(func.sum(Transaction.price).label("previous_non_canceled_revenue"))
-        .filter(
-            Transaction.date == previous_day,
-            Transaction.canceled == false,
-        )
-        .first()
-    )[0] or 0
-
-    previous_canceled_revenue = (
-        session.query(func.sum(Transaction.cancel_fee).label("previous_canceled_revenue"))
-        .filter(
-            Transaction.date == previous_day,
-            Transaction.canceled == true,
-        )
-        .first()
-    )[0] or 0
-
-    previous_revenue = previous_non_canceled_revenue + previous_canceled_revenue
-
-    current_non_canceled_revenue = (
-        session.query(func.sum(Transaction.price).label("current_non_canceled_revenue"))
-        .filter(
-            Transaction.date == current_day,
-            Transaction.canceled == false,
-        )
-        .first()
-    )[0] or 0
-
-    current_canceled_revenue = (
-        session.query(func.sum(Transaction.cancel_fee).label("current_canceled_revenue"))
-        .filter(
-            Transaction.date == current_day,
-            Transaction.canceled == true,
-        )
-        .first()
-    )[0] or 0
-
-    current_revenue = int(current_non_canceled_revenue) + int(current_canceled_revenue)
-
-    difference_percentage = (
-        round((current_revenue - previous_revenue) / previous_revenue * 100)
-        if current_revenue - previous_revenue
-        else 0
-    )
-
     result = {
         "success": True,
         "message": "OK",
-        "result": {
-            "revenue": current_revenue,
-            "difference_percentage": difference_percentage,
-        },
+        "result": calculate_dashboard_summary(session=session)["current_day_revenue"],
     }
     return result
 
 
 @router.get("/current-month-transaction-count", status_code=200, responses=get_current_transaction_count_response())
+@dashboard_cache.cached()
 def get_current_month_transaction_count(
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    now = get_now_datetime()
-    current_start_date = now.strftime("%Y-%m-") + "01"
-    current_end_date = now.strftime("%Y-%m-%d")
-
-    previous_start_date = (now - relativedelta(months=1)).strftime("%Y-%m-") + "01"
-    previous_end_date = now - relativedelta(months=1)
-    previous_end_date = (
-        previous_end_date.strftime("%Y-%m-") + f"{monthrange(previous_end_date.year, previous_end_date.month)[1]:02}"
-    )
-
-    previous_transaction_count = (
-        session.query(func.count(Transaction.id).label("previous_transaction_count"))
-        .filter(
-            Transaction.date.between(previous_start_date, previous_end_date),
-        )
-        .first()
-    )[0] or 0
-
-    current_transaction_count = (
-        session.query(func.count(Transaction.id).label("current_transaction_count"))
-        .filter(
-            Transaction.date.between(current_start_date, current_end_date),
-        )
-        .first()
-    )[0] or 0
-
-    difference_count = int(current_transaction_count - previous_transaction_count)
-
     result = {
         "success": True,
         "message": "OK",
-        "result": {
-            "transaction_count": current_transaction_count,
-            "difference_count": difference_count,
-        },
+        "result": calculate_dashboard_summary(session=session)["current_month_transaction_count"],
     }
     return result
 
 
 @router.get("/current-day-transaction-count", status_code=200, responses=get_current_transaction_count_response())
+@dashboard_cache.cached()
 def get_current_day_transaction_count(
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    now = get_now_datetime()
-    current_day = now.strftime("%Y-%m-%d")
-
-    previous_day = (now - relativedelta(days=1)).strftime("%Y-%m-%d")
-
-    previous_transaction_count = (
-        session.query(func.count(Transaction.id).label("previous_transaction_count"))
-        .filter(
-            Transaction.date == previous_day,
-        )
-        .first()
-    )[0] or 0
-
-    current_transaction_count = (
-        session.query(func.count(Transaction.id).label("current_transaction_count"))
-        .filter(
-            Transaction.date == current_day,
-        )
-        .first()
-    )[0] or 0
-
-    difference_count = int(current_transaction_count - previous_transaction_count)
-
     result = {
         "success": True,
         "message": "OK",
-        "result": {
-            "transaction_count": current_transaction_count,
-            "difference_count": difference_count,
-        },
+        "result": calculate_dashboard_summary(session=session)["current_day_transaction_count"],
     }
     return result
 
 
 @router.get("/monthly-revenue/{month_range}", status_code=200, responses=get_monthly_revenue_response())
+@dashboard_cache.cached(months=lambda month_range=0: max(month_range, 0))
 def get_monthly_revenue(
     month_range: int = 0,
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     if month_range <= 0:
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 데이터입니다!"))
 
@@ -308,29 +111,14 @@ def get_monthly_revenue(
     current_start_date = now.strftime("%Y-%m-") + "01"
     current_end_date = now.strftime("%Y-%m-%d")
 
-    current_non_canceled_revenue = int(
+    current_revenue = int(
         (
-            session.query(func.sum(Transaction.price).label("revenue"))
-            .filter(
-                Transaction.date.between(current_start_date, current_end_date),
-                Transaction.canceled == false,
-            )
+            session.query(func.sum(DailyRevenue.revenue + DailyRevenue.cancel_fee).label("revenue"))
+            .filter(DailyRevenue.date.between(current_start_date, current_end_date))
             .first()
         )[0]
         or 0
     )
-    current_canceled_revenue = int(
-        (
-            session.query(func.sum(Transaction.cancel_fee).label("revenue"))
-            .filter(
-                Transaction.date.between(current_start_date, current_end_date),
-                Transaction.canceled == true,
-            )
-            .first()
-        )[0]
-        or 0
-    )
-    current_revenue = current_non_canceled_revenue + current_canceled_revenue
     current_revenue_obj = {
         "year": now.year,
         "month": now.month,
@@ -343,56 +131,17 @@ def get_monthly_revenue(
         previous_start_date = now - relativedelta(months=month_range - 1)
         previous_end_date = now - relativedelta(months=1)
 
-        last_date = (
-            session.query(
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
-            )
-            .select_from(UserInvoice)
-            .order_by(
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
-            )
-            .first()
-        )
-
-        if previous_start_date.year < last_date[0] and previous_start_date.month < last_date[1]:
-            previous_start_date = datetime(last_date[0], last_date[1], 1)
-
-        sub_query = (
-            session.query(
-                label("date", cast(UserInvoice.year, String) + "-" + cast(UserInvoice.month, String)),
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
+        # 연월 키(year * 100 + month) 범위로 바로 집계하므로 ix_user_invoice_period_revenue만 읽음
+        revenue_list = [
+            {"year": row.period // 100, "month": row.period % 100, "revenue": int(row.revenue or 0)}
+            for row in session.query(
+                UserInvoice.period.label("period"),
                 func.sum(UserInvoice.revenue).label("revenue"),
             )
-            .group_by(
-                UserInvoice.year,
-                UserInvoice.month,
-            )
-            .subquery()
-        )
-
-        previous_revenue_list = (
-            session.query(
-                sub_query.c.year.label("year"),
-                sub_query.c.month.label("month"),
-                sub_query.c.revenue.label("revenue"),
-            )
-            .select_from(sub_query)
-            .filter(
-                sub_query.c.date.between(
-                    f"{previous_start_date.year}-{previous_start_date.month}",
-                    f"{previous_end_date.year}-{previous_end_date.month}",
-                )
-            )
-            .order_by(
-                sub_query.c.year,
-                sub_query.c.month,
-            )
-            .all()
-        )
-        revenue_list = previous_revenue_list
+            .filter(UserInvoice.period.between(get_period_key(previous_start_date), get_period_key(previous_end_date)))
+            .group_by(UserInvoice.period)
+            .order_by(UserInvoice.period)
+        ]
 
     revenue_list.append(current_revenue_obj)
     result = {
@@ -407,19 +156,11 @@ def get_monthly_revenue(
 
 
 @router.get("/monthly-member-revenue", status_code=200, responses=get_monthly_member_revenue_response())
+@dashboard_cache.cached(months=1)
 def get_monthly_member_revenue(
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     now = get_now_datetime()
     current_start_date = now.strftime("%Y-%m-") + "01"
     current_end_date = now.strftime("%Y-%m-%d")
@@ -471,19 +212,11 @@ def get_monthly_member_revenue(
 @router.get(
     "/current-month-member-revenue-rate", status_code=200, responses=get_current_month_member_revenue_rate_response()
 )
+@dashboard_cache.cached()
 def get_current_month_member_revenue_rate(
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     now = get_now_datetime()
     previous_date = now - relativedelta(months=1)
 
@@ -493,10 +226,7 @@ def get_current_month_member_revenue_rate(
     previous_total_revenue = int(
         (
             session.query(func.sum(UserInvoice.revenue).label("revenue"))
-            .filter(
-                UserInvoice.year == previous_date.year,
-                UserInvoice.month == previous_date.month,
-            )
+            .filter(UserInvoice.period == get_period_key(previous_date))
             .first()[0]
             or 0
         )
@@ -513,10 +243,7 @@ def get_current_month_member_revenue_rate(
             User,
             User.id == UserInvoice.user_id,
         )
-        .filter(
-            UserInvoice.year == previous_date.year,
-            UserInvoice.month == previous_date.month,
-        )
+        .filter(UserInvoice.period == get_period_key(previous_date))
         .group_by(
             User.name,
             User.id,
@@ -642,19 +369,11 @@ def get_current_month_member_revenue_rate(
     status_code=200,
     responses=get_current_month_insurance_company_rate_response(),
 )
+@dashboard_cache.cached()
 def get_current_month_insurance_company_rate(
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     now = get_now_datetime()
     previous_start_date = (now - relativedelta(months=1)).strftime("%Y-%m-") + "01"
     previous_end_date = now - relativedelta(months=1)
@@ -751,3 +470,71 @@ def get_current_month_insurance_company_rate(
         },
     }
     return result
+
+
+def calculate_dashboard_summary(session: Session) -> dict:
+    """
+    대시보드 타일(월/일 매출, 월/일 거래 건수)과 직전 기간 대비 증감을
+    daily_revenue 집계에 대한 CASE WHEN 조건부 집계 쿼리 한 번으로 계산
+    """
+    now = get_now_datetime()
+    current_day = now.strftime("%Y-%m-%d")
+    current_month_start_date = now.strftime("%Y-%m-") + "01"
+
+    previous_day = (now - relativedelta(days=1)).strftime("%Y-%m-%d")
+    previous_month = now - relativedelta(months=1)
+    previous_month_start_date = previous_month.strftime("%Y-%m-") + "01"
+    previous_month_end_date = (
+        previous_month.strftime("%Y-%m-") + f"{monthrange(previous_month.year, previous_month.month)[1]:02}"
+    )
+
+    periods = {
+        "current_month": (current_month_start_date, current_day),
+        "previous_month": (previous_month_start_date, previous_month_end_date),
+        "current_day": (current_day, current_day),
+        "previous_day": (previous_day, previous_day),
+    }
+
+    columns = []
+    for name, (start_date, end_date) in periods.items():
+        in_period = DailyRevenue.date.between(start_date, end_date)
+        columns.append(
+            func.sum(case((in_period, DailyRevenue.revenue + DailyRevenue.cancel_fee), else_=0)).label(
+                f"{name}_revenue"
+            )
+        )
+        columns.append(
+            func.sum(case((in_period, DailyRevenue.transaction_count), else_=0)).label(f"{name}_transaction_count")
+        )
+
+    # 전일은 항상 전월 1일 이후이므로 전월 1일 ~ 금일 범위의 일별 집계만 읽음
+    row = (
+        session.query(*columns)
+        .filter(DailyRevenue.date.between(previous_month_start_date, current_day))
+        .first()
+    )
+    totals = {key: int(value or 0) for key, value in row._asdict().items()}
+
+    result = {}
+    for period in ["month", "day"]:
+        current_revenue = totals[f"current_{period}_revenue"]
+        previous_revenue = totals[f"previous_{period}_revenue"]
+        result[f"current_{period}_revenue"] = {
+            "revenue": current_revenue,
+            "difference_percentage": get_difference_percentage(current_revenue, previous_revenue),
+        }
+
+        current_transaction_count = totals[f"current_{period}_transaction_count"]
+        previous_transaction_count = totals[f"previous_{period}_transaction_count"]
+        result[f"current_{period}_transaction_count"] = {
+            "transaction_count": current_transaction_count,
+            "difference_count": current_transaction_count - previous_transaction_count,
+        }
+
+    return result
+
+
+def get_difference_percentage(current: int, previous: int) -> int:
+    if current == previous or not previous:
+        return 0
+    return round((current - previous) / previous * 100)
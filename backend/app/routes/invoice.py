@@ -2,10 +2,10 @@ from calendar import monthrange
 from datetime import datetime
 from typing import Union
 
-from fastapi import APIRouter, Depends, Security
+from fastapi import APIRouter, Depends
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
-from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import case, insert
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 
@@ -40,14 +40,16 @@ from app.responses import (
     update_company_invoice_extra_response,
     delete_company_invoice_extra_response,
     create_company_invoice_response,
+    close_month_response,
     get_company_invoice_response,
     get_monthly_cancel_fee_response,
     get_monthly_revenue_response,
     get_monthly_plate_fee_response,
     get_monthly_employee_salary_response,
 )
-from app.utils.auth import get_permission_info
-from app.utils.jwt import auth_handler, authorization
+from app.utils.auth import AuthContext, get_auth_context, require_permission
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.date import get_now_datetime
 
 
 router = APIRouter(prefix="/invoice")
@@ -59,13 +61,11 @@ false = False
 def create_user_invoice_extra(
     request_info: UserInvoiceExtraCreate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `User invoice extra 생성 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{request_info.year}-{request_info.month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
@@ -74,7 +74,7 @@ def create_user_invoice_extra(
     if not is_extra_name_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_extra_name_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
 
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
@@ -119,27 +119,25 @@ def get_user_invoice_extra(
     year: str = None,
     month: str = None,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `User invoice extra 조회 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{year}-{month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
     if permission_info.invoice == "SR" and user_id is not None:
-        if user_id != user_id_from_jwt:
+        if user_id != auth.user_id:
             return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
     if user_id is None:
-        user_id = user_id_from_jwt
+        user_id = auth.user_id
 
     user = User.get(session=session, id=user_id)
     if not user:
@@ -166,18 +164,16 @@ def update_user_invoice_extra(
     extra_id: int,
     request_info: UserInvoiceExtraUpdate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `User invoice extra 수정 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_extra_name_valid = validate_extra_name(request_info.name)
     if not is_extra_name_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_extra_name_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
 
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
@@ -224,19 +220,11 @@ def update_user_invoice_extra(
 def delete_user_invoice_extra(
     extra_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(require_permission(transaction=["ARW"])),
 ) -> JSONResponse:
     """
     `User invoice extra 삭제 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-    if permission_info.transaction != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     user_invoice_extra = UserInvoiceExtra.get(session=session, id=extra_id)
     if not user_invoice_extra:
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 수당입니다!"))
@@ -264,18 +252,16 @@ def delete_user_invoice_extra(
 def create_user_invoice(
     request_info: UserInvoiceCreate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `User invoice 생성 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{request_info.year}-{request_info.month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -293,6 +279,7 @@ def create_user_invoice(
 
     try:
         created_object_id = UserInvoice.create(session=session, auto_commit=True, **to_create).id
+        dashboard_cache.invalidate((request_info.year, request_info.month))
         return JSONResponse(
             status_code=201, content=dict(success=True, message="OK", result=dict(created_object_id=created_object_id))
         )
@@ -306,28 +293,26 @@ def get_user_invoice(
     user_id: Union[int, None] = None,
     year: str = None,
     month: str = None,
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `User invoice 조회 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{year}-{month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
     if permission_info.invoice == "SR" and user_id is not None:
-        if user_id != user_id_from_jwt:
+        if user_id != auth.user_id:
             return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
     if user_id is None:
-        user_id = user_id_from_jwt
+        user_id = auth.user_id
 
     user = User.get(session=session, id=user_id)
     if not user:
@@ -349,6 +334,7 @@ def get_user_invoice(
         )
         del user_invoice["created_at"]
         del user_invoice["updated_at"]
+        del user_invoice["period"]
         user_invoice["extra"] = extra
         result = {"success": True, "message": "OK", "result": user_invoice}
         return result
@@ -363,13 +349,11 @@ def get_user_invoice(
 def create_company_invoice_extra(
     request_info: CompanyInvoiceExtraCreate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `Company invoice extra 생성 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{request_info.year}-{request_info.month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
@@ -378,7 +362,7 @@ def create_company_invoice_extra(
     if not is_extra_name_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_extra_name_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
 
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
@@ -416,18 +400,16 @@ def get_company_invoice_extra(
     year: str = None,
     month: str = None,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `Company invoice extra 조회 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{year}-{month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -454,18 +436,16 @@ def update_company_invoice_extra(
     extra_id: int,
     request_info: CompanyInvoiceExtraUpdate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `Company invoice extra 수정 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_extra_name_valid = validate_extra_name(request_info.name)
     if not is_extra_name_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_extra_name_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
 
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
@@ -510,19 +490,11 @@ def update_company_invoice_extra(
 def delete_company_invoice_extra(
     extra_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(require_permission(transaction=["ARW"])),
 ) -> JSONResponse:
     """
     `Company invoice extra 삭제 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-    if permission_info.transaction != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     company_invoice_extra = CompanyInvoiceExtra.get(session=session, id=extra_id)
     if not company_invoice_extra:
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 수당입니다!"))
@@ -549,18 +521,16 @@ def delete_company_invoice_extra(
 def create_company_invoice(
     request_info: CompanyInvoiceCreate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `Company invoice 생성 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{request_info.year}-{request_info.month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -596,6 +566,7 @@ def create_company_invoice(
 
     try:
         created_object_id = CompanyInvoice.create(session=session, auto_commit=True, **to_create).id
+        dashboard_cache.invalidate((request_info.year, request_info.month))
         return JSONResponse(
             status_code=201, content=dict(success=True, message="OK", result=dict(created_object_id=created_object_id))
         )
@@ -604,23 +575,108 @@ def create_company_invoice(
         return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
 
 
+@router.post("/close", status_code=201, responses=close_month_response())
+def close_month(
+    request_info: CompanyInvoiceCreate,
+    session: Session = Depends(db.session),
+    auth: AuthContext = Depends(get_auth_context),
+) -> JSONResponse:
+    """
+    `월 마감 API`
+    아직 정산되지 않은 모든 직원의 User invoice와 Company invoice를 한 트랜잭션에서 생성한다.
+    """
+    is_date_valid = validate_date(f"{request_info.year}-{request_info.month}-01")
+    if not is_date_valid["success"]:
+        return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
+
+    permission_info = auth.permission
+    if not permission_info:
+        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
+
+    if permission_info.invoice != "ARW":
+        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
+
+    year = int(request_info.year)
+    month = int(request_info.month)
+    if CompanyInvoice.get(session=session, year=year, month=month):
+        return JSONResponse(status_code=400, content=dict(success=False, message="이미 마감된 월입니다!"))
+
+    users = (
+        session.query(User)
+        .join(Permission, User.id == Permission.user_id)
+        .filter(
+            User.status == "accepted",
+            Permission.invoice != "ARW",
+        )
+        .order_by(User.id)
+        .all()
+    )
+    closed_user_ids = {
+        row.user_id
+        for row in session.query(UserInvoice.user_id).filter(
+            UserInvoice.year == year,
+            UserInvoice.month == month,
+            UserInvoice.user_id.in_([user.id for user in users]),
+        )
+    }
+    user_invoices = calculate_all_user_invoices(
+        users=[user for user in users if user.id not in closed_user_ids],
+        year=request_info.year,
+        month=request_info.month,
+        session=session,
+    )
+
+    now = get_now_datetime()
+    to_create = []
+    for user_invoice in user_invoices:
+        del user_invoice["extra"]
+        user_invoice.update(year=year, month=month, created_at=now, updated_at=now)
+        to_create.append(user_invoice)
+
+    try:
+        if to_create:
+            session.execute(insert(UserInvoice).values(to_create))
+        company_invoice = calculate_company_invoice(
+            year=request_info.year,
+            month=request_info.month,
+            rental_fee=request_info.rental_fee,
+            maintenance_fee=request_info.maintenance_fee,
+            session=session,
+        )
+        del company_invoice["extra"]
+        created_object_id = CompanyInvoice.create(session=session, **company_invoice).id
+        session.commit()
+    except Exception as e:
+        print(e)
+        session.rollback()
+        return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
+    dashboard_cache.invalidate((year, month))
+
+    return JSONResponse(
+        status_code=201,
+        content=dict(
+            success=True,
+            message="OK",
+            result=dict(created_object_id=created_object_id, created_user_invoice_count=len(to_create)),
+        ),
+    )
+
+
 @router.get("/company", status_code=200, responses=get_company_invoice_response())
 def get_company_invoice(
     year: str = None,
     month: str = None,
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `Company invoice 조회 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{year}-{month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -658,6 +714,7 @@ def get_company_invoice(
         )
         del company_invoice["created_at"]
         del company_invoice["updated_at"]
+        del company_invoice["period"]
         company_invoice["extra"] = extra
         result = {"success": True, "message": "OK", "result": company_invoice}
         return result
@@ -673,18 +730,16 @@ def get_monthly_cancel_fee(
     year: str = None,
     month: str = None,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `월별 총 취소 수수료 조회 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{year}-{month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -713,18 +768,16 @@ def get_monthly_revenue(
     year: str = None,
     month: str = None,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `월별 총 매출 조회 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{year}-{month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -763,18 +816,16 @@ def get_monthly_plate_fee(
     year: str = None,
     month: str = None,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `월별 총 지입료 조회 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{year}-{month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -816,18 +867,16 @@ def get_monthly_employee_salary(
     year: str = None,
     month: str = None,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `월별 총 직원 급여 조회 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_date_valid = validate_date(f"{year}-{month}-01")
     if not is_date_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -917,6 +966,91 @@ def calculate_user_invoice(
         with_entities=[UserInvoiceExtra.name, UserInvoiceExtra.price],
     ).all()
 
+    return compose_user_invoice(
+        user=user,
+        user_id=user_id,
+        year=year,
+        month=month,
+        transaction_count=transaction_count,
+        canceled_transaction_count=canceled_transaction_count,
+        revenue=revenue,
+        cancel_fee=cancel_fee,
+        extra=extra,
+    )
+
+
+def calculate_all_user_invoices(users: list, year: str, month: str, session: Session) -> list:
+    """
+    여러 직원의 급여 정산을 한 번에 계산 (직원 수와 관계없이 집계 쿼리 1회 + 추가 항목 쿼리 1회)
+    :param users: 정산 대상 User 목록
+    :return: calculate_user_invoice와 같은 형식의 dict 목록
+    """
+    if not users:
+        return []
+
+    start_date = f"{year}-{month}-01"
+    end_date = f"{year}-{month}-{monthrange(int(year), int(month))[1]:02}"
+    user_ids = [user.id for user in users]
+
+    aggregates = (
+        session.query(
+            Transaction.user_id,
+            func.count(Transaction.id).label("transaction_count"),
+            func.sum(case((Transaction.canceled == true, 1), else_=0)).label("canceled_transaction_count"),
+            func.sum(case((Transaction.canceled == false, Transaction.price), else_=0)).label("revenue"),
+            func.sum(case((Transaction.canceled == true, Transaction.cancel_fee), else_=0)).label("cancel_fee"),
+        )
+        .filter(
+            Transaction.user_id.in_(user_ids),
+            Transaction.date.between(start_date, end_date),
+        )
+        .group_by(Transaction.user_id)
+        .all()
+    )
+    aggregates = {row.user_id: row for row in aggregates}
+
+    extras = {}
+    for row in (
+        session.query(UserInvoiceExtra.user_id, UserInvoiceExtra.name, UserInvoiceExtra.price)
+        .filter(
+            UserInvoiceExtra.user_id.in_(user_ids),
+            UserInvoiceExtra.year == int(year),
+            UserInvoiceExtra.month == int(month),
+        )
+        .order_by(UserInvoiceExtra.id)
+    ):
+        extras.setdefault(row.user_id, []).append(row)
+
+    result = []
+    for user in users:
+        aggregate = aggregates.get(user.id)
+        result.append(
+            compose_user_invoice(
+                user=user,
+                user_id=user.id,
+                year=year,
+                month=month,
+                transaction_count=aggregate.transaction_count if aggregate else 0,
+                canceled_transaction_count=int(aggregate.canceled_transaction_count or 0) if aggregate else 0,
+                revenue=int(aggregate.revenue or 0) if aggregate else 0,
+                cancel_fee=int(aggregate.cancel_fee or 0) if aggregate else 0,
+                extra=extras.get(user.id, []),
+            )
+        )
+    return result
+
+
+def compose_user_invoice(
+    user: User,
+    user_id: int,
+    year: str,
+    month: str,
+    transaction_count: int,
+    canceled_transaction_count: int,
+    revenue: int,
+    cancel_fee: int,
+    extra: list,
+) -> dict:
     contract_fee = user.contract_fee
     plate_fee = user.plate_fee
     total_revenue = revenue + cancel_fee
@@ -1,18 +1,28 @@
 from datetime import datetime
+from threading import Lock
+from typing import Optional
+import base64
+import csv
+import io
+import json
 import re
-
-from fastapi import APIRouter, Depends, Security
-from fastapi.responses import JSONResponse
-from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy import asc, desc
+import zlib
+
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, asc, desc, func, insert, or_
 from sqlalchemy.orm import Session
 
 from app.database.conn import db
-from app.database.schema import InsuranceCompany, Transaction, User
+from app.database.schema import DailyRevenue, InsuranceCompany, Transaction, User
 from app.models import (
     InsuranceCompanyCreate,
     InsuranceCompanyUpdate,
     TransactionCreate,
+    TransactionExport,
     TransactionUpdate,
     TransactionTable,
 )
@@ -23,36 +33,62 @@ from app.responses import (
     update_insurance_company_response,
     delete_insurance_company_response,
     create_transaction_response,
+    bulk_create_transaction_request_body,
+    bulk_create_transaction_response,
     get_transaction_table_response,
+    get_transaction_table_count_response,
+    export_transaction_response,
     get_specific_transaction_response,
     update_transaction_response,
     delete_transaction_response,
 )
-from app.utils.auth import get_permission_info
-from app.utils.jwt import auth_handler, authorization
+from app.utils.auth import AuthContext, get_auth_context, require_permission
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.date import get_now_datetime
 
 
 router = APIRouter(prefix="/transaction")
 true = True
 false = False
 
+transaction_count_cache = TTLCache(maxsize=256, ttl=60)
+transaction_count_cache_info = {"generation": 0}
+transaction_count_lock = Lock()
+
+BULK_CREATE_MAX_ROWS = 5000
+BULK_CREATE_CHUNK_SIZE = 500
+
+TRANSACTION_EXPORT_CHUNK_SIZE = 1000
+TRANSACTION_EXPORT_COLUMNS = [
+    "id",
+    "date",
+    "created_at",
+    "insurance_company_name",
+    "vehicle_id",
+    "vehicle_model",
+    "user_name",
+    "user_id",
+    "price",
+    "memo",
+    "canceled",
+    "cancel_fee",
+]
+
 
 @router.post("/insurancecompany", status_code=201, responses=create_insurance_company_response())
 def create_insurance_company(
     request_info: InsuranceCompanyCreate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `보험사 생성 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_company_name_valid = validate_company_name(request_info.name)
     if not is_company_name_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_company_name_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
 
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
@@ -76,17 +112,11 @@ def create_insurance_company(
 @router.get("/insurancecompany", status_code=200, responses=get_all_insurance_company_response())
 def get_all_insurance_company(
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(require_permission()),
 ) -> JSONResponse:
     """
     `모든 보험사 정보 받아오는 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     insurance_companies = (
         InsuranceCompany.filter(session=session, with_entities=[InsuranceCompany.id, InsuranceCompany.name])
         .order_by("id")
@@ -102,17 +132,11 @@ def get_all_insurance_company(
 def get_specific_insurance_company(
     insurance_company_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(require_permission()),
 ) -> JSONResponse:
     """
     `특정 보험사 정보 받아오는 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     insurance_company = InsuranceCompany.get(
         session=session, id=insurance_company_id, with_entities=[InsuranceCompany.id, InsuranceCompany.name]
     )
@@ -128,18 +152,16 @@ def update_insurance_company(
     insurance_company_id: int,
     request_info: InsuranceCompanyUpdate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `보험사 수정 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_company_name_valid = validate_company_name(request_info.name)
     if not is_company_name_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_company_name_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
     if permission_info.transaction != "ARW":
@@ -170,19 +192,11 @@ def update_insurance_company(
 def delete_insurance_company(
     insurance_company_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(require_permission(transaction=["ARW"])),
 ) -> JSONResponse:
     """
     `보험사 삭제 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-    if permission_info.transaction != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     if not InsuranceCompany.get(session=session, id=insurance_company_id):
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 보험사입니다!"))
 
@@ -209,14 +223,12 @@ def delete_insurance_company(
 def create_transaction(
     request_info: TransactionCreate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `거래 생성 API`
     """
 
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_vehicle_id_valid = validate_vehicle_id(request_info.vehicle_id)
     if not is_vehicle_id_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_vehicle_id_valid["detail"]))
@@ -236,7 +248,7 @@ def create_transaction(
     else:
         request_info.memo = ""
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -251,7 +263,7 @@ def create_transaction(
                 status_code=400, content=dict(success=False, message="존재하지 않거나 탈퇴된 계정이 거래 담당자로 지정되었습니다!")
             )
     else:
-        request_info.user_id = user_id_from_jwt
+        request_info.user_id = auth.user_id
 
     if not InsuranceCompany.get(session=session, id=request_info.insurance_company_id):
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 보험사입니다!"))
@@ -268,6 +280,8 @@ def create_transaction(
             price=request_info.price,
             memo=request_info.memo,
         ).id
+        invalidate_transaction_count_cache()
+        dashboard_cache.invalidate(request_info.date)
         return JSONResponse(
             status_code=201, content=dict(success=True, message="OK", result=dict(created_object_id=created_object_id))
         )
@@ -276,51 +290,81 @@ def create_transaction(
         return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
 
 
+@router.post(
+    "/bulk",
+    status_code=201,
+    responses=bulk_create_transaction_response(),
+    openapi_extra=bulk_create_transaction_request_body(),
+)
+async def bulk_create_transaction(
+    request: Request,
+    session: Session = Depends(db.session),
+    auth: AuthContext = Depends(get_auth_context),
+) -> JSONResponse:
+    """
+    `거래 일괄 생성 API`
+    Content-Type이 text/csv이면 CSV(첫 줄은 컬럼명), 그 외에는 JSON 배열로 처리한다.
+    한 건이라도 유효하지 않으면 아무것도 적재하지 않고 행별 오류를 반환한다.
+    """
+
+    body = await request.body()
+    try:
+        if "text/csv" in request.headers.get("content-type", ""):
+            raw_rows = parse_transaction_csv(body)
+        else:
+            raw_rows = json.loads(body)
+            if not isinstance(raw_rows, list) or not all(isinstance(row, dict) for row in raw_rows):
+                raise ValueError()
+    except Exception as e:
+        print(e)
+        return JSONResponse(status_code=400, content=dict(success=False, message="CSV 또는 JSON 배열 형식이 올바르지 않습니다!"))
+
+    if not raw_rows:
+        return JSONResponse(status_code=400, content=dict(success=False, message="생성할 거래를 입력해 주세요!"))
+
+    if len(raw_rows) > BULK_CREATE_MAX_ROWS:
+        return JSONResponse(
+            status_code=400,
+            content=dict(success=False, message=f"한 번에 최대 {BULK_CREATE_MAX_ROWS}건까지 생성할 수 있습니다!"),
+        )
+
+    return await run_in_threadpool(
+        bulk_create_transaction_rows, session=session, raw_rows=raw_rows, auth=auth
+    )
+
+
 @router.post("/table", status_code=200, responses=get_transaction_table_response())
 def get_transaction_table(
     request_info: TransactionTable,
-    session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `거래 테이블 조회 API`
+    pagination이 "cursor"인 경우 OFFSET 대신 (정렬 컬럼, 거래 id) 기준으로 다음 페이지를 찾고,
+    total_length 대신 next_cursor를 반환한다. (전체 건수는 `/table/count`로 따로 조회)
+    transaction_list의 각 거래에는 user_id 정렬의 cursor 값으로 쓰이는 user_id가 포함된다.
     """
 
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if request_info.user_id is not None:
-        if permission_info.transaction == "SRW":
-            return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-        else:
-            if not User.filter(session=session, id=request_info.user_id, status__in=["accepted", "deleted"]).first():
-                return JSONResponse(status_code=400, content=dict(success=False, message="조회 대상 계정은 존재하지 않거나 탈퇴되었습니다!"))
-    else:
-        if permission_info.transaction == "SRW":
-            request_info.user_id = user_id_from_jwt
+    permission_info = auth.permission
+    error_response = validate_transaction_table(
+        session=session, request_info=request_info, permission_info=permission_info, user_id_from_jwt=auth.user_id
+    )
+    if error_response:
+        return error_response
 
-    start_date = request_info.start_date
-    end_date = request_info.end_date
-    user_id = request_info.user_id
-    insurance_company_id = request_info.insurance_company_id
     page = request_info.page
     limit = request_info.limit
-    canceled_type = request_info.canceled_type
     order_by = request_info.order_by
     order_type = request_info.order_type
 
     order_by_dict = {
         "transaction_id": Transaction.id,
-        "user_id": User.id,
+        "user_id": Transaction.user_id,
         "price": Transaction.price,
         "cancel_fee": Transaction.cancel_fee,
     }
-
-    order_by = order_by_dict[order_by]
-    order_by = desc(order_by) if order_type == "desc" else asc(order_by)
+    order_column = order_by_dict[order_by]
 
     main_query = (
         session.query(
@@ -331,6 +375,7 @@ def get_transaction_table(
             Transaction.vehicle_id,
             Transaction.vehicle_model,
             User.name.label("user_name"),
+            Transaction.user_id,
             Transaction.price,
             Transaction.memo,
             Transaction.canceled,
@@ -339,31 +384,53 @@ def get_transaction_table(
         .join(InsuranceCompany, Transaction.insurance_company_id == InsuranceCompany.id)
         .join(User, Transaction.user_id == User.id)
     )
+    main_query = apply_transaction_table_filters(query=main_query, request_info=request_info)
+
+    if request_info.pagination == "cursor":
+        if request_info.cursor is not None:
+            cursor = decode_transaction_cursor(request_info.cursor)
+            if not cursor or cursor["order_by"] != order_by or cursor["order_type"] != order_type:
+                return JSONResponse(status_code=400, content=dict(success=False, message="cursor가 올바르지 않습니다!"))
+            main_query = main_query.filter(
+                get_keyset_condition(
+                    column=order_column,
+                    order_type=order_type,
+                    last_value=cursor["last_value"],
+                    last_id=cursor["last_id"],
+                )
+            )
 
-    if start_date is not None and end_date is not None:
-        for date in [start_date, end_date]:
-            is_date_valid = validate_date(date)
-            if not is_date_valid["success"]:
-                return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
-        if start_date > end_date:
-            return JSONResponse(status_code=400, content=dict(success=False, message="조회 기간 설정이 올바르지 않습니다!"))
-        main_query = main_query.filter(Transaction.date.between(start_date, end_date))
-
-    if user_id is not None:
-        main_query = main_query.filter(User.id == user_id)
+        if order_column is Transaction.id:
+            order_clauses = [desc(Transaction.id) if order_type == "desc" else asc(Transaction.id)]
+        elif order_type == "desc":
+            order_clauses = [desc(order_column), desc(Transaction.id)]
+        else:
+            order_clauses = [asc(order_column), asc(Transaction.id)]
+
+        # 다음 페이지 존재 여부를 COUNT 없이 알기 위해 한 건 더 조회한다.
+        rows = main_query.order_by(*order_clauses).limit(limit + 1).all()
+        transaction_list = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last_row = transaction_list[-1]
+            next_cursor = encode_transaction_cursor(
+                order_by=order_by,
+                order_type=order_type,
+                last_value=getattr(last_row, "id" if order_by == "transaction_id" else order_by),
+                last_id=last_row.id,
+            )
 
-    if insurance_company_id is not None:
-        if not InsuranceCompany.get(session=session, id=insurance_company_id):
-            return JSONResponse(status_code=400, content=dict(success=False, message="조회 대상 보험사가 존재하지 않습니다!"))
-        main_query = main_query.filter(InsuranceCompany.id == insurance_company_id)
+        result = {
+            "success": True,
+            "message": "OK",
+            "result": {"next_cursor": next_cursor, "transaction_list": transaction_list},
+        }
+        return result
 
-    if canceled_type == "EXCLUDE_CANCELED":
-        main_query = main_query.filter(Transaction.canceled == false)
-    elif canceled_type == "CANCELED_ONLY":
-        main_query = main_query.filter(Transaction.canceled == true)
+    order_clause = desc(order_column) if order_type == "desc" else asc(order_column)
 
-    total_length = main_query.count()
-    transaction_list = main_query.order_by(order_by).offset(page * limit).limit(limit).all()
+    total_length = count_transaction_table(session=session, request_info=request_info)
+    transaction_list = main_query.order_by(order_clause).offset(page * limit).limit(limit).all()
 
     result = {
         "success": True,
@@ -373,19 +440,71 @@ def get_transaction_table(
     return result
 
 
+@router.post("/table/count", status_code=200, responses=get_transaction_table_count_response())
+def get_transaction_table_count(
+    request_info: TransactionTable,
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(get_auth_context),
+) -> JSONResponse:
+    """
+    `거래 테이블 전체 건수 조회 API`
+    """
+
+    permission_info = auth.permission
+    error_response = validate_transaction_table(
+        session=session, request_info=request_info, permission_info=permission_info, user_id_from_jwt=auth.user_id
+    )
+    if error_response:
+        return error_response
+
+    total_length = get_cached_transaction_table_count(session=session, request_info=request_info)
+
+    result = {"success": True, "message": "OK", "result": {"total_length": total_length}}
+    return result
+
+
+@router.post("/export", status_code=200, responses=export_transaction_response())
+def export_transaction(
+    request_info: TransactionExport,
+    session: Session = Depends(db.read_session),
+    auth: AuthContext = Depends(get_auth_context),
+) -> StreamingResponse:
+    """
+    `거래 CSV 내보내기 API`
+    거래 테이블 조회 API와 같은 조건으로 조회 결과 전체를 CSV로 스트리밍한다. (page, limit, cursor는 무시)
+    """
+
+    permission_info = auth.permission
+    error_response = validate_transaction_table(
+        session=session, request_info=request_info, permission_info=permission_info, user_id_from_jwt=auth.user_id
+    )
+    if error_response:
+        return error_response
+
+    filename = f"transaction_{get_now_datetime().strftime('%Y%m%d%H%M%S')}.csv"
+    media_type = "text/csv"
+    if request_info.gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        content=stream_transaction_csv(request_info=request_info),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{transaction_id}", status_code=200, responses=get_specific_transaction_response())
 def get_specific_transaction(
     transaction_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `특정 거래 조회 API`
     """
 
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -393,7 +512,7 @@ def get_specific_transaction(
     if not transaction:
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 거래입니다!"))
 
-    if transaction.user_id != user_id_from_jwt and permission_info.transaction == "SRW":
+    if transaction.user_id != auth.user_id and permission_info.transaction == "SRW":
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
     transaction = (
@@ -425,15 +544,13 @@ def update_transaction(
     transaction_id: int,
     request_info: TransactionUpdate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `거래 수정 API`
     """
 
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -442,7 +559,7 @@ def update_transaction(
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 거래입니다!"))
 
     if permission_info.transaction == "SRW":
-        if transaction.user_id != user_id_from_jwt:
+        if transaction.user_id != auth.user_id:
             return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
     to_update_at = {}
@@ -499,8 +616,11 @@ def update_transaction(
     if not to_update_at:
         return JSONResponse(status_code=400, content=dict(success=False, message="수정할 값을 입력해 주세요!"))
 
+    previous_date = transaction.date
     try:
         Transaction.filter(session=session, id=transaction_id).update(auto_commit=True, **to_update_at)
+        invalidate_transaction_count_cache()
+        dashboard_cache.invalidate(previous_date, request_info.date)
         return JSONResponse(
             status_code=200, content=dict(success=True, message="OK", result=dict(updated_object_id=transaction_id))
         )
@@ -513,15 +633,13 @@ def update_transaction(
 def delete_transaction(
     transaction_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `거래 삭제 API`
     """
 
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
@@ -529,11 +647,14 @@ def delete_transaction(
     if not transaction:
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 거래입니다!"))
 
-    if permission_info.transaction != "ARW" and user_id_from_jwt != transaction.user_id:
+    if permission_info.transaction != "ARW" and auth.user_id != transaction.user_id:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
+    previous_date = transaction.date
     try:
         Transaction.filter(session=session, id=transaction_id).delete(auto_commit=True)
+        invalidate_transaction_count_cache()
+        dashboard_cache.invalidate(previous_date)
         return JSONResponse(
             status_code=200, content=dict(success=True, message="OK", result=dict(deleted_object_id=transaction_id))
         )
@@ -542,6 +663,333 @@ def delete_transaction(
         return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
 
 
+def bulk_create_transaction_rows(session: Session, raw_rows: list, auth: AuthContext) -> JSONResponse:
+    """
+    거래 일괄 생성 (검증은 미리 조회한 id 집합으로 메모리에서 처리하고, 적재는 multi-row INSERT 한 트랜잭션으로 처리)
+    """
+    permission_info = auth.permission
+    if not permission_info:
+        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
+
+    if permission_info.transaction == "AR":
+        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
+
+    accepted_user_ids = {row.id for row in session.query(User.id).filter(User.status == "accepted")}
+    insurance_company_ids = {row.id for row in session.query(InsuranceCompany.id)}
+
+    now = get_now_datetime()
+    to_create = []
+    error_list = []
+    for row_number, raw_row in enumerate(raw_rows, start=1):
+        try:
+            request_info = TransactionCreate.parse_obj(raw_row)
+        except ValidationError as e:
+            invalid_fields = ", ".join(str(error["loc"][0]) for error in e.errors())
+            error_list.append(dict(row=row_number, message=f"값이 올바르지 않습니다! ({invalid_fields})"))
+            continue
+
+        error_message = validate_transaction_row(
+            request_info=request_info,
+            permission_info=permission_info,
+            accepted_user_ids=accepted_user_ids,
+            insurance_company_ids=insurance_company_ids,
+        )
+        if error_message:
+            error_list.append(dict(row=row_number, message=error_message))
+            continue
+
+        to_create.append(
+            dict(
+                user_id=request_info.user_id if request_info.user_id is not None else auth.user_id,
+                insurance_company_id=request_info.insurance_company_id,
+                vehicle_id=request_info.vehicle_id,
+                vehicle_model=request_info.vehicle_model,
+                date=datetime.strptime(request_info.date, "%Y-%m-%d").date(),
+                price=request_info.price,
+                memo=request_info.memo if request_info.memo is not None else "",
+                canceled=False,
+                cancel_fee=0,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+
+    if error_list:
+        return JSONResponse(
+            status_code=400,
+            content=dict(success=False, message="유효하지 않은 거래가 포함되어 있습니다!", result=dict(error_list=error_list)),
+        )
+
+    try:
+        for i in range(0, len(to_create), BULK_CREATE_CHUNK_SIZE):
+            session.execute(insert(Transaction).values(to_create[i : i + BULK_CREATE_CHUNK_SIZE]))
+        DailyRevenue.apply(session=session, added=to_create)
+        session.commit()
+    except Exception as e:
+        print(e)
+        session.rollback()
+        return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
+    invalidate_transaction_count_cache()
+    dashboard_cache.invalidate(*{row["date"] for row in to_create})
+
+    return JSONResponse(
+        status_code=201, content=dict(success=True, message="OK", result=dict(created_count=len(to_create)))
+    )
+
+
+def validate_transaction_row(
+    request_info: TransactionCreate, permission_info, accepted_user_ids: set, insurance_company_ids: set
+) -> Optional[str]:
+    """
+    거래 생성 API와 같은 규칙으로 한 행을 검증
+    :return: 오류 메시지, 유효하면 None
+    """
+    if request_info.user_id is not None:
+        if permission_info.transaction == "SRW":
+            return "권한이 없습니다!"
+        if request_info.user_id not in accepted_user_ids:
+            return "존재하지 않거나 탈퇴된 계정이 거래 담당자로 지정되었습니다!"
+
+    if request_info.insurance_company_id not in insurance_company_ids:
+        return "존재하지 않는 보험사입니다!"
+
+    for validation_result in [
+        validate_vehicle_id(request_info.vehicle_id),
+        validate_vehicle_model(request_info.vehicle_model),
+        validate_date(request_info.date),
+    ]:
+        if not validation_result["success"]:
+            return validation_result["detail"]
+
+    if request_info.memo is not None:
+        is_memo_valid = validate_memo(request_info.memo)
+        if not is_memo_valid["success"]:
+            return is_memo_valid["detail"]
+
+    return
+
+
+def parse_transaction_csv(body: bytes) -> list:
+    """
+    CSV(첫 줄은 컬럼명)를 dict 목록으로 변환 (빈 칸은 값이 없는 것으로 처리)
+    """
+    reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+    return [{key.strip(): (val.strip() or None) for key, val in row.items() if key} for row in reader]
+
+
+def stream_transaction_csv(request_info: TransactionExport):
+    """
+    거래 조회 결과를 CSV 청크로 생성
+    응답 전송 중에도 조회가 이어지므로 요청 세션과 별도의 세션에서 서버 사이드 커서(yield_per)로 읽는다.
+    """
+    order_by_dict = {
+        "transaction_id": Transaction.id,
+        "user_id": Transaction.user_id,
+        "price": Transaction.price,
+        "cancel_fee": Transaction.cancel_fee,
+    }
+    order_column = order_by_dict[request_info.order_by]
+    if request_info.order_type == "desc":
+        order_clauses = [desc(order_column), desc(Transaction.id)]
+    else:
+        order_clauses = [asc(order_column), asc(Transaction.id)]
+
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if request_info.gzip else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush_buffer(final: bool = False) -> bytes:
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        if compressor:
+            chunk = compressor.compress(chunk)
+            if final:
+                chunk += compressor.flush()
+        return chunk
+
+    # 엑셀에서 한글이 깨지지 않도록 BOM을 붙인다.
+    buffer.write("\ufeff")
+    writer.writerow(TRANSACTION_EXPORT_COLUMNS)
+
+    session_generator = db.read_session()
+    export_session = next(session_generator)
+    try:
+        export_query = (
+            export_session.query(
+                Transaction.id,
+                Transaction.date,
+                Transaction.created_at,
+                InsuranceCompany.name.label("insurance_company_name"),
+                Transaction.vehicle_id,
+                Transaction.vehicle_model,
+                User.name.label("user_name"),
+                Transaction.user_id,
+                Transaction.price,
+                Transaction.memo,
+                Transaction.canceled,
+                Transaction.cancel_fee,
+            )
+            .join(InsuranceCompany, Transaction.insurance_company_id == InsuranceCompany.id)
+            .join(User, Transaction.user_id == User.id)
+        )
+        export_query = apply_transaction_table_filters(query=export_query, request_info=request_info)
+
+        for row_count, row in enumerate(
+            export_query.order_by(*order_clauses).yield_per(TRANSACTION_EXPORT_CHUNK_SIZE), start=1
+        ):
+            writer.writerow(
+                [
+                    row.id,
+                    row.date,
+                    row.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                    row.insurance_company_name,
+                    row.vehicle_id,
+                    row.vehicle_model,
+                    row.user_name,
+                    row.user_id,
+                    row.price,
+                    row.memo,
+                    int(bool(row.canceled)),
+                    row.cancel_fee,
+                ]
+            )
+            if row_count % TRANSACTION_EXPORT_CHUNK_SIZE == 0:
+                chunk = flush_buffer()
+                if chunk:
+                    yield chunk
+    finally:
+        session_generator.close()
+
+    yield flush_buffer(final=True)
+
+
+def validate_transaction_table(
+    session: Session, request_info: TransactionTable, permission_info, user_id_from_jwt: int
+) -> Optional[JSONResponse]:
+    """
+    거래 테이블 조회 조건 검증 (SRW 권한은 본인 거래로 조회 대상을 고정)
+    :return: 검증 실패 시 오류 응답, 성공 시 None
+    """
+    if not permission_info:
+        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
+
+    if request_info.user_id is not None:
+        if permission_info.transaction == "SRW":
+            return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
+        else:
+            if not User.filter(session=session, id=request_info.user_id, status__in=["accepted", "deleted"]).first():
+                return JSONResponse(status_code=400, content=dict(success=False, message="조회 대상 계정은 존재하지 않거나 탈퇴되었습니다!"))
+    else:
+        if permission_info.transaction == "SRW":
+            request_info.user_id = user_id_from_jwt
+
+    start_date = request_info.start_date
+    end_date = request_info.end_date
+    if start_date is not None and end_date is not None:
+        for date in [start_date, end_date]:
+            is_date_valid = validate_date(date)
+            if not is_date_valid["success"]:
+                return JSONResponse(status_code=400, content=dict(success=False, message=is_date_valid["detail"]))
+        if start_date > end_date:
+            return JSONResponse(status_code=400, content=dict(success=False, message="조회 기간 설정이 올바르지 않습니다!"))
+
+    if request_info.insurance_company_id is not None:
+        if not InsuranceCompany.get(session=session, id=request_info.insurance_company_id):
+            return JSONResponse(status_code=400, content=dict(success=False, message="조회 대상 보험사가 존재하지 않습니다!"))
+
+    return
+
+
+def apply_transaction_table_filters(query, request_info: TransactionTable):
+    """
+    거래 테이블 조회 조건을 query에 적용 (validate_transaction_table 통과 후 호출)
+    """
+    if request_info.start_date is not None and request_info.end_date is not None:
+        query = query.filter(Transaction.date.between(request_info.start_date, request_info.end_date))
+
+    if request_info.user_id is not None:
+        query = query.filter(Transaction.user_id == request_info.user_id)
+
+    if request_info.insurance_company_id is not None:
+        query = query.filter(Transaction.insurance_company_id == request_info.insurance_company_id)
+
+    if request_info.canceled_type == "EXCLUDE_CANCELED":
+        query = query.filter(Transaction.canceled == false)
+    elif request_info.canceled_type == "CANCELED_ONLY":
+        query = query.filter(Transaction.canceled == true)
+
+    return query
+
+
+def count_transaction_table(session: Session, request_info: TransactionTable) -> int:
+    """
+    조회 조건별 거래 건수
+    user_id, insurance_company_id는 FK(NOT NULL)이므로 JOIN 없이 transaction 테이블만 센다.
+    """
+    count_query = session.query(func.count(Transaction.id))
+    return apply_transaction_table_filters(query=count_query, request_info=request_info).scalar()
+
+
+def get_cached_transaction_table_count(session: Session, request_info: TransactionTable) -> int:
+    """
+    `/table/count`용 조회 조건별 거래 건수 (거래 생성/수정/삭제 전까지 캐싱)
+    캐시는 워커(프로세스)마다 따로 있으므로 다른 워커에서 변경된 거래는 최대 TTL(60초) 늦게 반영된다.
+    """
+    key = (
+        request_info.start_date if request_info.end_date is not None else None,
+        request_info.end_date if request_info.start_date is not None else None,
+        request_info.user_id,
+        request_info.insurance_company_id,
+        request_info.canceled_type,
+    )
+    with transaction_count_lock:
+        generation = transaction_count_cache_info["generation"]
+        if key in transaction_count_cache:
+            return transaction_count_cache[key]
+
+    total_length = count_transaction_table(session=session, request_info=request_info)
+
+    with transaction_count_lock:
+        # 조회 도중 거래가 변경되었다면 이전 건수를 캐싱하지 않는다.
+        if generation == transaction_count_cache_info["generation"]:
+            transaction_count_cache[key] = total_length
+    return total_length
+
+
+def invalidate_transaction_count_cache():
+    with transaction_count_lock:
+        transaction_count_cache_info["generation"] += 1
+        transaction_count_cache.clear()
+
+
+def encode_transaction_cursor(order_by: str, order_type: str, last_value: int, last_id: int) -> str:
+    payload = json.dumps([order_by, order_type, last_value, last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_transaction_cursor(cursor: str) -> Optional[dict]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        order_by, order_type, last_value, last_id = json.loads(payload)
+        if not all(isinstance(val, int) and not isinstance(val, bool) for val in [last_value, last_id]):
+            return
+        return {"order_by": order_by, "order_type": order_type, "last_value": last_value, "last_id": last_id}
+    except Exception:
+        return
+
+
+def get_keyset_condition(column, order_type: str, last_value: int, last_id: int):
+    """
+    (column, Transaction.id) 기준으로 마지막 Row 다음에 오는 Row 조건
+    """
+    if column is Transaction.id:
+        return Transaction.id < last_id if order_type == "desc" else Transaction.id > last_id
+    if order_type == "desc":
+        return or_(column < last_value, and_(column == last_value, Transaction.id < last_id))
+    return or_(column > last_value, and_(column == last_value, Transaction.id > last_id))
+
+
 def validate_company_name(name: str) -> dict:
     result = {"detail": "", "success": False}
     if not (2 <= len(name) <= 10):
@@ -3,7 +3,6 @@ from operator import itemgetter
 import re
 from uuid import uuid4
 
-import bcrypt
 from fastapi import APIRouter, Depends, Security
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.security import HTTPAuthorizationCredentials
@@ -38,9 +37,11 @@ from app.responses import (
     send_password_reset_mail_response,
     reset_password_response,
 )
-from app.utils.auth import get_permission_info
+from app.utils.auth import AuthContext, get_auth_context, require_permission
+from app.utils.email_outbox import email_outbox
 from app.utils.jwt import auth_handler, authorization
-from app.utils.gmail import send
+from app.utils.password import PasswordHasherBusy, password_hasher
+from app.utils.permission_cache import permission_cache
 
 
 router = APIRouter(prefix="/user")
@@ -48,21 +49,19 @@ config = asdict(conf())
 
 
 @router.post("/role", status_code=201, responses=create_role_response())
-async def create_role(
+def create_role(
     request_info: UserRoleCreate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `Role 생성 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_role_name_valid = validate_role_name(request_info.name)
     if not is_role_name_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_role_name_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
 
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
@@ -82,38 +81,26 @@ async def create_role(
 
 
 @router.get("/role", status_code=200, responses=get_all_role_response())
-async def get_all_role(
-    session: Session = Depends(db.session), jwt_token: HTTPAuthorizationCredentials = Security(authorization)
+def get_all_role(
+    session: Session = Depends(db.session), auth: AuthContext = Depends(require_permission())
 ) -> JSONResponse:
     """
     `모든 Role 정보 받아오는 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     roles = UserRole.filter(session=session, with_entities=[UserRole.id, UserRole.name]).order_by("id").all()
     result = {"success": True, "message": "OK", "result": roles}
     return result
 
 
 @router.get("/role/{target_role_id}", status_code=200, responses=get_specific_role_response())
-async def get_specific_role(
+def get_specific_role(
     target_role_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(require_permission()),
 ) -> JSONResponse:
     """
     `특정 Role 정보 받아오는 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     role = UserRole.get(session=session, id=target_role_id, with_entities=[UserRole.id, UserRole.name])
     if not role:
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 역할입니다!"))
@@ -123,22 +110,20 @@ async def get_specific_role(
 
 
 @router.put("/role/{target_role_id}", status_code=200, responses=update_role_response())
-async def update_role(
+def update_role(
     target_role_id: int,
     request_info: UserRoleUpdate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `Role update API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     is_role_name_valid = validate_role_name(request_info.name)
     if not is_role_name_valid["success"]:
         return JSONResponse(status_code=400, content=dict(success=False, message=is_role_name_valid["detail"]))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
     if permission_info.user != "ARW":
@@ -161,22 +146,14 @@ async def update_role(
 
 
 @router.delete("/role/{target_role_id}", status_code=200, responses=delete_role_response())
-async def delete_role(
+def delete_role(
     target_role_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
     """
     `Role 삭제 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     if not UserRole.get(session=session, id=target_role_id):
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않는 역할입니다!"))
 
@@ -193,7 +170,7 @@ async def delete_role(
 
 
 @router.post("", status_code=201, responses=create_user_response())
-async def create_user(request_info: UserRegister, session: Session = Depends(db.session)) -> JSONResponse:
+def create_user(request_info: UserRegister, session: Session = Depends(db.session)) -> JSONResponse:
     """
     `User 생성 API`
     """
@@ -216,49 +193,44 @@ async def create_user(request_info: UserRegister, session: Session = Depends(db.
             return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
 
     email_token = uuid4().hex
-    hashed_password = bcrypt.hashpw(request_info.password.encode("utf-8"), bcrypt.gensalt())
+    try:
+        hashed_password = password_hasher.hash(request_info.password)
+    except PasswordHasherBusy:
+        return JSONResponse(status_code=503, content=dict(success=False, message="요청이 많습니다. 잠시 후 다시 시도해 주세요!"))
+
+    # 계정과 인증 메일(outbox)은 한 트랜잭션으로 커밋 (메일 없이 계정만 남지 않도록)
     try:
         created_object_id = User.create(
             session=session,
-            auto_commit=True,
             email=request_info.email,
             email_token=email_token,
             password=hashed_password,
             name=request_info.name,
         ).id
-    except Exception as e:
-        print(e)
-        return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
-
-    try:
         mail_content = f"<p><a href='{config['SERVER_URL']}/api/user/verify-email/{email_token}' target='_blank'>" + \
             "여기를 클릭해 회원가입을 완료해 주세요!</a></p>"
-        send(destination=request_info.email,
-             subject=f"{config['SERVICE_NAME']} 회원가입 인증 메일입니다.",
-             body=f"{mail_content}")
+        email_outbox.enqueue(session=session,
+                             destination=request_info.email,
+                             subject=f"{config['SERVICE_NAME']} 회원가입 인증 메일입니다.",
+                             body=f"{mail_content}")
+        session.commit()
     except Exception as e:
         print(e)
-        return JSONResponse(status_code=409, content=dict(success=False, message="회원가입 인증 메일 전송 중 오류가 발생했습니다!"))
+        session.rollback()
+        return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
 
     return JSONResponse(status_code=201, content=dict(success=True, message="OK",
                                                       result=dict(created_object_id=created_object_id)))
 
 
 @router.get("", status_code=200, responses=get_all_user_response())
-async def get_all_user(
-    session: Session = Depends(db.session), jwt_token: HTTPAuthorizationCredentials = Security(authorization)
+def get_all_user(
+    session: Session = Depends(db.session),
+    auth: AuthContext = Depends(require_permission(user=["AR", "ARW"])),
 ) -> JSONResponse:
     """
     `모든 User 정보 받아오는 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-    if "AR" not in permission_info.user:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
     users_verified = User.filter(
         session=session, status="verified", with_entities=[User.id, User.email, User.name, User.status]
     ).all()
@@ -289,20 +261,19 @@ async def get_all_user(
 
 
 @router.get("/{target_user_id}", status_code=200, responses=get_specific_user_response())
-async def get_specific_user(
+def get_specific_user(
     target_user_id: int = None,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `특정 User 정보 받아오는 API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
-    if target_user_id != user_id_from_jwt and "AR" not in permission_info.user:
+    if target_user_id != auth.user_id and "AR" not in permission_info.user:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
     user_verified = User.filter(
@@ -345,34 +316,35 @@ async def get_specific_user(
 
 
 @router.put("/{target_user_id}", status_code=200, responses=update_user_response())
-async def update_user(
+def update_user(
     target_user_id: int,
     request_info: UserUpdate,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(get_auth_context),
 ) -> JSONResponse:
     """
     `User update API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-
     target_user = User.filter(session=session, id=target_user_id,
                               status__in=["verified", "accepted", "deleted"]).first()
     if not target_user:
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않거나 탈퇴된 계정입니다!"))
 
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
+    permission_info = auth.permission
     if not permission_info:
         return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
 
-    if user_id_from_jwt == target_user_id:
+    if auth.user_id == target_user_id:
         if not (request_info.current_password and request_info.new_password and request_info.new_password_check):
             return JSONResponse(status_code=400, content=dict(success=False, message="모든 값을 입력해 주세요!"))
         if request_info.new_password != request_info.new_password_check:
             return JSONResponse(status_code=400, content=dict(success=False, message="비밀번호와 비밀번호 확인값이 일치하지 않습니다!"))
-        if not bcrypt.checkpw(request_info.current_password.encode("utf-8"), target_user.password.encode("utf-8")):
-            return JSONResponse(status_code=400, content=dict(success=False, message="비밀번호가 틀립니다!"))
-        hashed_password = bcrypt.hashpw(request_info.new_password.encode("utf-8"), bcrypt.gensalt())
+        try:
+            if not password_hasher.check(request_info.current_password, target_user.password):
+                return JSONResponse(status_code=400, content=dict(success=False, message="비밀번호가 틀립니다!"))
+            hashed_password = password_hasher.hash(request_info.new_password)
+        except PasswordHasherBusy:
+            return JSONResponse(status_code=503, content=dict(success=False, message="요청이 많습니다. 잠시 후 다시 시도해 주세요!"))
         try:
             User.filter(session=session, id=target_user_id).update(auto_commit=True, password=hashed_password)
         except Exception as e:
@@ -436,6 +408,7 @@ async def update_user(
         except Exception as e:
             print(e)
             return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
+        permission_cache.invalidate(target_user_id)
 
     if to_update_at_permission:
         if not Permission.get(session=session, user_id=target_user_id):
@@ -457,22 +430,15 @@ async def update_user(
 
 
 @router.delete("/{target_user_id}", status_code=200, responses=delete_user_response())
-async def delete_user(
+def delete_user(
     target_user_id: int,
     session: Session = Depends(db.session),
-    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+    auth: AuthContext = Depends(require_permission(user=["ARW"])),
 ) -> JSONResponse:
     """
     `User update API`
     """
-    user_id_from_jwt = int(auth_handler.decode_token(token=jwt_token.credentials))
-    permission_info = get_permission_info(session=session, user_id=user_id_from_jwt)
-    if not permission_info:
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-    if permission_info.user != "ARW":
-        return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
-
-    if user_id_from_jwt == target_user_id:
+    if auth.user_id == target_user_id:
         return JSONResponse(status_code=400, content=dict(success=False, message="본인 계정은 삭제할 수 없습니다!"))
 
     target_user = User.get(session=session, id=target_user_id)
@@ -488,6 +454,7 @@ async def delete_user(
         except Exception as e:
             print(e)
             return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
+        permission_cache.invalidate(target_user_id)
 
         return JSONResponse(status_code=200, content=dict(success=True, message="OK",
                                                           result=dict(deleted_object_id=target_user_id)))
@@ -497,13 +464,14 @@ async def delete_user(
     except Exception as e:
         print(e)
         return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
+    permission_cache.invalidate(target_user_id)
 
     return JSONResponse(status_code=200, content=dict(success=True, message="OK",
                                                       result=dict(withdrawn_object_id=target_user_id)))
 
 
 @router.post("/login", status_code=200, responses=login_response())
-async def login(request_info: UserLogin, session: Session = Depends(db.session)) -> JSONResponse:
+def login(request_info: UserLogin, session: Session = Depends(db.session)) -> JSONResponse:
     """
     `로그인 API`
     """
@@ -520,8 +488,11 @@ async def login(request_info: UserLogin, session: Session = Depends(db.session))
     elif user.status == "deleted":
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않거나 탈퇴된 계정입니다!"))
 
-    if not bcrypt.checkpw(request_info.password.encode("utf-8"), user.password.encode("utf-8")):
-        return JSONResponse(status_code=400, content=dict(success=False, message="비밀번호가 틀립니다!"))
+    try:
+        if not password_hasher.check(request_info.password, user.password):
+            return JSONResponse(status_code=400, content=dict(success=False, message="비밀번호가 틀립니다!"))
+    except PasswordHasherBusy:
+        return JSONResponse(status_code=503, content=dict(success=False, message="요청이 많습니다. 잠시 후 다시 시도해 주세요!"))
 
     access_token = auth_handler.encode_token(subject=str(user.id))
     refresh_token = auth_handler.encode_refresh_token(subject=str(user.id))
@@ -533,7 +504,7 @@ async def login(request_info: UserLogin, session: Session = Depends(db.session))
 
 
 @router.get("/token/refresh", status_code=200, responses=refresh_response())
-async def refresh(jwt_token: HTTPAuthorizationCredentials = Security(authorization)) -> JSONResponse:
+def refresh(jwt_token: HTTPAuthorizationCredentials = Security(authorization)) -> JSONResponse:
     """
     `Token refresh API`
     """
@@ -547,7 +518,7 @@ async def refresh(jwt_token: HTTPAuthorizationCredentials = Security(authorizati
 
 
 @router.get("/verify-email/{token}", status_code=307, responses=verify_email_response())
-async def verify_email(token: str, session: Session = Depends(db.session)) -> JSONResponse:
+def verify_email(token: str, session: Session = Depends(db.session)) -> JSONResponse:
     """
     `이메일 인증 API`
     """
@@ -570,7 +541,7 @@ async def verify_email(token: str, session: Session = Depends(db.session)) -> JS
 
 
 @router.get("/reset-password/{target_user_mail}", status_code=200, responses=send_password_reset_mail_response())
-async def send_password_reset_mail(target_user_mail: EmailStr, session: Session = Depends(db.session)) -> JSONResponse:
+def send_password_reset_mail(target_user_mail: EmailStr, session: Session = Depends(db.session)) -> JSONResponse:
     """
     `패스워드 초기화 메일 전송 API`
     """
@@ -578,23 +549,26 @@ async def send_password_reset_mail(target_user_mail: EmailStr, session: Session
         return JSONResponse(status_code=400, content=dict(success=False, message="존재하지 않거나 탈퇴된 계정입니다!"))
 
     email_token = uuid4().hex
+    mail_content = f"<p><a href='{config['SERVER_URL']}/reset-password?token={email_token}' target='_blank'>" + \
+        "여기를 클릭해 비밀번호 초기화를 진행해 주세요!</a></p>"
+    # 새 토큰과 초기화 메일(outbox)은 한 트랜잭션으로 커밋
     try:
-        User.filter(session=session, email=target_user_mail).update(auto_commit=True, email_token=email_token)
+        User.filter(session=session, email=target_user_mail).update(email_token=email_token)
+        email_outbox.enqueue(session=session,
+                             destination=target_user_mail,
+                             subject=f"{config['SERVICE_NAME']} 비밀번호 초기화 메일입니다.",
+                             body=f"{mail_content}")
+        session.commit()
     except Exception as e:
         print(e)
+        session.rollback()
         return JSONResponse(status_code=409, content=dict(success=False, message="예상치 못한 오류가 발생했습니다!"))
 
-    mail_content = f"<p><a href='{config['SERVER_URL']}/reset-password?token={email_token}' target='_blank'>" + \
-        "여기를 클릭해 비밀번호 초기화를 진행해 주세요!</a></p>"
-    send(destination=target_user_mail,
-         subject=f"{config['SERVICE_NAME']} 비밀번호 초기화 메일입니다.",
-         body=f"{mail_content}")
-
     return JSONResponse(status_code=200, content=dict(success=True, message="OK"))
 
 
 @router.post("/reset-password", status_code=200, responses=reset_password_response())
-async def reset_password(request_info: ResetPassword, session: Session = Depends(db.session)) -> JSONResponse:
+def reset_password(request_info: ResetPassword, session: Session = Depends(db.session)) -> JSONResponse:
     """
     `패스워드 초기화 API`
     """
@@ -604,7 +578,11 @@ async def reset_password(request_info: ResetPassword, session: Session = Depends
     if request_info.new_password != request_info.new_password_check:
         return JSONResponse(status_code=400, content=dict(success=False, message="비밀번호와 비밀번호 확인값이 일치하지 않습니다!"))
 
-    hashed_password = bcrypt.hashpw(request_info.new_password.encode("utf-8"), bcrypt.gensalt())
+    try:
+        hashed_password = password_hasher.hash(request_info.new_password)
+    except PasswordHasherBusy:
+        return JSONResponse(status_code=503, content=dict(success=False, message="요청이 많습니다. 잠시 후 다시 시도해 주세요!"))
+
     try:
         User.filter(session=session, email_token=request_info.token).update(auto_commit=True, password=hashed_password)
     except Exception as e:
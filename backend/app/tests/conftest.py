@@ -0,0 +1,113 @@
+"""
+테스트 DB 수명 주기
+
+- 세션: 스키마를 한 번만 만들고(app.main import 시 TEST_MODE로 DB 재생성 + create_all),
+  더미 데이터 스냅샷(SQL)이 없으면 한 번 만들어 .pytest_cache에 저장
+  pytest-xdist(-n auto)로 실행하면 워커마다 별도 스키마(db_name_gw0, ...)를 쓰고 스냅샷은 함께 사용
+- 모듈: 연결 하나에서 트랜잭션을 열고 앱/테스트의 모든 세션을 그 연결에 묶음 (모듈 종료 시 롤백)
+  세션은 이미 열린 트랜잭션에 합류하므로 session.commit()은 flush만 하고 실제로 커밋하지 않는다.
+- 테스트: SAVEPOINT 안에서 실행 후 되돌림 (모듈 데이터는 유지)
+"""
+import inspect
+import logging
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.conn import Base, db
+from app.main import app  # noqa: F401 (TEST_MODE DB 초기화)
+from app.tests.snapshot import (
+    dump_snapshot,
+    get_schema_key,
+    load_snapshot,
+    reset_auto_increment,
+    snapshot_lock,
+    truncate_all,
+)
+from app.utils import create_dummy_data as dummy_data
+from app.utils.dashboard_cache import dashboard_cache
+from app.utils.permission_cache import permission_cache
+
+TEST_SAVEPOINT = "test_case"
+
+
+def clear_caches() -> None:
+    # DB가 되돌아가므로 DB 값을 담고 있는 캐시도 함께 비움
+    permission_cache.clear()
+    dashboard_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def database():
+    Base.metadata.create_all(db.engine)
+    return db
+
+
+@pytest.fixture(scope="session")
+def seed_snapshot(request, database) -> str:
+    """
+    더미 데이터 스냅샷(SQL) 경로 (스키마나 더미 데이터 생성 코드가 바뀌면 다시 생성)
+    만드는 동안만 실제로 커밋하고, 저장 후에는 테이블을 비운다.
+    """
+    key = get_schema_key(database.engine, inspect.getsource(dummy_data))
+    path = request.config.cache.makedir("seed_snapshot") / f"{key}.sql"
+    # xdist 워커는 같은 캐시 디렉터리를 쓰므로 먼저 잠금을 얻은 워커만 자기 스키마에서 만들고 나머지는 기다림
+    with snapshot_lock(f"{path}.lock"):
+        if not path.exists():
+            dummy_data.create_dummy_data(database)
+            dumped = dump_snapshot(database.engine, str(path))
+            truncate_all(database.engine)
+            clear_caches()
+            logging.info(f"Seed snapshot created: {path} ({dumped} rows)")
+    return str(path)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def module_transaction(database, seed_snapshot):
+    # 스냅샷 생성(TRUNCATE)은 이 연결의 트랜잭션이 열리기 전에 끝나야 하므로 seed_snapshot을 먼저 준비
+    reset_auto_increment(database.engine)
+    conn = database.engine.connect()
+    conn.begin()
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=conn)
+
+    @event.listens_for(session_factory, "after_transaction_end")
+    def keep_transaction(session, transaction):
+        # 앱 코드의 session.rollback()은 바깥 트랜잭션까지 되돌리므로, 이후 쓰기가 실제로 커밋되지 않도록 다시 시작
+        if not conn.closed and not conn.in_transaction():
+            conn.begin()
+
+    original_session, original_read_session = database._session, database._read_session
+    database._session = session_factory
+    database._read_session = session_factory if original_read_session is not None else None
+    try:
+        yield conn
+    finally:
+        database._session, database._read_session = original_session, original_read_session
+        if conn.in_transaction():
+            conn.get_transaction().rollback()
+        conn.close()
+        clear_caches()
+
+
+@pytest.fixture(autouse=True)
+def test_savepoint(module_transaction):
+    conn = module_transaction
+    outer = conn.get_transaction()
+    # SQLAlchemy가 모르는 SAVEPOINT라서 세션은 바깥 트랜잭션에 합류하고, commit으로 해제되지 않음
+    conn.exec_driver_sql(f"SAVEPOINT {TEST_SAVEPOINT}")
+    yield
+    clear_caches()
+    if conn.get_transaction() is not outer:
+        pytest.fail("테스트 중 session.rollback()으로 모듈 트랜잭션이 끝났습니다. (모듈 데이터가 사라짐)")
+    conn.exec_driver_sql(f"ROLLBACK TO SAVEPOINT {TEST_SAVEPOINT}")
+
+
+@pytest.fixture(scope="module")
+def seed_data(module_transaction, seed_snapshot):
+    """
+    더미 데이터가 필요한 모듈에서 사용 (모듈 트랜잭션 안에 스냅샷 적재, 모듈 종료 시 함께 롤백)
+    """
+    load_snapshot(module_transaction, seed_snapshot)
+    return module_transaction
@@ -0,0 +1,95 @@
+import fcntl
+import os
+from contextlib import contextmanager
+from hashlib import sha1
+from typing import List
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from app.database.conn import Base
+
+SNAPSHOT_CHUNK_SIZE = 1000
+
+
+def get_schema_key(engine: Engine, *extra: str) -> str:
+    """
+    스키마(DDL)와 추가 값이 같으면 같은 키 (스냅샷 파일 이름으로 사용, 스키마가 바뀌면 다시 생성됨)
+    """
+    digest = sha1()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode("utf-8"))
+    for value in extra:
+        digest.update(value.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def dump_snapshot(engine: Engine, path: str) -> int:
+    """
+    전체 테이블 데이터를 multi-row INSERT 문으로 저장 (생성 column 제외, 한 줄에 한 문장)
+    :return: 저장한 Row 수
+    """
+    dumped = 0
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with engine.connect() as conn, open(temp_path, "w", encoding="utf-8") as file:
+        escape = conn.connection.escape
+        for table in Base.metadata.sorted_tables:
+            columns = [column for column in table.columns if column.computed is None]
+            rows = conn.execute(table.select().with_only_columns(*columns).order_by(*table.primary_key)).fetchall()
+            names = ", ".join(f"`{column.name}`" for column in columns)
+            for i in range(0, len(rows), SNAPSHOT_CHUNK_SIZE):
+                values = ", ".join(
+                    "(" + ", ".join(escape(value) for value in row) + ")" for row in rows[i : i + SNAPSHOT_CHUNK_SIZE]
+                )
+                file.write(f"INSERT INTO `{table.name}` ({names}) VALUES {values};\n")
+            dumped += len(rows)
+    # 중간에 중단되어도 불완전한 파일이 스냅샷으로 쓰이지 않도록 다 쓴 뒤 교체
+    os.replace(temp_path, path)
+    return dumped
+
+
+@contextmanager
+def snapshot_lock(path: str):
+    """
+    프로세스 간 배타 잠금 (xdist 워커 중 하나만 스냅샷을 만들고, 나머지는 기다렸다가 만들어진 파일을 사용)
+    """
+    with open(path, "w") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def load_snapshot(conn: Connection, path: str) -> None:
+    """
+    dump_snapshot으로 저장한 파일 적재 (conn의 현재 트랜잭션 안에서 실행)
+    데이터에 %가 있어도 파라미터 치환이 일어나지 않도록 DBAPI cursor로 그대로 실행한다.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        with open(path, encoding="utf-8") as file:
+            for statement in file:
+                if statement.strip():
+                    cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+def truncate_all(engine: Engine) -> None:
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 0")
+        for table in Base.metadata.sorted_tables:
+            conn.exec_driver_sql(f"TRUNCATE TABLE `{table.name}`")
+        conn.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1")
+
+
+def reset_auto_increment(engine: Engine) -> List[str]:
+    """
+    롤백된 INSERT가 소모한 AUTO_INCREMENT 값 되돌리기 (빈 테이블은 1부터, 아니면 최대 id 다음부터)
+    테스트가 id=1 같은 고정 id를 참조하므로 모듈마다 새 스키마와 같은 id로 시작하도록 한다.
+    """
+    with engine.connect() as conn:
+        for table in Base.metadata.sorted_tables:
+            conn.exec_driver_sql(f"ALTER TABLE `{table.name}` AUTO_INCREMENT = 1")
+    return [table.name for table in Base.metadata.sorted_tables]
@@ -0,0 +1,159 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import conn
+from app.database.conn import (
+    Base,
+    SQLAlchemy,
+    _drop_database,
+    _get_pool_size,
+    _get_worker_count,
+    _with_schema_suffix,
+    db,
+)
+from app.database.schema import InsuranceCompany
+from app.main import app
+from app.utils.pool_metrics import pool_metrics
+
+
+def get_metric(name: str, pool: str) -> float:
+    metric = f'{name}{{pool="{pool}"}} '
+    line = next(line for line in client.get("/metrics").text.splitlines() if line.startswith(metric))
+    return float(line[len(metric):])
+
+
+def test_get_worker_count(monkeypatch):
+    for key in ["WEB_CONCURRENCY", "WORKERS_PER_CORE", "MAX_WORKERS"]:
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setattr(conn, "cpu_count", lambda: 4)
+
+    assert _get_worker_count() == 4
+
+    monkeypatch.setenv("WORKERS_PER_CORE", "2")
+    assert _get_worker_count() == 8
+
+    monkeypatch.setenv("MAX_WORKERS", "6")
+    assert _get_worker_count() == 6
+
+    monkeypatch.setenv("WORKERS_PER_CORE", "0.1")
+    assert _get_worker_count() == 2
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert _get_worker_count() == 3
+
+
+def test_get_pool_size(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert _get_pool_size(60, 4) == (11, 4)
+        assert _get_pool_size(60, 4, 2) == (5, 2)
+        assert _get_pool_size(60, 60) == (1, 0)
+    assert not caplog.records
+
+
+def test_get_pool_size_over_budget(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert _get_pool_size(10, 8, 2) == (1, 0)
+
+    assert "up to 16 connections will be opened" in caplog.text
+
+
+def test_pool_metrics():
+    checkouts = get_metric("db_pool_checkouts_total", "primary")
+    connects = get_metric("db_pool_connects_total", "primary")
+
+    for _ in range(2):
+        with db.engine.connect() as connection:
+            checked_out = get_metric("db_pool_checked_out", "primary")
+            assert connection.scalar("SELECT 1") == 1
+
+    assert get_metric("db_pool_size", "primary") == db.engine.pool.size()
+    assert checked_out >= 1
+    assert get_metric("db_pool_checkouts_total", "primary") - checkouts >= 2
+    assert get_metric("db_pool_connects_total", "primary") >= connects
+    assert get_metric("db_pool_checkout_wait_seconds_sum", "primary") > 0
+    # 두 번째 체크아웃은 풀에 반환된 연결을 다시 쓰므로 pre-ping을 실행
+    assert get_metric("db_pool_pre_ping_seconds_sum", "primary") > 0
+
+
+def test_pool_pre_ping_reconnects(monkeypatch):
+    with db.engine.connect():
+        pass
+    invalidations = get_metric("db_pool_invalidations_total", "primary")
+    pings = []
+
+    def do_ping(dbapi_connection):
+        # 첫 ping만 끊어진 연결로 처리
+        pings.append(dbapi_connection)
+        return len(pings) > 1
+
+    monkeypatch.setattr(db.engine.dialect, "do_ping", do_ping)
+    with db.engine.connect() as connection:
+        assert connection.scalar("SELECT 1") == 1
+
+    assert len(pings) == 1
+    assert get_metric("db_pool_invalidations_total", "primary") - invalidations >= 1
+
+
+@pytest.fixture
+def primary_url():
+    # 테스트용 SQLAlchemy 인스턴스도 같은 이름(primary, read)으로 풀 지표에 등록되므로 끝나면 원래 엔진으로 되돌림
+    engines = dict(pool_metrics._engines)
+    yield db.engine.url.render_as_string(hide_password=False)
+    with pool_metrics._lock:
+        pool_metrics._engines = engines
+
+
+def test_read_session_uses_replica(primary_url):
+    read_url = _with_schema_suffix(primary_url, "replica")
+    # TEST_MODE로 복제 DB용 스키마를 새로 만들고, 주 DB에는 없는 보험사를 커밋
+    replica = SQLAlchemy(app=FastAPI(), DB_URL=read_url, DB_ECHO=False, TEST_MODE=True)
+    router = None
+    try:
+        Base.metadata.create_all(replica.engine)
+        replica_session = next(replica.session())
+        InsuranceCompany.create(session=replica_session, auto_commit=True, name="복제DB")
+        replica_session.close()
+
+        router = SQLAlchemy(
+            app=FastAPI(),
+            DB_URL=primary_url,
+            DB_READ_URL=read_url,
+            DB_ECHO=False,
+            DB_CONNECTION_BUDGET=12,
+            DB_WORKER_COUNT=2,
+        )
+        read_session = next(router.read_session())
+        primary_session = next(router.session())
+
+        assert router.read_engine is not router.engine
+        assert read_session.get_bind() is router.read_engine
+        assert InsuranceCompany.get(session=read_session, name="복제DB")
+        assert not InsuranceCompany.get(session=primary_session, name="복제DB")
+        # 예산 12를 워커 2개 x 풀 2개(주 DB, 복제 DB)로 나눔
+        assert router.engine.pool.size() == router.read_engine.pool.size() == 2
+        read_session.close()
+        primary_session.close()
+    finally:
+        if router is not None:
+            router.engine.dispose()
+            router.read_engine.dispose()
+        _drop_database(replica.engine, replica.engine.url.database)
+        replica.engine.dispose()
+
+
+def test_read_session_falls_back_to_primary(primary_url):
+    primary = SQLAlchemy(app=FastAPI(), DB_URL=primary_url, DB_ECHO=False)
+    try:
+        read_session = next(primary.read_session())
+
+        assert primary.read_engine is primary.engine
+        assert read_session.get_bind() is primary.engine
+        read_session.close()
+    finally:
+        primary.engine.dispose()
+
+
+client = TestClient(app)
@@ -1,16 +1,15 @@
 from calendar import monthrange
-from dataclasses import asdict
-from datetime import datetime
 from dateutil.relativedelta import relativedelta
+from random import Random
 from uuid import uuid4
 
 import bcrypt
+import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import desc, cast, Integer, String
+from sqlalchemy import desc, cast, Integer
 from sqlalchemy.sql import func, label
 
-from app.common.config import conf
-from app.database.conn import db, Base
+from app.database.conn import db
 from app.database.schema import (
     Permission,
     InsuranceCompany,
@@ -21,9 +20,10 @@ from app.database.schema import (
 )
 from app.main import app
 from app.tests.create_expired_jwt import create_expired_jwt
+from app.utils.create_dummy_data import USER_EMAILS, create_users
+from app.utils.dashboard_cache import dashboard_cache
 from app.utils.jwt import auth_handler
 from app.utils.date import get_now_datetime
-from app.utils.create_dummy_data import create_dummy_data
 
 true = True
 false = False
@@ -388,6 +388,109 @@ def test_get_current_month_transaction_count_with_none_ARW_permission():
     assert response.json() == result
 
 
+def test_get_dashboard_summary():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    response = client.get("/api/dashboard/summary", headers={"Authorization": f"Bearer {token}"})
+
+    result = {"success": True, "message": "OK", "result": {}}
+    for tile in [
+        "current-month-revenue",
+        "current-day-revenue",
+        "current-month-transaction-count",
+        "current-day-transaction-count",
+    ]:
+        tile_response = client.get(f"/api/dashboard/{tile}", headers={"Authorization": f"Bearer {token}"})
+        result["result"][tile.replace("-", "_")] = tile_response.json()["result"]
+
+    assert response.status_code == 200
+    assert response.json() == result
+
+
+def test_get_dashboard_summary_query_metrics():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    dashboard_cache.clear()
+
+    response = client.get("/api/dashboard/summary", headers={"Authorization": f"Bearer {token}"})
+    metrics_response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 0 < int(response.headers["X-DB-Query-Count"]) <= 5
+    assert float(response.headers["X-DB-Query-Time-Ms"]) >= float(response.headers["X-DB-Slowest-Query-Ms"])
+    assert metrics_response.status_code == 200
+    assert 'db_queries_total{method="GET",route="/api/dashboard/summary"}' in metrics_response.text
+
+
+def test_get_dashboard_summary_cache_invalidated_by_transaction():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    headers = {"Authorization": f"Bearer {token}"}
+    dashboard_cache.clear()
+
+    before = client.get("/api/dashboard/summary", headers=headers)
+    cached = client.get("/api/dashboard/summary", headers=headers)
+
+    create_response = client.post(
+        "/api/transaction",
+        headers=headers,
+        json={
+            "insurance_company_id": 1,
+            "vehicle_id": "12가 3456",
+            "vehicle_model": "모닝",
+            "date": get_now_datetime().strftime("%Y-%m-%d"),
+            "price": 300000,
+            "memo": "",
+        },
+    )
+    after = client.get("/api/dashboard/summary", headers=headers)
+
+    created_object_id = create_response.json()["result"]["created_object_id"]
+    client.delete(f"/api/transaction/{created_object_id}", headers=headers)
+    restored = client.get("/api/dashboard/summary", headers=headers)
+
+    before_result = before.json()["result"]
+    after_result = after.json()["result"]
+
+    assert cached.json() == before.json()
+    assert int(cached.headers["X-DB-Query-Count"]) < int(before.headers["X-DB-Query-Count"])
+    assert create_response.status_code == 201
+    assert (
+        after_result["current_day_revenue"]["revenue"] == before_result["current_day_revenue"]["revenue"] + 300000
+    )
+    assert (
+        after_result["current_month_transaction_count"]["transaction_count"]
+        == before_result["current_month_transaction_count"]["transaction_count"] + 1
+    )
+    assert restored.json() == before.json()
+
+
+def test_get_dashboard_summary_without_JWT():
+    response = client.get("/api/dashboard/summary")
+
+    result = {"detail": "Not authenticated"}
+
+    assert response.status_code == 403
+    assert response.json() == result
+
+
+def test_get_dashboard_summary_with_none_ARW_permission():
+    session = next(db.session())
+    test_user = User.get(session=session, email="driver@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    response = client.get("/api/dashboard/summary", headers={"Authorization": f"Bearer {token}"})
+
+    result = {"success": False, "message": "권한이 없습니다!"}
+
+    assert response.status_code == 403
+    assert response.json() == result
+
+
 def test_get_monthly_revenue_with_one_month():
     session = next(db.session())
     test_user = User.get(session=session, email="admin@baraman.net")
@@ -476,64 +579,17 @@ def test_get_monthly_revenue_with_months():
     revenue_list = []
 
     if month_range != 1:
-        previous_start_date = now - relativedelta(months=month_range - 1)
-        previous_end_date = now - relativedelta(months=1)
-
-        last_date = (
-            session.query(
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
-            )
-            .select_from(UserInvoice)
-            .order_by(
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
+        for i in range(month_range - 1, 0, -1):
+            target_date = now - relativedelta(months=i)
+            invoice_count, revenue = (
+                session.query(func.count(UserInvoice.id), func.sum(UserInvoice.revenue))
+                .filter(UserInvoice.year == target_date.year, UserInvoice.month == target_date.month)
+                .first()
             )
-            .first()
-        )
-
-        if previous_start_date.year < last_date[0] and previous_start_date.month < last_date[1]:
-            previous_start_date = datetime(last_date[0], last_date[1], 1)
-
-        sub_query = (
-            session.query(
-                label("date", cast(UserInvoice.year, String) + "-" + cast(UserInvoice.month, String)),
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
-                func.sum(UserInvoice.revenue).label("revenue"),
-            )
-            .group_by(
-                UserInvoice.year,
-                UserInvoice.month,
-            )
-            .subquery()
-        )
-
-        previous_revenue_list = (
-            session.query(
-                sub_query.c.year.label("year"),
-                sub_query.c.month.label("month"),
-                sub_query.c.revenue.label("revenue"),
-            )
-            .select_from(sub_query)
-            .filter(
-                sub_query.c.date.between(
-                    f"{previous_start_date.year}-{previous_start_date.month}",
-                    f"{previous_end_date.year}-{previous_end_date.month}",
+            if invoice_count:
+                revenue_list.append(
+                    {"year": target_date.year, "month": target_date.month, "revenue": int(revenue or 0)}
                 )
-            )
-            .order_by(
-                sub_query.c.year,
-                sub_query.c.month,
-            )
-            .all()
-        )
-        for revenue in previous_revenue_list:
-            revenue = revenue._asdict()
-            revenue["year"] = int(revenue["year"])
-            revenue["month"] = int(revenue["month"])
-            revenue["revenue"] = int(revenue["revenue"]) if revenue["revenue"] else 0
-            revenue_list.append(revenue)
 
     revenue_list.append(current_revenue_obj)
 
@@ -589,64 +645,17 @@ def test_get_monthly_revenue_with_many_months():
     revenue_list = []
 
     if month_range != 1:
-        previous_start_date = now - relativedelta(months=month_range - 1)
-        previous_end_date = now - relativedelta(months=1)
-
-        last_date = (
-            session.query(
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
+        for i in range(month_range - 1, 0, -1):
+            target_date = now - relativedelta(months=i)
+            invoice_count, revenue = (
+                session.query(func.count(UserInvoice.id), func.sum(UserInvoice.revenue))
+                .filter(UserInvoice.year == target_date.year, UserInvoice.month == target_date.month)
+                .first()
             )
-            .select_from(UserInvoice)
-            .order_by(
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
-            )
-            .first()
-        )
-
-        if previous_start_date.year < last_date[0] and previous_start_date.month < last_date[1]:
-            previous_start_date = datetime(last_date[0], last_date[1], 1)
-
-        sub_query = (
-            session.query(
-                label("date", cast(UserInvoice.year, String) + "-" + cast(UserInvoice.month, String)),
-                UserInvoice.year.label("year"),
-                UserInvoice.month.label("month"),
-                func.sum(UserInvoice.revenue).label("revenue"),
-            )
-            .group_by(
-                UserInvoice.year,
-                UserInvoice.month,
-            )
-            .subquery()
-        )
-
-        previous_revenue_list = (
-            session.query(
-                sub_query.c.year.label("year"),
-                sub_query.c.month.label("month"),
-                sub_query.c.revenue.label("revenue"),
-            )
-            .select_from(sub_query)
-            .filter(
-                sub_query.c.date.between(
-                    f"{previous_start_date.year}-{previous_start_date.month}",
-                    f"{previous_end_date.year}-{previous_end_date.month}",
+            if invoice_count:
+                revenue_list.append(
+                    {"year": target_date.year, "month": target_date.month, "revenue": int(revenue or 0)}
                 )
-            )
-            .order_by(
-                sub_query.c.year,
-                sub_query.c.month,
-            )
-            .all()
-        )
-        for revenue in previous_revenue_list:
-            revenue = revenue._asdict()
-            revenue["year"] = int(revenue["year"])
-            revenue["month"] = int(revenue["month"])
-            revenue["revenue"] = int(revenue["revenue"]) if revenue["revenue"] else 0
-            revenue_list.append(revenue)
 
     revenue_list.append(current_revenue_obj)
 
@@ -1152,11 +1161,24 @@ def test_get_current_month_insurance_company_rate_with_none_ARW_permission():
     assert response.json() == result
 
 
-conf_dict = asdict(conf())
-db.init_app(app, **conf_dict)
-Base.metadata.create_all(db.engine)
-session = next(db.session())
-create_test_users(session=session)
-create_dummy_data(db)
+def test_create_dummy_users_skips_existing_emails():
+    session = next(db.session())
+    existing_ids = [User.get(session=session, email=email).id for email in USER_EMAILS]
+
+    # 더미 데이터가 적재된 상태에서 다시 실행해도 기존 계정은 그대로 두고 새 계정에만 권한 추가
+    users = create_users(session, len(USER_EMAILS) + 2, Random(0))
+
+    assert len(users) == len(USER_EMAILS) + 2
+    assert [user.id for user in users[: len(USER_EMAILS)]] == existing_ids
+    for user in users:
+        assert Permission.filter(session=session, user_id=user.id).count() == 1
+
+
+@pytest.fixture(scope="module", autouse=True)
+def module_data(seed_data):
+    session = next(db.session())
+    create_test_users(session=session)
+
+
 expired_token = create_expired_jwt()
 client = TestClient(app)
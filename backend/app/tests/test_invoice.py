@@ -0,0 +1,256 @@
+from uuid import uuid4
+
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database.conn import db
+from app.database.schema import (
+    CompanyInvoice,
+    InsuranceCompany,
+    Permission,
+    Transaction,
+    User,
+    UserInvoice,
+    UserInvoiceExtra,
+    UserRole,
+)
+from app.main import app
+from app.routes.invoice import calculate_all_user_invoices, calculate_user_invoice
+from app.utils.jwt import auth_handler
+
+DRIVER_EMAILS = ["driver1@baraman.net", "driver2@baraman.net", "driver3@baraman.net"]
+INVOICE_COLUMNS = [
+    "contract_fee",
+    "plate_fee",
+    "transaction_count",
+    "canceled_transaction_count",
+    "revenue",
+    "cancel_fee",
+    "total_revenue",
+    "total_contract_fee",
+    "first_vat",
+    "first_income",
+    "second_vat",
+    "second_income",
+    "income",
+]
+
+
+def create_test_users(session):
+    UserRole.create(session=session, auto_commit=True, name="대표")
+    admin = User.create(
+        session=session,
+        auto_commit=True,
+        email="admin@baraman.net",
+        email_token=uuid4().hex,
+        password=bcrypt.hashpw("testpassword1!".encode("utf-8"), bcrypt.gensalt()),
+        name="김대표",
+        role_id=UserRole.get(session=session, name="대표").id,
+        status="accepted",
+    )
+    Permission.create(session=session, auto_commit=True, user_id=admin.id, user="ARW", transaction="ARW", invoice="ARW")
+
+    UserRole.create(session=session, auto_commit=True, name="기사")
+    for index, email in enumerate(DRIVER_EMAILS):
+        driver = User.create(
+            session=session,
+            auto_commit=True,
+            email=email,
+            email_token=uuid4().hex,
+            password=bcrypt.hashpw(f"testpassword{index}!".encode("utf-8"), bcrypt.gensalt()),
+            name=f"김기사{index}",
+            role_id=UserRole.get(session=session, name="기사").id,
+            status="accepted",
+            plate_fee=10000 * (index + 1),
+            contract_fee=10.5 + index,
+        )
+        Permission.create(
+            session=session, auto_commit=True, user_id=driver.id, user="SR", transaction="SRW", invoice="SR"
+        )
+
+
+def create_test_transactions(session):
+    company = InsuranceCompany.create(session=session, auto_commit=True, name="애니카")
+    for index, email in enumerate(DRIVER_EMAILS[:2]):
+        user_id = User.get(session=session, email=email).id
+        for day in range(1, 6):
+            Transaction.create(
+                session=session,
+                auto_commit=True,
+                user_id=user_id,
+                insurance_company_id=company.id,
+                vehicle_id=f"12가 {index}{day:03}",
+                vehicle_model="모닝",
+                date=f"2022-03-{day:02}",
+                price=10000 * day + index,
+                memo="",
+                canceled=day == 3,
+                cancel_fee=1500 if day == 3 else 0,
+            )
+    UserInvoiceExtra.create(
+        session=session,
+        auto_commit=True,
+        user_id=User.get(session=session, email=DRIVER_EMAILS[0]).id,
+        year=2022,
+        month=3,
+        name="유류비",
+        price=-3000,
+    )
+
+
+def create_test_JWT(user_id: str) -> str:
+    return auth_handler.encode_token(subject=str(user_id))
+
+
+def get_driver_ids(session) -> list:
+    return [User.get(session=session, email=email).id for email in DRIVER_EMAILS]
+
+
+def test_calculate_all_user_invoices():
+    session = next(db.session())
+    users = session.query(User).filter(User.email.in_(DRIVER_EMAILS)).order_by(User.id).all()
+
+    invoices = calculate_all_user_invoices(users=users, year="2022", month="03", session=session)
+
+    assert [invoice["user_id"] for invoice in invoices] == [user.id for user in users]
+    for user, invoice in zip(users, invoices):
+        expected = calculate_user_invoice(user=user, user_id=user.id, year="2022", month="03", session=session)
+        assert [(extra.name, extra.price) for extra in invoice.pop("extra")] == [
+            (extra.name, extra.price) for extra in expected.pop("extra")
+        ]
+        assert invoice == expected
+
+
+def test_get_user_invoice_reads_fees_from_db():
+    session = next(db.session())
+    test_user = User.get(session=session, email=DRIVER_EMAILS[0])
+    token = create_test_JWT(test_user.id)
+    params = {"year": "2022", "month": "03"}
+
+    first_response = client.get("/api/invoice/user", params=params, headers={"Authorization": f"Bearer {token}"})
+    # 권한 캐시를 거치지 않고 요율을 바꿔도 인증 단계에서 캐시한 사용자 정보가 아닌 DB 값으로 계산
+    User.filter(session=session, id=test_user.id).update(auto_commit=True, plate_fee=50000, contract_fee=20.0)
+    response = client.get("/api/invoice/user", params=params, headers={"Authorization": f"Bearer {token}"})
+
+    assert first_response.status_code == 200
+    assert first_response.json()["result"]["plate_fee"] == 10000
+    assert response.status_code == 200
+    assert response.json()["result"]["plate_fee"] == 50000
+    assert response.json()["result"]["contract_fee"] == 20.0
+
+
+def test_close_month():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    response = client.post(
+        "/api/invoice/close",
+        json={"year": "2022", "month": "03", "rental_fee": 100000, "maintenance_fee": 20000},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    company_invoice = CompanyInvoice.get(session=session, year=2022, month=3)
+    result = {
+        "success": True,
+        "message": "OK",
+        "result": {"created_object_id": company_invoice.id, "created_user_invoice_count": len(DRIVER_EMAILS)},
+    }
+
+    assert response.status_code == 201
+    assert response.json() == result
+    for user_id in get_driver_ids(session):
+        user = User.get(session=session, id=user_id)
+        expected = calculate_user_invoice(user=user, user_id=user_id, year="2022", month="03", session=session)
+        user_invoice = UserInvoice.get(session=session, user_id=user_id, year=2022, month=3)
+        assert {column: getattr(user_invoice, column) for column in INVOICE_COLUMNS} == {
+            column: expected[column] for column in INVOICE_COLUMNS
+        }
+
+
+def test_close_month_skips_closed_user():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    driver_ids = get_driver_ids(session)
+
+    closed_user = User.get(session=session, id=driver_ids[0])
+    closed_invoice = calculate_user_invoice(
+        user=closed_user, user_id=closed_user.id, year="2022", month="03", session=session
+    )
+    del closed_invoice["extra"]
+    closed_invoice.update(year=2022, month=3, income=1)
+    closed_invoice_id = UserInvoice.create(session=session, auto_commit=True, **closed_invoice).id
+
+    response = client.post(
+        "/api/invoice/close",
+        json={"year": "2022", "month": "03", "rental_fee": 100000, "maintenance_fee": 20000},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 201
+    assert response.json()["result"]["created_user_invoice_count"] == len(DRIVER_EMAILS) - 1
+    closed_user_invoices = UserInvoice.filter(session=session, user_id=driver_ids[0], year=2022, month=3).all()
+    assert [(user_invoice.id, user_invoice.income) for user_invoice in closed_user_invoices] == [
+        (closed_invoice_id, 1)
+    ]
+    assert UserInvoice.filter(session=session, year=2022, month=3).count() == len(DRIVER_EMAILS)
+
+
+def test_close_month_already_closed():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    request_body = {"year": "2022", "month": "03", "rental_fee": 100000, "maintenance_fee": 20000}
+
+    first_response = client.post("/api/invoice/close", json=request_body, headers={"Authorization": f"Bearer {token}"})
+    response = client.post("/api/invoice/close", json=request_body, headers={"Authorization": f"Bearer {token}"})
+
+    result = {"success": False, "message": "이미 마감된 월입니다!"}
+
+    assert first_response.status_code == 201
+    assert response.status_code == 400
+    assert response.json() == result
+    assert CompanyInvoice.filter(session=session, year=2022, month=3).count() == 1
+    assert UserInvoice.filter(session=session, year=2022, month=3).count() == len(DRIVER_EMAILS)
+
+
+def test_close_month_with_none_ARW_permission():
+    session = next(db.session())
+    test_user = User.get(session=session, email=DRIVER_EMAILS[0])
+    token = create_test_JWT(test_user.id)
+
+    response = client.post(
+        "/api/invoice/close",
+        json={"year": "2022", "month": "03", "rental_fee": 100000, "maintenance_fee": 20000},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    result = {"success": False, "message": "권한이 없습니다!"}
+
+    assert response.status_code == 403
+    assert response.json() == result
+    assert not CompanyInvoice.get(session=session, year=2022, month=3)
+    assert UserInvoice.filter(session=session, year=2022, month=3).count() == 0
+
+
+def test_close_month_without_JWT():
+    response = client.post(
+        "/api/invoice/close", json={"year": "2022", "month": "03", "rental_fee": 100000, "maintenance_fee": 20000}
+    )
+
+    result = {"detail": "Not authenticated"}
+
+    assert response.status_code == 403
+    assert response.json() == result
+
+
+@pytest.fixture(scope="module", autouse=True)
+def module_data(module_transaction):
+    session = next(db.session())
+    create_test_users(session=session)
+    create_test_transactions(session=session)
+
+
+client = TestClient(app)
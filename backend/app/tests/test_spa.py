@@ -0,0 +1,84 @@
+import gzip
+import re
+
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.main import app
+from app.utils.static_files import CachedStaticFiles
+
+
+def test_render_spa():
+    response = client.get("/transaction/list", headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert b'<script defer src="/build/bundle.js?v=' in response.content
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["etag"].startswith('"')
+    assert "content-encoding" not in response.headers
+
+
+def test_render_spa_with_gzip():
+    index_html = client.get("/", headers={"Accept-Encoding": "identity"}).content
+
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == index_html
+
+
+def test_render_spa_not_modified():
+    etag = client.get("/", headers={"Accept-Encoding": "identity"}).headers["etag"]
+
+    response = client.get("/invoice", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_render_spa_modified_for_other_encoding():
+    gzip_etag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+    response = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != gzip_etag
+    assert "content-encoding" not in response.headers
+
+
+def test_get_versioned_static_file():
+    index_html = client.get("/", headers={"Accept-Encoding": "identity"}).text
+    bundle_url = re.search(r'src="(/build/bundle\.js\?v=[0-9a-f]+)"', index_html)[1]
+
+    response = client.get(bundle_url)
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    response = client.get("/build/bundle.js", headers={"If-None-Match": response.headers["etag"]})
+
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_get_static_file_modified_for_other_encoding(tmp_path):
+    (tmp_path / "bundle.js").write_text("console.log('bundle');")
+    (tmp_path / "bundle.js.gz").write_bytes(gzip.compress(b"console.log('bundle');"))
+    static_client = TestClient(Starlette(routes=[Mount("/build", app=CachedStaticFiles(directory=str(tmp_path)))]))
+    gzip_response = static_client.get("/build/bundle.js", headers={"Accept-Encoding": "gzip"})
+
+    response = static_client.get(
+        "/build/bundle.js", headers={"Accept-Encoding": "identity", "If-None-Match": gzip_response.headers["etag"]}
+    )
+
+    assert gzip_response.headers["content-encoding"] == "gzip"
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.text == "console.log('bundle');"
+
+
+client = TestClient(app)
@@ -1,13 +1,18 @@
-from dataclasses import asdict
+import csv
+from datetime import date
+import gzip
+import io
 from uuid import uuid4
 
 import bcrypt
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
-from app.common.config import conf
-from app.database.conn import db, Base
-from app.database.schema import Permission, InsuranceCompany, Transaction, User, UserRole
+from app.database.conn import db
+from app.database.schema import DailyRevenue, Permission, InsuranceCompany, Transaction, User, UserRole
 from app.main import app
+from app.routes.transaction import invalidate_transaction_count_cache
 from app.tests.create_expired_jwt import create_expired_jwt
 from app.utils.jwt import auth_handler
 from app.utils.date import get_now_datetime
@@ -373,6 +378,107 @@ def test_create_transaction_not_exists_company_id():
     assert response.json() == result
 
 
+def test_bulk_create_transaction():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    transaction_user = User.get(session=session, email="driver@baraman.net")
+    company = InsuranceCompany.get(session=session, name="애니카")
+
+    request_body = [
+        {
+            "user_id": transaction_user.id,
+            "insurance_company_id": company.id,
+            "vehicle_id": f"22가 {i:04d}",
+            "vehicle_model": "일괄생성",
+            "date": get_now_datetime().strftime("%Y-%m-%d"),
+            "price": 10000 + i,
+        }
+        for i in range(30)
+    ]
+    response = client.post("/api/transaction/bulk", json=request_body, headers={"Authorization": f"Bearer {token}"})
+
+    result = {"success": True, "message": "OK", "result": {"created_count": 30}}
+
+    assert response.status_code == 201
+    assert response.json() == result
+    assert Transaction.filter(session=session, vehicle_model="일괄생성", user_id=transaction_user.id).count() == 30
+
+
+def test_bulk_create_transaction_with_csv():
+    session = next(db.session())
+    test_user = User.get(session=session, email="driver@baraman.net")
+    token = create_test_JWT(test_user.id)
+    company = InsuranceCompany.get(session=session, name="애니카")
+    date = get_now_datetime().strftime("%Y-%m-%d")
+
+    request_body = (
+        "insurance_company_id,vehicle_id,vehicle_model,date,price,memo\n"
+        + f"{company.id},33가 0001,일괄CSV,{date},20000,\n"
+        + f"{company.id},33가 0002,일괄CSV,{date},30000,야간\n"
+    )
+    response = client.post(
+        "/api/transaction/bulk",
+        data=request_body.encode("utf-8"),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "text/csv"},
+    )
+
+    result = {"success": True, "message": "OK", "result": {"created_count": 2}}
+
+    assert response.status_code == 201
+    assert response.json() == result
+    assert Transaction.filter(session=session, vehicle_model="일괄CSV", user_id=test_user.id).count() == 2
+
+
+def test_bulk_create_transaction_with_invalid_rows():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    company = InsuranceCompany.get(session=session, name="애니카")
+    date = get_now_datetime().strftime("%Y-%m-%d")
+
+    request_body = [
+        {
+            "insurance_company_id": company.id,
+            "vehicle_id": "44가 0001",
+            "vehicle_model": "일괄실패",
+            "date": date,
+            "price": 1,
+        },
+        {"insurance_company_id": 99999, "vehicle_id": "44가 0002", "vehicle_model": "일괄실패", "date": date, "price": 1},
+        {"insurance_company_id": company.id, "vehicle_id": "44가 0003", "vehicle_model": "일괄실패", "date": date},
+    ]
+    response = client.post("/api/transaction/bulk", json=request_body, headers={"Authorization": f"Bearer {token}"})
+
+    result = {
+        "success": False,
+        "message": "유효하지 않은 거래가 포함되어 있습니다!",
+        "result": {
+            "error_list": [
+                {"row": 2, "message": "존재하지 않는 보험사입니다!"},
+                {"row": 3, "message": "값이 올바르지 않습니다! (price)"},
+            ]
+        },
+    }
+
+    assert response.status_code == 400
+    assert response.json() == result
+    assert Transaction.filter(session=session, vehicle_model="일괄실패").count() == 0
+
+
+def test_bulk_create_transaction_none_permission():
+    session = next(db.session())
+    test_user = User.get(session=session, email="manager@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    response = client.post("/api/transaction/bulk", json=[{}], headers={"Authorization": f"Bearer {token}"})
+
+    result = {"success": False, "message": "권한이 없습니다!"}
+
+    assert response.status_code == 403
+    assert response.json() == result
+
+
 def test_get_transaction_with_AR_permission():
     session = next(db.session())
     test_user = User.get(session=session, email="admin@baraman.net")
@@ -969,13 +1075,339 @@ def test_delete_transaction_not_exists_transaction_id():
     assert response.json() == result
 
 
-conf_dict = asdict(conf())
-db.init_app(app, **conf_dict)
-Base.metadata.create_all(db.engine)
-session = next(db.session())
-create_test_roles(session=session)
-create_test_users(session=session)
-create_test_insurance_companys(session=session)
-create_test_transactions(session=session)
+def get_daily_revenue(session) -> dict:
+    rows = session.query(
+        DailyRevenue.date,
+        DailyRevenue.user_id,
+        DailyRevenue.insurance_company_id,
+        DailyRevenue.transaction_count,
+        DailyRevenue.canceled_transaction_count,
+        DailyRevenue.revenue,
+        DailyRevenue.cancel_fee,
+    ).all()
+    # 증분 반영으로 0이 된 Row는 rebuild 결과에는 없으므로 제외
+    return {tuple(row[:3]): tuple(row[3:]) for row in rows if any(row[3:])}
+
+
+def assert_daily_revenue_rebuilt(session) -> dict:
+    daily_revenue = get_daily_revenue(session)
+    DailyRevenue.rebuild(session=session)
+    assert daily_revenue == get_daily_revenue(session)
+    return daily_revenue
+
+
+def test_update_transaction_date_updates_daily_revenue():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    driver_id = User.get(session=session, email="driver@baraman.net").id
+    transaction = Transaction.filter(session=session, user_id=driver_id).first()
+    user_id, insurance_company_id = transaction.user_id, transaction.insurance_company_id
+
+    response = client.put(
+        f"/api/transaction/{transaction.id}", headers={"Authorization": f"Bearer {token}"}, json={"date": "2022-01-15"}
+    )
+
+    assert response.status_code == 200
+    daily_revenue = assert_daily_revenue_rebuilt(session)
+    assert daily_revenue[(date(2022, 1, 15), user_id, insurance_company_id)] == (1, 0, transaction.price, 0)
+
+
+def test_update_transaction_user_updates_daily_revenue():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    driver_id = User.get(session=session, email="driver@baraman.net").id
+    transaction = Transaction.filter(session=session, user_id=driver_id).first()
+    transaction_date, insurance_company_id = transaction.date, transaction.insurance_company_id
+
+    response = client.put(
+        f"/api/transaction/{transaction.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"user_id": test_user.id},
+    )
+
+    assert response.status_code == 200
+    daily_revenue = assert_daily_revenue_rebuilt(session)
+    assert (transaction_date, driver_id, insurance_company_id) not in daily_revenue
+    assert (transaction_date, test_user.id, insurance_company_id) in daily_revenue
+
+
+def test_update_transaction_canceled_updates_daily_revenue():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    driver_id = User.get(session=session, email="driver@baraman.net").id
+    transaction = Transaction.filter(session=session, user_id=driver_id).first()
+    key = (transaction.date, transaction.user_id, transaction.insurance_company_id)
+
+    response = client.put(
+        f"/api/transaction/{transaction.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"canceled": True, "cancel_fee": 5000},
+    )
+
+    assert response.status_code == 200
+    daily_revenue = assert_daily_revenue_rebuilt(session)
+    assert daily_revenue[key] == (1, 1, 0, 5000)
+
+
+def test_delete_transaction_updates_daily_revenue():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    driver_id = User.get(session=session, email="driver@baraman.net").id
+    transaction = Transaction.filter(session=session, user_id=driver_id).first()
+    key = (transaction.date, transaction.user_id, transaction.insurance_company_id)
+
+    response = client.delete(f"/api/transaction/{transaction.id}", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    daily_revenue = assert_daily_revenue_rebuilt(session)
+    assert key not in daily_revenue
+
+
+def test_rebuild_daily_revenue_locks_transactions_first():
+    session = next(db.session())
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, getattr(context.compiled.statement, "_for_update_arg", None) is not None))
+
+    event.listen(db.engine, "before_cursor_execute", record_statement)
+    try:
+        DailyRevenue.rebuild(session=session, start_date="2022-01-01", end_date="2022-12-31")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record_statement)
+
+    # 집계를 지우기 전에 기간 내 거래를 잠금
+    assert statements[0][1]
+    assert "FROM transaction" in statements[0][0].replace('"', "").replace("`", "")
+    assert statements[1][0].startswith("DELETE FROM daily_revenue")
+
+
+def test_get_transaction_issues_single_query():
+    session = next(db.session())
+    transaction = Transaction.filter(session=session).order_by("id").first()
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    session = next(db.session())
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        loaded = Transaction.get(session=session, id=transaction.id)
+        assert loaded.id == transaction.id
+        assert len(statements) == 1
+
+        statements.clear()
+        assert Transaction.get(session=session, id=transaction.id) is loaded
+        assert len(statements) == 0
+
+        statements.clear()
+        assert Transaction.get(session=session, id=transaction.id, user_id=transaction.user_id)
+        assert len(statements) == 1
+        assert "count(" not in statements[0].lower()
+
+        statements.clear()
+        with pytest.raises(Exception, match="Only one row is supposed to be returned, but got more than one."):
+            Transaction.get(session=session, vehicle_model="모닝")
+        assert len(statements) == 1
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+        session.close()
+
+
+def test_get_transaction_table_with_cursor_pagination():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    offset_response = client.post(
+        "/api/transaction/table",
+        json={"order_by": "price", "order_type": "desc", "limit": 100},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    expected_ids = [transaction["id"] for transaction in offset_response.json()["result"]["transaction_list"]]
+
+    transaction_ids = []
+    request_body = {"order_by": "price", "order_type": "desc", "limit": 2, "pagination": "cursor"}
+    while True:
+        response = client.post(
+            "/api/transaction/table", json=request_body, headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+        assert "total_length" not in response.json()["result"]
+        transaction_list = response.json()["result"]["transaction_list"]
+        assert len(transaction_list) <= 2
+        transaction_ids += [transaction["id"] for transaction in transaction_list]
+
+        next_cursor = response.json()["result"]["next_cursor"]
+        if next_cursor is None:
+            break
+        request_body["cursor"] = next_cursor
+
+    assert sorted(transaction_ids) == sorted(expected_ids)
+    assert len(set(transaction_ids)) == len(transaction_ids)
+
+
+def test_get_transaction_table_with_invalid_cursor():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    response = client.post(
+        "/api/transaction/table",
+        json={"pagination": "cursor", "cursor": "invalid"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    result = {"success": False, "message": "cursor가 올바르지 않습니다!"}
+
+    assert response.status_code == 400
+    assert response.json() == result
+
+
+def test_get_transaction_table_count():
+    session = next(db.session())
+    test_user = User.get(session=session, email="driver@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    response = client.post("/api/transaction/table/count", json={}, headers={"Authorization": f"Bearer {token}"})
+
+    total_length = Transaction.filter(session=session, user_id=test_user.id).count()
+    result = {"success": True, "message": "OK", "result": {"total_length": total_length}}
+
+    assert response.status_code == 200
+    assert response.json() == result
+
+
+def test_get_transaction_table_total_length_not_cached():
+    session = next(db.session())
+    test_user = User.get(session=session, email="driver@baraman.net")
+    token = create_test_JWT(test_user.id)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    cached_length = client.post("/api/transaction/table/count", json={}, headers=headers).json()["result"]
+    insurance_company_id = session.query(InsuranceCompany.id).first()[0]
+    # 다른 워커에서 생성된 거래처럼 이 워커의 건수 캐시를 무효화하지 않고 추가
+    Transaction.create(
+        session=session,
+        auto_commit=True,
+        user_id=test_user.id,
+        insurance_company_id=insurance_company_id,
+        vehicle_id="99가 9999",
+        vehicle_model="캐시",
+        date="2022-06-04",
+        price=1000,
+        memo="",
+    )
+
+    try:
+        offset_response = client.post("/api/transaction/table", json={}, headers=headers)
+        count_response = client.post("/api/transaction/table/count", json={}, headers=headers)
+
+        assert offset_response.json()["result"]["total_length"] == cached_length["total_length"] + 1
+        assert count_response.json()["result"] == cached_length
+    finally:
+        invalidate_transaction_count_cache()
+
+
+def test_get_transaction_table_count_without_JWT():
+    response = client.post("/api/transaction/table/count", json={})
+
+    result = {"detail": "Not authenticated"}
+
+    assert response.status_code == 403
+    assert response.json() == result
+
+
+def test_export_transaction():
+    session = next(db.session())
+    test_user = User.get(session=session, email="driver@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    response = client.post("/api/transaction/export", json={}, headers={"Authorization": f"Bearer {token}"})
+
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+    transaction_count = Transaction.filter(session=session, user_id=test_user.id).count()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert rows[0][0] == "id"
+    assert len(rows) == transaction_count + 1
+    assert all(row[7] == str(test_user.id) for row in rows[1:])
+
+
+def get_export_query_count() -> int:
+    metric = 'db_queries_total{method="POST",route="/api/transaction/export"} '
+    line = next((line for line in client.get("/metrics").text.splitlines() if line.startswith(metric)), None)
+    return int(line[len(metric):]) if line else 0
+
+
+def test_export_transaction_query_metrics():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    query_count = get_export_query_count()
+    event.listen(db.engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.post("/api/transaction/export", json={}, headers={"Authorization": f"Bearer {token}"})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == 200
+    # CSV 본문을 만드는 동안 실행된 SELECT까지 집계되어야 함
+    assert any("JOIN insurance_company" in statement for statement in statements)
+    assert get_export_query_count() - query_count == len(statements)
+
+
+def test_export_transaction_with_gzip():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+
+    response = client.post(
+        "/api/transaction/export", json={"gzip": True}, headers={"Authorization": f"Bearer {token}"}
+    )
+
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.content).decode("utf-8-sig"))))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert len(rows) == Transaction.filter(session=session).count() + 1
+
+
+def test_export_transaction_other_user_with_SRW_permission():
+    session = next(db.session())
+    test_user = User.get(session=session, email="driver@baraman.net")
+    token = create_test_JWT(test_user.id)
+    other_user = User.get(session=session, email="admin@baraman.net")
+
+    response = client.post(
+        "/api/transaction/export", json={"user_id": str(other_user.id)}, headers={"Authorization": f"Bearer {token}"}
+    )
+
+    result = {"success": False, "message": "권한이 없습니다!"}
+
+    assert response.status_code == 403
+    assert response.json() == result
+
+
+@pytest.fixture(scope="module", autouse=True)
+def module_data(module_transaction):
+    session = next(db.session())
+    create_test_roles(session=session)
+    create_test_users(session=session)
+    create_test_insurance_companys(session=session)
+    create_test_transactions(session=session)
+
+
 expired_token = create_expired_jwt()
 client = TestClient(app)
@@ -1,17 +1,23 @@
-from dataclasses import asdict
 from operator import itemgetter
+from threading import BoundedSemaphore
 from uuid import uuid4
 
 import bcrypt
+from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
-from app.common.config import conf
-from app.database.conn import db, Base
-from app.database.schema import Permission, User, UserRole
+from app.database.conn import db
+from app.database.schema import EmailOutbox, Permission, User, UserRole
 from app.main import app
 from app.tests.create_expired_jwt import create_expired_jwt
+from app.utils.auth import load_auth_context
+from app.utils.email_outbox import LocalTransport, email_outbox
 from app.utils.jwt import auth_handler
+from app.utils.password import password_hasher
+from app.utils.permission_cache import permission_cache
 
 
 def create_test_users(session):
@@ -227,6 +233,19 @@ def test_create_user():
     assert User.get(session=session, id=created_object_id).email == "create_test@baraman.net"
 
 
+def test_create_user_enqueues_verification_mail():
+    response = client.post("/api/user",
+                           json={"email": "create_test@baraman.net", "password": "testpassword1!", "name": "김계정생성"})
+
+    session = next(db.session())
+    queued = EmailOutbox.filter(session=session, destination="create_test@baraman.net").all()
+
+    assert response.status_code == 201
+    assert User.get(session=session, id=response.json()["result"]["created_object_id"])
+    assert len(queued) == 1
+    assert queued[0].status == "pending"
+
+
 def test_create_user_invalid_params():
     response = client.post("/api/user",
                            json={"email": "create_test@baraman.net", "password": "testpassword1!", "뷁": "뷁"})
@@ -952,6 +971,63 @@ def test_update_user():
     assert updated_object_permission.invoice == "SR"
 
 
+def test_update_user_permission_applied_immediately():
+    session = next(db.session())
+    test_user = User.get(session=session, email="admin@baraman.net")
+    token = create_test_JWT(test_user.id)
+    target_user_id = User.get(session=session, email="verified3@baraman.net").id
+    target_token = create_test_JWT(target_user_id)
+    role_id = UserRole.get(session=session, name="기사").id
+
+    # 테스트마다 데이터가 되돌아가므로 승인된 사용자 상태를 직접 만듦
+    response = client.put(f"/api/user/{target_user_id}", headers={"Authorization": f"Bearer {token}"},
+                          json={
+                              "role_id": role_id,
+                              "status": "accepted",
+                              "permission_user": "SR",
+                              "permission_transaction": "SRW",
+                              "permission_invoice": "SR"
+                          })
+    assert response.status_code == 200
+
+    response = client.get("/api/user", headers={"Authorization": f"Bearer {target_token}"})
+    assert response.status_code == 403
+
+    response = client.put(f"/api/user/{target_user_id}", headers={"Authorization": f"Bearer {token}"},
+                          json={"plate_fee": 1000, "permission_user": "AR"})
+    assert response.status_code == 200
+
+    response = client.get("/api/user", headers={"Authorization": f"Bearer {target_token}"})
+    assert response.status_code == 200
+
+    response = client.get("/api/user", headers={"Authorization": f"Bearer {target_token}"})
+    assert response.status_code == 200
+    assert response.headers["X-Permission-Cache-Saved-Queries"] == "1"
+
+    response = client.put(f"/api/user/{target_user_id}", headers={"Authorization": f"Bearer {token}"},
+                          json={"plate_fee": 1000, "permission_user": "SR"})
+    assert response.status_code == 200
+
+    response = client.get("/api/user", headers={"Authorization": f"Bearer {target_token}"})
+    assert response.status_code == 403
+
+
+def test_permission_cache_invalidated_after_commit():
+    session = next(db.session())
+    user_id = User.get(session=session, email="manager@baraman.net").id
+    cached = permission_cache.get_or_load(
+        user_id, lambda: load_auth_context(session=session, user_id=user_id), query_count=1
+    )
+    assert cached.permission.invoice != "ARW"
+
+    Permission.filter(session=session, user_id=user_id).update(invoice="ARW")
+    # 커밋 전에는 다른 요청이 아직 이전 권한을 보므로 캐시를 유지
+    assert user_id in permission_cache._cache
+
+    session.commit()
+    assert user_id not in permission_cache._cache
+
+
 def test_update_user_short_name():
     session = next(db.session())
     test_user = User.get(session=session, email="admin@baraman.net")
@@ -1251,6 +1327,7 @@ def test_delete_user_not_exists_user():
 
 
 def test_login():
+    session = next(db.session())
     response = client.post("/api/user/login", json={"email": "manager@baraman.net", "password": "testpassword1!"})
     response_json = response.json()
     user_id = User.get(session=session, email="manager@baraman.net").id
@@ -1293,6 +1370,48 @@ def test_login_wrong_password():
     assert response.json() == result
 
 
+def test_login_when_password_hasher_busy(monkeypatch):
+    monkeypatch.setattr(password_hasher, "_slots", BoundedSemaphore(1))
+    password_hasher._slots.acquire()
+
+    response = client.post("/api/user/login", json={"email": "manager@baraman.net", "password": "testpassword1!"})
+
+    result = {"success": False, "message": "요청이 많습니다. 잠시 후 다시 시도해 주세요!"}
+
+    assert response.status_code == 503
+    assert response.json() == result
+
+
+def test_decode_token_cache_honours_exp(monkeypatch):
+    token = auth_handler.encode_token(subject="1")
+
+    assert auth_handler.decode_token(token=token) == "1"
+    assert auth_handler.decode_token(token=token) == "1"
+
+    expires_at = auth_handler.verify_token(token=token)[1]
+    monkeypatch.setattr("app.utils.jwt.time", lambda: expires_at + 1)
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth_handler.decode_token(token=token)
+
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Token expired"
+
+
+def test_load_auth_context():
+    session = next(db.session())
+    admin = User.get(session=session, email="admin@baraman.net")
+    registered = User.get(session=session, email="registered@baraman.net")
+
+    auth = load_auth_context(session=session, user_id=admin.id)
+
+    assert auth.user_id == admin.id
+    assert auth.permission.user_id == admin.id
+    assert auth.has(user=[auth.permission.user])
+    assert not auth.has(user=["뷁"])
+    assert load_auth_context(session=session, user_id=registered.id) is None
+
+
 def test_login_registered_status_user():
     response = client.post("/api/user/login", json={"email": "registered@baraman.net", "password": "testpassword1!"})
 
@@ -1394,6 +1513,84 @@ def test_send_password_reset_mail():
     assert previous_email_token != current_email_token
 
 
+def test_send_password_reset_mail_enqueued():
+    response = client.get("/api/user/reset-password/manager@baraman.net")
+
+    session = next(db.session())
+    queued = EmailOutbox.filter(session=session, destination="manager@baraman.net").all()
+
+    assert response.status_code == 200
+    assert len(queued) == 1
+    assert queued[0].status == "pending"
+    assert queued[0].attempts == 0
+
+
+def test_email_outbox_enqueue_commits_with_caller():
+    session = next(db.session())
+    commits = []
+    event.listen(session, "after_commit", commits.append)
+    email_outbox._wakeup.clear()
+
+    # 메일을 보내게 된 변경과 함께 커밋되도록 enqueue는 커밋하지 않고, 커밋된 뒤에 워커를 깨움
+    email_outbox.enqueue(session=session, destination="manager@baraman.net", subject="제목", body="본문")
+    assert not commits
+    assert not email_outbox._wakeup.is_set()
+
+    session.commit()
+    assert len(commits) == 1
+    assert email_outbox._wakeup.is_set()
+
+
+def test_email_outbox_process_batch(monkeypatch):
+    transport = LocalTransport()
+    monkeypatch.setattr(email_outbox, "_transport", transport)
+    client.get("/api/user/reset-password/manager@baraman.net")
+    client.get("/api/user/reset-password/admin@baraman.net")
+
+    session = next(db.session())
+    processed = email_outbox.process_batch(session=session)
+
+    session = next(db.session())
+    rows = EmailOutbox.filter(session=session).order_by("id").all()
+
+    assert processed == 2
+    assert [message.destination for message in transport.sent] == ["manager@baraman.net", "admin@baraman.net"]
+    assert [row.status for row in rows] == ["sent", "sent"]
+    assert all(row.sent_at is not None for row in rows)
+    assert email_outbox.process_batch(session=session) == 0
+
+
+def test_email_outbox_retry_with_backoff(monkeypatch):
+    class FailingTransport:
+        def send_batch(self, messages):
+            raise Exception("Token does not exist!")
+
+    monkeypatch.setattr(email_outbox, "_transport", FailingTransport())
+    client.get("/api/user/reset-password/manager@baraman.net")
+
+    session = next(db.session())
+    assert email_outbox.process_batch(session=session) == 1
+    # 다음 시도 시각 전에는 다시 보내지 않음
+    assert email_outbox.process_batch(session=session) == 0
+
+    row = EmailOutbox.get(session=session, destination="manager@baraman.net")
+    assert row.status == "pending"
+    assert row.attempts == 1
+    assert row.last_error == "Token does not exist!"
+    assert email_outbox.get_retry_delay(1).total_seconds() == email_outbox.retry_delay
+    assert email_outbox.get_retry_delay(2).total_seconds() == email_outbox.retry_delay * 2
+    assert email_outbox.get_retry_delay(99).total_seconds() == email_outbox.retry_max_delay
+
+    row_id = row.id
+    EmailOutbox.filter(session=session, id=row_id).update(
+        auto_commit=True, attempts=email_outbox.max_attempts - 1, next_attempt_at=row.created_at
+    )
+    assert email_outbox.process_batch(session=session) == 1
+
+    session = next(db.session())
+    assert EmailOutbox.get(session=session, id=row_id).status == "failed"
+
+
 def test_send_password_reset_mail_invalid_email():
     response = client.get("/api/user/reset-password/뷁")
 
@@ -1482,11 +1679,12 @@ def test_reset_passwords_do_not_match():
     assert response.json() == result
 
 
-conf_dict = asdict(conf())
-db.init_app(app, **conf_dict)
-Base.metadata.create_all(db.engine)
-session = next(db.session())
-create_test_roles(session=session)
-create_test_users(session=session)
+@pytest.fixture(scope="module", autouse=True)
+def module_data(module_transaction):
+    session = next(db.session())
+    create_test_roles(session=session)
+    create_test_users(session=session)
+
+
 expired_token = create_expired_jwt()
 client = TestClient(app)
@@ -1,12 +1,11 @@
-from dataclasses import asdict
 from uuid import uuid4
 
 import bcrypt
+import pytest
 from fastapi.encoders import jsonable_encoder
 from fastapi.testclient import TestClient
 
-from app.common.config import conf
-from app.database.conn import db, Base
+from app.database.conn import db
 from app.database.schema import Permission, User, UserRole
 from app.main import app
 from app.tests.create_expired_jwt import create_expired_jwt
@@ -761,11 +760,12 @@ def test_delete_role_using_role():
     assert response.json() == result
 
 
-conf_dict = asdict(conf())
-db.init_app(app, **conf_dict)
-Base.metadata.create_all(db.engine)
-session = next(db.session())
-create_test_roles(session=session)
-create_test_users(session=session)
+@pytest.fixture(scope="module", autouse=True)
+def module_data(module_transaction):
+    session = next(db.session())
+    create_test_roles(session=session)
+    create_test_users(session=session)
+
+
 expired_token = create_expired_jwt()
 client = TestClient(app)
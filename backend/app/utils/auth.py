@@ -1,12 +1,108 @@
+from dataclasses import dataclass
 from typing import Optional
 
+from fastapi import Depends, Request, Security
+from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+
+from app.database.conn import db
 from app.database.schema import User, Permission
+from app.utils.jwt import auth_handler, authorization
+from app.utils.permission_cache import PermissionInfo, permission_cache
+
+
+class PermissionDenied(Exception):
+    """
+    권한이 없는 경우 (require_permission에서 발생, 403 응답으로 변환)
+    """
+
+
+@dataclass(frozen=True)
+class AuthContext:
+    """
+    요청 단위 인증 정보 (권한 캐시에는 권한 값만 저장, 요율 등 사용자 정보는 라우트에서 DB로 조회)
+    승인되지 않은 계정이거나 권한이 없으면 permission은 None
+    """
+
+    user_id: int
+    permission: Optional[PermissionInfo] = None
+
+    def has(self, **levels) -> bool:
+        """
+        e.g. auth.has(transaction=["AR", "ARW"])
+        """
+        if self.permission is None:
+            return False
+        return all(getattr(self.permission, key) in allowed for key, allowed in levels.items())
+
+
+def get_auth_context(
+    session: Session = Depends(db.session),
+    jwt_token: HTTPAuthorizationCredentials = Security(authorization),
+) -> AuthContext:
+    """
+    JWT 검증 후 사용자/권한 정보 조회 의존성
+    같은 요청 안에서는 FastAPI 의존성 캐시로 한 번만 실행된다.
+    """
+    user_id = int(auth_handler.decode_token(token=jwt_token.credentials))
+    return load_cached_auth_context(session=session, user_id=user_id)
+
+
+def require_permission(**levels):
+    """
+    라우트에 필요한 권한 수준 선언
+    e.g. auth: AuthContext = Depends(require_permission(user=["ARW"]))
+    levels를 생략하면 권한 정보가 있는(승인된) 사용자인지만 확인한다.
+    """
+
+    def check_permission(auth: AuthContext = Depends(get_auth_context)) -> AuthContext:
+        if not auth.has(**levels):
+            raise PermissionDenied()
+        return auth
+
+    return check_permission
+
+
+async def permission_denied_handler(request: Request, exc: PermissionDenied) -> JSONResponse:
+    return JSONResponse(status_code=403, content=dict(success=False, message="권한이 없습니다!"))
+
+
+def get_permission_info(session: Session, user_id: int) -> Optional[PermissionInfo]:
+    return load_cached_auth_context(session=session, user_id=user_id).permission
+
+
+def load_cached_auth_context(session: Session, user_id: int) -> AuthContext:
+    auth = permission_cache.get_or_load(
+        user_id, lambda: load_auth_context(session=session, user_id=user_id), query_count=1
+    )
+    return auth or AuthContext(user_id=user_id)
 
 
-def get_permission_info(session: Session, user_id: int) -> Optional[Permission]:
-    current_user = User.get(session=session, id=user_id, status="accepted")
-    if current_user:
-        return Permission.get(session=session, user_id=current_user.id)
+def load_auth_context(session: Session, user_id: int) -> Optional[AuthContext]:
+    """
+    User + Permission JOIN 한 번으로 승인된 사용자의 권한 조회
+    """
+    row = (
+        session.query(
+            User.id,
+            Permission.user.label("user_permission"),
+            Permission.transaction.label("transaction_permission"),
+            Permission.invoice.label("invoice_permission"),
+        )
+        .join(Permission, Permission.user_id == User.id)
+        .filter(User.id == user_id, User.status == "accepted")
+        .first()
+    )
+    if not row:
+        return
 
-    return
+    return AuthContext(
+        user_id=row.id,
+        permission=PermissionInfo(
+            user_id=row.id,
+            user=row.user_permission,
+            transaction=row.transaction_permission,
+            invoice=row.invoice_permission,
+        ),
+    )
@@ -1,13 +1,26 @@
-from datetime import datetime, timedelta
-from random import choice, randint, uniform
-from uuid import uuid4
+from argparse import ArgumentParser
+import csv
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from itertools import islice
+import os
+from random import Random
+import tempfile
+from time import perf_counter
+from typing import Iterator, List
+from uuid import UUID
 
 import bcrypt
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
 
 from app.database.conn import SQLAlchemy
 from app.database.schema import (
     CompanyInvoice,
     CompanyInvoiceExtra,
+    DailyRevenue,
     InsuranceCompany,
     Transaction,
     User,
@@ -16,122 +29,374 @@ from app.database.schema import (
     UserRole,
     Permission,
 )
-from app.routes.invoice import calculate_company_invoice, calculate_user_invoice
+from app.routes.invoice import calculate_all_user_invoices, calculate_company_invoice
 from app.utils.create_superuser import create_superuser
+from app.utils.date import get_now_datetime
 
+COMPANY_NAMES = ["애니카", "현대해상", "제휴사"]
+USER_NAMES = ["김제니", "박채영", "김지수", "라리사"]
+USER_EMAILS = ["jennie@blackpink.com", "chaeyoung@blackpink.com", "jisoo@blackpink.com", "lalisa@blackpink.com"]
+ROLE_NAME = "기사"
+PASSWORD = "testpassword1!"
+KOREAN = ["가", "나", "다", "라", "마", "바", "사"]
+CAR_NAMES = ["아반떼", "소나타", "그랜져", "제네시스", "K3", "K5", "K7", "K9", "벤츠 E220d", "벤츠 S500", "람보르기니 우라칸", "부가티 시론"]
+MEMOS = ["" for _ in range(28)] + ["메모1", "메모2"]
+PRICES = [price * 1000 for price in range(100, 251)]
+CANCEL_FEES = [fee * 1000 for fee in range(5, 16)]
+USER_INVOICE_EXTRA = ["" for _ in range(4)] + ["명절 보너스"]
+VEHICLE_POOL_SIZE = 5000
 
-def create_dummy_data(db: SQLAlchemy) -> None:
-    company_names = ["애니카", "현대해상", "제휴사"]
-    user_names = ["김제니", "박채영", "김지수", "라리사"]
-    user_emails = ["jennie@blackpink.com", "chaeyoung@blackpink.com", "jisoo@blackpink.com", "lalisa@blackpink.com"]
-    korean = ["가", "나", "다", "라", "마", "바", "사"]
-    car_names = ["아반떼", "소나타", "그랜져", "제네시스", "K3", "K5", "K7", "K9", "벤츠 E220d", "벤츠 S500", "람보르기니 우라칸", "부가티 시론"]
-    memos = ["" for _ in range(28)]
-    memos.extend(["메모1", "메모2"])
-    user_invoice_extra = ["" for _ in range(4)]
-    user_invoice_extra.extend(["명절 보너스"])
-    company_invoice_extra = ["" for _ in range(3)]
-    company_invoice_extra.extend([("추가 지출", randint(-100, -50) * 10000), ("추가 수입", randint(50, 100) * 10000)])
-    password = "testpassword1!"
+# 적재 순서와 같은 순서로 거래 Row tuple을 구성
+TRANSACTION_COLUMNS = [
+    "created_at",
+    "updated_at",
+    "user_id",
+    "insurance_company_id",
+    "vehicle_id",
+    "vehicle_model",
+    "date",
+    "price",
+    "memo",
+    "canceled",
+    "cancel_fee",
+]
+
+
+@dataclass
+class DummyDataConfig:
+    """
+    더미 데이터 규모 설정 (같은 seed면 같은 데이터가 생성됨)
+    e.g. DummyDataConfig(users=50, months=12, transactions_per_day=3000) -> 약 110만 건
+    """
+
+    users: int = 4
+    start_month: str = "2022-01"
+    months: int = 6
+    transactions_per_day: int = 20
+    cancel_ratio: float = 0.05
+    seed: int = 42
+    batch_size: int = 10000
+    load_data: bool = False  # MySQL LOAD DATA LOCAL INFILE 사용 여부 (서버 local_infile 설정 필요)
+
+
+def create_dummy_data(db: SQLAlchemy, config: DummyDataConfig = None) -> dict:
+    """
+    더미 데이터 생성
+    사용자/보험사처럼 적은 데이터는 executemany 한 번씩으로 적재하고, 거래는 메모리에서 배치 단위로 만들어
+    executemany(또는 LOAD DATA)로 적재한다. 마지막 달을 제외한 달은 직원/회사 정산까지 생성한다.
+    :param db:
+    :param config: 생성 규모 (None이면 기본값)
+    :return: 테이블별 생성 Row 수
+    """
+    config = config or DummyDataConfig()
+    rng = Random(config.seed)
+    start_date = date.fromisoformat(f"{config.start_month}-01")
+    end_date = start_date + relativedelta(months=config.months) - timedelta(days=1)
 
     session = next(db.session())
     create_superuser(session)
+    company_ids = create_insurance_companies(session)
+    users = create_users(session, config.users, rng)
 
-    for name in company_names:
-        InsuranceCompany.create(session=session, auto_commit=True, name=name)
+    user_ids = [user.id for user in users]
+    # 거래는 다른 연결로 적재하므로, 세션의 조회 트랜잭션(스냅샷, 잠금)을 먼저 끝냄
+    session.commit()
 
-    UserRole.create(session=session, auto_commit=True, name="기사")
+    rows = generate_transactions(
+        rng=rng,
+        user_ids=user_ids,
+        company_ids=company_ids,
+        start_date=start_date,
+        end_date=end_date,
+        transactions_per_day=config.transactions_per_day,
+        cancel_ratio=config.cancel_ratio,
+    )
+    if config.load_data:
+        transaction_count = load_transactions(db.engine, rows)
+    else:
+        transaction_count = insert_transactions(db.engine, rows, batch_size=config.batch_size)
 
-    for i in range(len(user_names)):
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-        User.create(
-            session=session,
-            auto_commit=True,
-            email=user_emails[i],
-            email_token=uuid4().hex,
-            password=hashed_password,
-            name=user_names[i],
-            role_id=UserRole.get(session=session, name="기사").id,
+    daily_revenue_count = DailyRevenue.rebuild(session=session)
+    user_invoice_count, company_invoice_count = create_invoices(session, users, start_date, config.months - 1, rng)
+    session.close()
+
+    return {
+        "user": len(users),
+        "insurance_company": len(company_ids),
+        "transaction": transaction_count,
+        "daily_revenue": daily_revenue_count,
+        "user_invoice": user_invoice_count,
+        "company_invoice": company_invoice_count,
+    }
+
+
+def create_insurance_companies(session: Session) -> List[int]:
+    existing = {company.name for company in session.query(InsuranceCompany.name)}
+    now = get_now_datetime()
+    to_create = [dict(name=name, created_at=now, updated_at=now) for name in COMPANY_NAMES if name not in existing]
+    if to_create:
+        session.execute(InsuranceCompany.__table__.insert(), to_create)
+        session.commit()
+
+    companies = session.query(InsuranceCompany.id).filter(InsuranceCompany.name.in_(COMPANY_NAMES))
+    return sorted(company.id for company in companies)
+
+
+def create_users(session: Session, count: int, rng: Random) -> List[User]:
+    """
+    기사 계정 생성 (앞의 4명은 기존 더미 계정과 같은 이름/이메일)
+    이미 있는 이메일은 건너뛰고 새로 만든 계정에만 권한을 추가한다. (기존 데이터셋에 다시 실행하는 경우)
+    password 컬럼이 unique라 계정마다 해시가 달라야 하므로, 로그인 검증에는 지장이 없는 최소 cost로 해싱한다.
+    """
+    role = UserRole.get(session=session, name=ROLE_NAME) or UserRole.create(
+        session=session, auto_commit=True, name=ROLE_NAME
+    )
+    emails = [USER_EMAILS[i] if i < len(USER_EMAILS) else f"driver{i + 1}@example.com" for i in range(count)]
+    names = [USER_NAMES[i] if i < len(USER_NAMES) else f"기사{i + 1}" for i in range(count)]
+    existing = {user.email for user in session.query(User.email).filter(User.email.in_(emails))}
+
+    now = get_now_datetime()
+    password = PASSWORD.encode("utf-8")
+    user_rows = [
+        dict(
+            created_at=now,
+            updated_at=now,
+            email=email,
+            email_token=UUID(int=rng.getrandbits(128)).hex,
+            password=bcrypt.hashpw(password, bcrypt.gensalt(rounds=4)),
+            name=name,
+            role_id=role.id,
             status="accepted",
-            plate_fee=randint(15, 20) * 10000,
-            contract_fee=round(uniform(15, 20), 1),
+            plate_fee=rng.randint(15, 20) * 10000,
+            contract_fee=round(rng.uniform(15, 20), 1),
         )
-        Permission.create(
-            session=session,
-            auto_commit=True,
-            user_id=User.get(session=session, email=user_emails[i]).id,
-            user="SR",
-            transaction="SRW",
-            invoice="SR",
+        for email, name in zip(emails, names)
+        if email not in existing
+    ]
+    if user_rows:
+        session.execute(User.__table__.insert(), user_rows)
+        session.commit()
+
+    users = session.query(User).filter(User.email.in_(emails)).order_by(User.id).all()
+    new_users = [user for user in users if user.email not in existing]
+    if new_users:
+        session.execute(
+            Permission.__table__.insert(),
+            [
+                dict(created_at=now, updated_at=now, user_id=user.id, user="SR", transaction="SRW", invoice="SR")
+                for user in new_users
+            ],
         )
+        session.commit()
+    return users
 
-        for _ in range(randint(500, 1000)):
-            canceled = False
-            cancel_fee = 0
-
-            if randint(1, 20) == 1:
-                canceled = True
-                cancel_fee = (randint(5, 15) * 1000,)
-
-            Transaction.create(
-                session=session,
-                auto_commit=True,
-                user_id=User.get(session=session, email=user_emails[i]).id,
-                insurance_company_id=InsuranceCompany.get(session=session, name=choice(company_names)).id,
-                vehicle_id=str(randint(10, 150)) + choice(korean) + " " + str(randint(1000, 9999)),
-                vehicle_model=choice(car_names),
-                date=(datetime(2022, 1, 1) + timedelta(days=randint(0, 180))).strftime("%Y-%m-%d"),
-                price=randint(100, 250) * 1000,
-                memo=choice(memos),
-                canceled=canceled,
-                cancel_fee=cancel_fee,
+
+def generate_transactions(
+    rng: Random,
+    user_ids: List[int],
+    company_ids: List[int],
+    start_date: date,
+    end_date: date,
+    transactions_per_day: int,
+    cancel_ratio: float,
+) -> Iterator[tuple]:
+    """
+    거래 Row tuple 생성기 (TRANSACTION_COLUMNS 순서)
+    전체를 메모리에 올리지 않도록 하루 단위로 생성하며, 차량 번호는 미리 만든 목록에서 골라 재방문 차량도 생긴다.
+    """
+    if not user_ids or not company_ids:
+        return
+
+    vehicle_ids = [
+        f"{rng.randint(10, 150)}{rng.choice(KOREAN)} {rng.randint(1000, 9999)}" for _ in range(VEHICLE_POOL_SIZE)
+    ]
+    choices = rng.choices
+    random = rng.random
+    count = transactions_per_day
+
+    day = start_date
+    while day <= end_date:
+        day_string = day.isoformat()
+        created_at = f"{day_string} 09:00:00"
+        # 컬럼별로 하루치 값을 한 번에 뽑아 Row마다 난수 함수를 여러 번 호출하지 않음
+        canceled_flags = [random() < cancel_ratio for _ in range(count)]
+        cancel_fees = choices(CANCEL_FEES, k=count)
+        for user_id, company_id, vehicle_id, vehicle_model, price, memo, canceled, cancel_fee in zip(
+            choices(user_ids, k=count),
+            choices(company_ids, k=count),
+            choices(vehicle_ids, k=count),
+            choices(CAR_NAMES, k=count),
+            choices(PRICES, k=count),
+            choices(MEMOS, k=count),
+            canceled_flags,
+            cancel_fees,
+        ):
+            yield (
+                created_at,
+                created_at,
+                user_id,
+                company_id,
+                vehicle_id,
+                vehicle_model,
+                day_string,
+                price,
+                memo,
+                canceled,
+                cancel_fee if canceled else 0,
             )
+        day += timedelta(days=1)
 
-        for month in range(1, 6):
-            extra = choice(user_invoice_extra)
-            user = User.get(session=session, email=user_emails[i])
 
-            if extra:
-                UserInvoiceExtra.create(
-                    session=session,
-                    auto_commit=True,
-                    user_id=user.id,
-                    year=2022,
-                    month=month,
-                    name=extra,
-                    price=randint(100, 250) * 1000,
-                )
+def insert_transactions(engine: Engine, rows: Iterator[tuple], batch_size: int = 10000) -> int:
+    """
+    배치 단위 executemany 적재 (ORM 객체 생성 없이 DBAPI에 tuple 목록을 그대로 전달)
+    PyMySQL은 INSERT ... VALUES executemany를 multi-row INSERT 한 문장으로 묶어 전송한다.
+    """
+    table = Transaction.__table__
+    preparer = engine.dialect.identifier_preparer
+    placeholder = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+    statement = (
+        f"INSERT INTO {preparer.format_table(table)} "
+        f"({', '.join(preparer.quote(column) for column in TRANSACTION_COLUMNS)}) "
+        f"VALUES ({', '.join(placeholder for _ in TRANSACTION_COLUMNS)})"
+    )
+
+    inserted = 0
+    rows = iter(rows)
+    with engine.begin() as conn:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            conn.exec_driver_sql(statement, batch)
+            inserted += len(batch)
+    return inserted
+
+
+def load_transactions(engine: Engine, rows: Iterator[tuple]) -> int:
+    """
+    CSV 임시 파일 + LOAD DATA LOCAL INFILE 적재 (MySQL 전용, 서버에 local_infile=ON 필요)
+    """
+    if engine.dialect.name != "mysql":
+        raise ValueError("LOAD DATA LOCAL INFILE은 MySQL에서만 사용할 수 있습니다.")
+
+    table = Transaction.__table__
+    preparer = engine.dialect.identifier_preparer
+    written = 0
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False) as file:
+        writer = csv.writer(file, lineterminator="\n")
+        for row in rows:
+            writer.writerow(int(value) if isinstance(value, bool) else value for value in row)
+            written += 1
 
-            to_create = calculate_user_invoice(
-                user=user,
-                user_id=user.id,
-                year=2022,
-                month=month,
-                session=session,
+    # 클라이언트 측 local_infile 허용은 적재용 engine에서만 켬
+    load_engine = create_engine(engine.url, connect_args={"local_infile": True})
+    try:
+        with load_engine.begin() as conn:
+            conn.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE '{file.name}' INTO TABLE {preparer.format_table(table)} "
+                f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                f"LINES TERMINATED BY '\\n' "
+                f"({', '.join(preparer.quote(column) for column in TRANSACTION_COLUMNS)})"
             )
-            del to_create["extra"]
-            UserInvoice.create(session=session, auto_commit=True, **to_create)
+    finally:
+        load_engine.dispose()
+        os.remove(file.name)
+    return written
+
+
+def create_invoices(session: Session, users: List[User], start_date: date, months: int, rng: Random) -> tuple:
+    """
+    start_date부터 months개월의 직원/회사 정산 생성 (달마다 집계 쿼리로 전 직원을 한 번에 계산)
+    :return: (직원 정산 수, 회사 정산 수)
+    """
+    user_invoice_count = 0
+    for i in range(max(months, 0)):
+        target = start_date + relativedelta(months=i)
+        year, month = str(target.year), f"{target.month:02}"
+        now = get_now_datetime()
+
+        user_extras = []
+        for user in users:
+            extra = rng.choice(USER_INVOICE_EXTRA)
+            if extra:
+                user_extras.append(
+                    dict(
+                        created_at=now,
+                        updated_at=now,
+                        user_id=user.id,
+                        year=target.year,
+                        month=target.month,
+                        name=extra,
+                        price=rng.randint(100, 250) * 1000,
+                    )
+                )
+        if user_extras:
+            session.execute(UserInvoiceExtra.__table__.insert(), user_extras)
 
-    for month in range(1, 6):
-        extra = choice(company_invoice_extra)
-        user = User.get(session=session, email=user_emails[i])
+        user_invoices = calculate_all_user_invoices(users=users, year=year, month=month, session=session)
+        for user_invoice in user_invoices:
+            del user_invoice["extra"]
+            user_invoice.update(year=target.year, month=target.month, created_at=now, updated_at=now)
+        if user_invoices:
+            session.execute(UserInvoice.__table__.insert(), user_invoices)
+            user_invoice_count += len(user_invoices)
 
-        if extra:
+        company_extra = rng.choice(
+            [None, None, None, ("추가 지출", rng.randint(-100, -50) * 10000), ("추가 수입", rng.randint(50, 100) * 10000)]
+        )
+        if company_extra:
             CompanyInvoiceExtra.create(
-                session=session,
-                auto_commit=True,
-                year=2022,
-                month=month,
-                name=extra[0],
-                price=extra[1],
+                session=session, year=target.year, month=target.month, name=company_extra[0], price=company_extra[1]
             )
 
-        to_create = calculate_company_invoice(
-            year=2022,
+        company_invoice = calculate_company_invoice(
+            year=year,
             month=month,
-            rental_fee=randint(50, 100) * 10000,
-            maintenance_fee=randint(5, 10) * 10000,
+            rental_fee=rng.randint(50, 100) * 10000,
+            maintenance_fee=rng.randint(5, 10) * 10000,
             session=session,
         )
-        del to_create["extra"]
-        CompanyInvoice.create(session=session, auto_commit=True, **to_create)
+        del company_invoice["extra"]
+        company_invoice.update(year=target.year, month=target.month)
+        CompanyInvoice.create(session=session, **company_invoice)
+        session.commit()
+
+    return user_invoice_count, max(months, 0)
+
+
+if __name__ == "__main__":
+    # e.g. python -m app.utils.create_dummy_data --users 50 --months 12 --transactions-per-day 3000
+    from fastapi import FastAPI
+
+    from app.common.config import conf
+    from app.database.conn import Base, db
+
+    default = DummyDataConfig()
+    parser = ArgumentParser(description="더미 데이터 생성 (현재 환경의 DB에 적재)")
+    parser.add_argument("--users", type=int, default=default.users, help="기사 계정 수")
+    parser.add_argument("--start-month", default=default.start_month, help="시작 연월 (YYYY-MM)")
+    parser.add_argument("--months", type=int, default=default.months, help="거래 생성 개월 수 (마지막 달 제외 정산 생성)")
+    parser.add_argument("--transactions-per-day", type=int, default=default.transactions_per_day, help="일별 거래 수")
+    parser.add_argument("--cancel-ratio", type=float, default=default.cancel_ratio, help="취소 거래 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=default.seed, help="난수 seed")
+    parser.add_argument("--batch-size", type=int, default=default.batch_size, help="executemany 배치 크기")
+    parser.add_argument("--load-data", action="store_true", help="LOAD DATA LOCAL INFILE로 거래 적재 (MySQL)")
+    args = parser.parse_args()
+
+    config = DummyDataConfig(
+        users=args.users,
+        start_month=args.start_month,
+        months=args.months,
+        transactions_per_day=args.transactions_per_day,
+        cancel_ratio=args.cancel_ratio,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        load_data=args.load_data,
+    )
+    db.init_app(FastAPI(), **asdict(conf()))
+    Base.metadata.create_all(db.engine)
+
+    started = perf_counter()
+    created = create_dummy_data(db, config)
+    print(f"{created} ({perf_counter() - started:.1f}s, {asdict(config)})")
@@ -0,0 +1,233 @@
+from datetime import date
+from functools import wraps
+import json
+from threading import Lock
+from typing import Callable, Optional, Union
+
+from cachetools import TTLCache
+from dateutil.relativedelta import relativedelta
+from fastapi import FastAPI, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.utils.date import get_now_datetime
+
+
+def to_period(value) -> str:
+    """
+    date/datetime, "YYYY-MM-DD" 문자열, (year, month) -> "YYYY-MM"
+    """
+    if isinstance(value, date):
+        return value.strftime("%Y-%m")
+    if isinstance(value, tuple):
+        year, month = value
+        return f"{int(year):04}-{int(month):02}"
+    return str(value)[:7]
+
+
+def recent_periods(now: date, month_count: int) -> list:
+    """
+    이번 달부터 거슬러 올라간 month_count개월의 period 목록
+    """
+    return [to_period(now - relativedelta(months=i)) for i in range(month_count)]
+
+
+class MemoryCacheBackend:
+    """
+    프로세스 내 LRU 백엔드
+    공유 백엔드와 같은 인터페이스라서 로컬/테스트에서는 공유 백엔드 대신 끼워 쓸 수 있다.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: int = 60):
+        self._lock = Lock()
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions = {}
+
+    def get(self, key: str):
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def get_versions(self, periods: list) -> list:
+        with self._lock:
+            return [self._versions.get(period, 0) for period in periods]
+
+    def incr_versions(self, periods: list) -> None:
+        with self._lock:
+            for period in periods:
+                self._versions[period] = self._versions.get(period, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._versions.clear()
+
+
+class RedisCacheBackend:
+    """
+    워커 간 공유 백엔드 (redis 패키지 필요)
+    값은 JSON으로 저장하고, period별 버전은 만료 없이 INCR로 관리한다.
+    """
+
+    def __init__(self, url: str, ttl: int = 60, prefix: str = "dashboard:"):
+        # redis는 공유 백엔드를 쓸 때만 필요한 선택 의존성
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl
+        self._prefix = prefix
+
+    def get(self, key: str):
+        value = self._client.get(self._prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value) -> None:
+        self._client.set(self._prefix + key, json.dumps(value), ex=self._ttl)
+
+    def get_versions(self, periods: list) -> list:
+        if not periods:
+            return []
+        values = self._client.mget([f"{self._prefix}version:{period}" for period in periods])
+        return [int(value or 0) for value in values]
+
+    def incr_versions(self, periods: list) -> None:
+        pipeline = self._client.pipeline()
+        for period in periods:
+            pipeline.incr(f"{self._prefix}version:{period}")
+        pipeline.execute()
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self._prefix + "*"):
+            self._client.delete(key)
+
+
+class DashboardCache:
+    """
+    대시보드 응답 캐시
+    키는 (엔드포인트, 파라미터, 오늘 날짜, 참조하는 달들의 버전)이고, 거래/정산 쓰기가 해당 달의 버전을 올리면
+    이전 키는 더 이상 조회되지 않는다. 프로세스 내 LRU를 먼저 보고, 공유 백엔드가 있으면 버전과 값을 공유한다.
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._local = MemoryCacheBackend()
+        self._shared = None
+        self._enabled = True
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Dashboard cache 초기화 함수
+        :param app: FastAPI 인스턴스
+        :param kwargs:
+        :return:
+        """
+        ttl = kwargs.setdefault("DASHBOARD_CACHE_TTL", 60)
+        maxsize = kwargs.setdefault("DASHBOARD_CACHE_SIZE", 256)
+        shared_url = kwargs.setdefault("DASHBOARD_CACHE_URL", None)
+
+        self._enabled = ttl > 0
+        self._local = MemoryCacheBackend(maxsize=maxsize, ttl=max(ttl, 1))
+        self._shared = RedisCacheBackend(shared_url, ttl=ttl) if shared_url and self._enabled else None
+
+    def set_shared_backend(self, backend: Optional[object]) -> None:
+        """
+        공유 백엔드 교체 (get/set/get_versions/incr_versions/clear를 구현한 객체, None이면 프로세스 내 캐시만 사용)
+        """
+        self._shared = backend
+
+    @property
+    def _versions(self):
+        # 공유 백엔드가 있으면 버전도 공유해야 다른 워커의 쓰기가 반영됨
+        return self._shared or self._local
+
+    def get_or_load(self, name: str, params: dict, periods: list, loader: Callable):
+        """
+        캐시에 없으면 loader 결과를 저장 (Response를 반환한 경우는 저장하지 않음)
+        :param name: 엔드포인트 이름
+        :param params: 결과에 영향을 주는 파라미터
+        :param periods: 결과가 참조하는 달("YYYY-MM") 목록
+        :param loader: 결과를 계산하는 함수
+        :return:
+        """
+        if not self._enabled:
+            return loader()
+
+        versions = self._versions.get_versions(periods)
+        key = self._make_key(name, params, periods, versions)
+
+        value = self._local.get(key)
+        if value is None and self._shared is not None:
+            value = self._shared.get(key)
+            if value is not None:
+                self._local.set(key, value)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        result = loader()
+        if isinstance(result, Response):
+            return result
+
+        value = jsonable_encoder(result)
+        # 계산 도중 쓰기가 있었다면 이전 데이터일 수 있으므로 저장하지 않음
+        if self._versions.get_versions(periods) == versions:
+            self._local.set(key, value)
+            if self._shared is not None:
+                self._shared.set(key, value)
+        return value
+
+    def cached(self, months: Union[int, Callable[..., int]] = 2):
+        """
+        대시보드 라우트용 데코레이터
+        e.g. @dashboard_cache.cached(months=lambda month_range: month_range)
+        :param months: 결과가 참조하는 개월 수(이번 달 포함), 함수면 라우트 파라미터로 계산
+        :return:
+        """
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                # 세션, 인증 정보 등 의존성 값은 제외하고 경로/쿼리 파라미터만 키에 포함
+                params = {
+                    key: value
+                    for key, value in kwargs.items()
+                    if isinstance(value, (str, int, float, bool, type(None)))
+                }
+                now = get_now_datetime()
+                month_count = months(**params) if callable(months) else months
+                periods = recent_periods(now, month_count)
+                params["today"] = now.strftime("%Y-%m-%d")
+                return self.get_or_load(func.__name__, params, periods, lambda: func(*args, **kwargs))
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, *values) -> None:
+        """
+        값이 바뀐 달의 버전 증가
+        e.g. dashboard_cache.invalidate(transaction.date), dashboard_cache.invalidate((year, month))
+        """
+        periods = sorted({to_period(value) for value in values if value is not None})
+        if self._enabled and periods:
+            self._versions.incr_versions(periods)
+
+    def clear(self) -> None:
+        self._local.clear()
+        if self._shared is not None:
+            self._shared.clear()
+
+    @staticmethod
+    def _make_key(name: str, params: dict, periods: list, versions: list) -> str:
+        encoded_params = json.dumps(params, sort_keys=True, default=str)
+        encoded_versions = ",".join(f"{period}={version}" for period, version in zip(periods, versions))
+        return f"{name}:{encoded_params}:{encoded_versions}"
+
+
+dashboard_cache = DashboardCache()
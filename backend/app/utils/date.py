@@ -1,6 +1,16 @@
 from pytz import timezone
 from datetime import datetime
 
+# pytz.timezone 조회를 호출마다 반복하지 않도록 모듈 로드 시 한 번만 생성
+KST = timezone("Asia/Seoul")
+
 
 def get_now_datetime():
-    return datetime.now(timezone("Asia/Seoul"))
+    return datetime.now(KST)
+
+
+def get_period_key(value: datetime) -> int:
+    """
+    연월 키 (e.g. 2022-06 -> 202206, UserInvoice.period/CompanyInvoice.period와 같은 형식)
+    """
+    return value.year * 100 + value.month
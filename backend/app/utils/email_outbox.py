@@ -0,0 +1,225 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+import logging
+from threading import Event, Lock, Thread
+from typing import List, Optional
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database.conn import db
+from app.database.schema import EmailOutbox
+from app.utils.date import get_now_datetime
+from app.utils.gmail import GmailTransport, get_token_path
+
+
+@dataclass
+class OutgoingEmail:
+    id: int
+    destination: str
+    subject: str
+    body: str
+    attachments: list = field(default_factory=list)
+
+
+class LocalTransport:
+    """
+    실제로 보내지 않고 보낸 메일을 메모리에 보관 (테스트, 로컬 개발용)
+    """
+
+    def __init__(self):
+        self.sent: List[OutgoingEmail] = []
+
+    def send_batch(self, messages: List[OutgoingEmail]) -> List[Optional[str]]:
+        for message in messages:
+            logging.info(f"Email (local): {message.destination} {message.subject}")
+        self.sent.extend(messages)
+        return [None] * len(messages)
+
+
+class EmailOutboxWorker:
+    """
+    email_outbox 테이블에 쌓인 메일을 백그라운드 스레드 하나가 모아서 발송
+    메일마다 스레드를 만들지 않고, 전송 객체(Gmail 인증, API Resource)도 계속 재사용한다.
+    실패한 메일은 retry_delay * 2^(시도 횟수 - 1)초 뒤 다시 시도하고, max_attempts번 실패하면 failed로 남긴다.
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._lock = Lock()
+        self._wakeup = Event()
+        self._stopping = Event()
+        self._thread = None
+        self._transport = None
+        self.batch_size = 20
+        self.poll_interval = 10
+        self.max_attempts = 6
+        self.retry_delay = 30
+        self.retry_max_delay = 3600
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Email outbox 초기화 함수
+        :param app: FastAPI 인스턴스
+        :param kwargs:
+        :return:
+        """
+        base_dir = kwargs.get("BASE_DIR")
+        transport = kwargs.setdefault("EMAIL_TRANSPORT", "gmail")
+        self.batch_size = kwargs.setdefault("EMAIL_OUTBOX_BATCH_SIZE", 20)
+        self.poll_interval = kwargs.setdefault("EMAIL_OUTBOX_POLL_INTERVAL", 10)
+        self.max_attempts = kwargs.setdefault("EMAIL_OUTBOX_MAX_ATTEMPTS", 6)
+        self.retry_delay = kwargs.setdefault("EMAIL_OUTBOX_RETRY_DELAY", 30)
+        self.retry_max_delay = kwargs.setdefault("EMAIL_OUTBOX_RETRY_MAX_DELAY", 3600)
+
+        if transport == "gmail":
+            self._transport = GmailTransport(token_path=get_token_path(base_dir))
+        elif transport == "local":
+            self._transport = LocalTransport()
+        else:
+            raise Exception(f"Unknown email transport: {transport}")
+
+        @app.on_event("startup")
+        def start_email_outbox():
+            # gunicorn 워커 프로세스마다 하나 (fork 이후 시작)
+            self.start()
+
+        @app.on_event("shutdown")
+        def stop_email_outbox():
+            self.stop()
+
+    def set_transport(self, transport: object) -> None:
+        """
+        전송 객체 교체 (send_batch(messages) -> 메일별 실패 사유 목록을 구현한 객체)
+        """
+        self._transport = transport
+
+    @property
+    def transport(self):
+        return self._transport
+
+    def enqueue(
+        self,
+        session: Session,
+        destination: str,
+        subject: str,
+        body: str,
+        attachments: list = None,
+        auto_commit: bool = False,
+    ) -> EmailOutbox:
+        """
+        발송 대기 메일 저장, 커밋되면 워커를 깨움 (실제 발송은 워커 스레드에서)
+        메일을 보내게 된 변경(회원가입, 토큰 발급 등)과 같은 트랜잭션에서 커밋해야 둘 중 하나만 남지 않는다.
+        :param auto_commit: 자동 커밋 여부 (기본은 호출한 쪽에서 커밋)
+        """
+        event.listen(session, "after_commit", lambda _: self._wakeup.set(), once=True)
+        obj = EmailOutbox.create(
+            session=session,
+            auto_commit=auto_commit,
+            destination=destination,
+            subject=subject,
+            body=body,
+            attachments=attachments or [],
+            status="pending",
+            attempts=0,
+            next_attempt_at=get_now_datetime(),
+        )
+        return obj
+
+    def get_retry_delay(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.retry_delay * 2 ** (attempts - 1), self.retry_max_delay))
+
+    def process_batch(self, session: Session = None) -> int:
+        """
+        발송 시각이 된 메일을 batch_size개까지 발송하고 결과 저장
+        여러 워커 프로세스가 같은 메일을 보내지 않도록 SKIP LOCKED로 잠근 Row만 처리한다.
+        발송 후 결과 저장(커밋)이 실패하면 pending으로 남아 다시 발송될 수 있다. (최소 한 번 발송)
+        :param session:
+        :return: 처리한 메일 수
+        """
+        sess = next(db.session()) if not session else session
+        try:
+            now = get_now_datetime()
+            rows = (
+                sess.query(EmailOutbox)
+                .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                sess.commit()
+                return 0
+
+            messages = [
+                OutgoingEmail(
+                    id=row.id,
+                    destination=row.destination,
+                    subject=row.subject,
+                    body=row.body,
+                    attachments=row.attachments or [],
+                )
+                for row in rows
+            ]
+            try:
+                errors = self._transport.send_batch(messages)
+            except Exception as e:
+                # 인증 실패, 네트워크 오류 등 batch 전체가 실패한 경우
+                errors = [str(e) or type(e).__name__] * len(rows)
+
+            now = get_now_datetime()
+            for row, error in zip(rows, errors):
+                row.attempts += 1
+                row.updated_at = now
+                if error is None:
+                    row.status = "sent"
+                    row.sent_at = now
+                    row.last_error = None
+                    continue
+                row.last_error = error[:255]
+                if row.attempts >= self.max_attempts:
+                    row.status = "failed"
+                    logging.error(f"Email failed: {row.id} {row.destination} ({error})")
+                else:
+                    row.next_attempt_at = now + self.get_retry_delay(row.attempts)
+                    logging.warning(f"Email retry scheduled: {row.id} attempt {row.attempts} ({error})")
+            sess.commit()
+            return len(rows)
+        finally:
+            if not session:
+                sess.close()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                # 한 번에 batch_size개를 다 채웠으면 남은 메일이 더 있을 수 있으므로 바로 이어서 처리
+                while not self._stopping.is_set() and self.process_batch() == self.batch_size:
+                    pass
+            except Exception as e:
+                logging.exception(f"Email outbox error: {e}")
+            self._wakeup.wait(self.poll_interval)
+
+
+email_outbox = EmailOutboxWorker()
@@ -1,5 +1,4 @@
 from base64 import urlsafe_b64encode
-from dataclasses import asdict
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
@@ -7,38 +6,37 @@ from email.mime.audio import MIMEAudio
 from email.mime.base import MIMEBase
 from mimetypes import guess_type as guess_mime_type
 from os import path
-import threading
-from typing import Union
+from threading import Lock
+from typing import List, Optional, Union
 
 from googleapiclient.discovery import build, Resource
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 
-from app.common.config import conf
 from app.common.consts import GMAIL_ADDR
 
+SCOPES = ["https://mail.google.com/"]
 
-def authenticate() -> Resource:
-    scopes = ["https://mail.google.com/"]
-    conf_dict = asdict(conf())
-    token_path = path.join(conf_dict["BASE_DIR"], "app", "common", "gmail_api_token.json")
-    creds = None
-    try:
-        if not path.exists(token_path):
-            raise Exception("Token does not exist!")
-        creds = Credentials.from_authorized_user_file(token_path, scopes)
 
-        if not creds.valid:
-            if creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-                with open(token_path, "wt") as token:
-                    token.write(creds.to_json())
-            else:
-                raise Exception("Token is invalid and refresh failed!")
+def get_token_path(base_dir: str) -> str:
+    return path.join(base_dir, "app", "common", "gmail_api_token.json")
 
-        return build("gmail", "v1", credentials=creds)
-    except Exception as e:
-        print(e)
+
+def load_credentials(token_path: str) -> Credentials:
+    if not path.exists(token_path):
+        raise Exception("Token does not exist!")
+    creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+    if not creds.valid:
+        refresh_credentials(creds=creds, token_path=token_path)
+    return creds
+
+
+def refresh_credentials(creds: Credentials, token_path: str) -> None:
+    if not (creds.expired and creds.refresh_token):
+        raise Exception("Token is invalid and refresh failed!")
+    creds.refresh(Request())
+    with open(token_path, "wt") as token:
+        token.write(creds.to_json())
 
 
 def add_attachment(message: Union[MIMEText, MIMEMultipart], filename: str) -> Union[MIMEText, MIMEMultipart]:
@@ -86,26 +84,54 @@ def build_message(source: str, destination: str, subject: str, body: str, attach
     return {"raw": urlsafe_b64encode(message.as_bytes()).decode()}
 
 
-def send_message_thread(destination: str, subject: str, body: str, attachments: list = []) -> None:
-    try:
-        service = authenticate()
-        source = GMAIL_ADDR
-        result = (
-            service.users()
-            .messages()
-            .send(
-                userId="me",
-                body=build_message(
-                    source=source, destination=destination, subject=subject, body=body, attachments=attachments
-                ),
-            )
-            .execute()
-        )
-        if result["labelIds"][0] != "SENT":
-            raise Exception("Failed to send mail.")
-    except Exception as e:
-        print(e)
+class GmailTransport:
+    """
+    Gmail API 메일 전송
+    인증 정보와 API Resource는 처음 한 번만 만들어 재사용하고, 토큰이 만료된 경우에만 갱신한다.
+    """
 
+    def __init__(self, token_path: str, source: str = GMAIL_ADDR):
+        self._token_path = token_path
+        self._source = source
+        self._lock = Lock()
+        self._creds = None
+        self._service = None
 
-def send(destination: str, subject: str, body: str, attachments: list = []) -> None:
-    threading.Thread(target=send_message_thread, args=(destination, subject, body, attachments), daemon=True).start()
+    def _get_service(self) -> Resource:
+        with self._lock:
+            if self._creds is None:
+                self._creds = load_credentials(self._token_path)
+            elif not self._creds.valid:
+                refresh_credentials(creds=self._creds, token_path=self._token_path)
+            if self._service is None:
+                self._service = build("gmail", "v1", credentials=self._creds, cache_discovery=False)
+            return self._service
+
+    def send_batch(self, messages: list) -> List[Optional[str]]:
+        """
+        batch 요청 한 번(HTTP 왕복 한 번)으로 여러 메일 전송
+        :param messages: destination, subject, body, attachments 속성을 가진 객체 목록
+        :return: 메일별 실패 사유 (성공이면 None)
+        """
+        service = self._get_service()
+        errors = [None] * len(messages)
+
+        def callback(request_id: str, response: dict, exception: Exception) -> None:
+            index = int(request_id)
+            if exception is not None:
+                errors[index] = str(exception)
+            elif "SENT" not in response.get("labelIds", []):
+                errors[index] = "Failed to send mail."
+
+        batch = service.new_batch_http_request(callback=callback)
+        for index, message in enumerate(messages):
+            body = build_message(
+                source=self._source,
+                destination=message.destination,
+                subject=message.subject,
+                body=message.body,
+                attachments=message.attachments or [],
+            )
+            batch.add(service.users().messages().send(userId="me", body=body), request_id=str(index))
+        batch.execute()
+        return errors
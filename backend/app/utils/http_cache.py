@@ -0,0 +1,93 @@
+import gzip
+from hashlib import sha256
+from typing import Iterable, Optional
+
+try:
+    import brotli
+except ImportError:
+    # brotli 패키지는 선택 의존성이므로 없으면 gzip만 사용
+    brotli = None
+
+# 서버가 선호하는 인코딩 순서
+ENCODING_PRIORITY = ("br", "gzip")
+
+
+def make_etag(content: bytes) -> str:
+    """
+    본문 해시 기반 strong ETag 생성
+    """
+    return '"' + sha256(content).hexdigest()[:32] + '"'
+
+
+def encoding_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    인코딩별로 표현(representation)이 다르므로 strong ETag에 인코딩을 덧붙임
+    """
+    if encoding is None:
+        return etag
+    return etag[:-1] + "-" + encoding + '"'
+
+
+def compress_variants(content: bytes) -> dict:
+    """
+    미리 압축한 본문 생성 (gzip은 mtime=0으로 고정해 매번 같은 결과가 나오도록 함)
+    """
+    variants = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(content)
+    return variants
+
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> set:
+    """
+    Accept-Encoding 헤더에서 q=0이 아닌 인코딩 목록 추출
+    """
+    accepted = set()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name)
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """
+    클라이언트가 허용하고 서버에 준비된 인코딩 중 우선순위가 가장 높은 것 선택
+    준비된 인코딩이 없으면 None(원본) 반환
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    available = set(available)
+    for encoding in ENCODING_PRIORITY:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def is_not_modified(if_none_match: Optional[str], etags: Iterable[str]) -> bool:
+    """
+    If-None-Match 비교 (RFC 7232의 weak comparison이므로 W/ 접두사는 무시)
+    """
+    if not if_none_match:
+        return False
+
+    candidates = {etag.strip() for etag in etags}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in candidates:
+            return True
+    return False
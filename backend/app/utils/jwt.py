@@ -1,6 +1,10 @@
 from datetime import timedelta
+from hashlib import sha256
+from threading import Lock
+from time import time
 import jwt
 
+from cachetools import LRUCache
 from fastapi import HTTPException
 from fastapi.security import HTTPBearer
 
@@ -13,6 +17,12 @@ class JWTAuth:
     secret = JWT_SECRET
     access_token_expires = int(JWT_ACCESS_TOKEN_EXPIRES)
     refresh_token_expires = int(JWT_REFRESH_TOKEN_EXPIRES)
+    verified_token_cache_size = 4096
+
+    def __init__(self):
+        # 검증을 마친 access token의 (sub, exp) 캐시 (토큰 원문 대신 해시를 키로 사용)
+        self._lock = Lock()
+        self._verified_tokens = LRUCache(maxsize=self.verified_token_cache_size)
 
     def encode_token(self, subject: str) -> str:
         now = get_now_datetime()
@@ -25,10 +35,33 @@ class JWTAuth:
         return jwt.encode(payload=payload, key=self.secret, algorithm=self.algorithm).decode("UTF-8")
 
     def decode_token(self, token: str) -> str:
+        """
+        같은 토큰으로 반복 호출되는 경우 서명 검증/JSON 파싱 없이 캐시된 sub 반환 (exp는 매번 확인)
+        """
+        token_key = sha256(token.encode("utf-8")).digest()
+        with self._lock:
+            cached = self._verified_tokens.get(token_key)
+        if cached is not None:
+            subject, expires_at = cached
+            if time() < expires_at:
+                return subject
+            with self._lock:
+                self._verified_tokens.pop(token_key, None)
+            raise HTTPException(status_code=401, detail="Token expired")
+
+        subject, expires_at = self.verify_token(token=token)
+        with self._lock:
+            self._verified_tokens[token_key] = (subject, expires_at)
+        return subject
+
+    def verify_token(self, token: str) -> tuple:
+        """
+        캐시 없이 access token 검증 후 (sub, exp) 반환
+        """
         try:
             payload = jwt.decode(jwt=token, key=self.secret, algorithms=[self.algorithm])
             if payload["scope"] == "access_token":
-                return payload["sub"]
+                return payload["sub"], payload["exp"]
             raise HTTPException(status_code=401, detail="Scope for the token is invalid")
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token expired")
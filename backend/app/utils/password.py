@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Callable
+
+import bcrypt
+from fastapi import FastAPI
+
+
+class PasswordHasherBusy(Exception):
+    """
+    해싱 대기열이 가득 찬 경우
+    """
+
+
+class PasswordHasher:
+    """
+    bcrypt 전용 크기 제한 Executor
+    요청 스레드풀과 분리해 로그인이 몰려도 다른 API가 스레드를 잃지 않도록 동시 해싱 수를 제한한다.
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._lock = Lock()
+        self._executor = None
+        self._slots = None
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Password hasher 초기화 함수
+        :param app: FastAPI 인스턴스
+        :param kwargs:
+        :return:
+        """
+        workers = kwargs.setdefault("PASSWORD_HASH_WORKERS", 2)
+        queue_size = kwargs.setdefault("PASSWORD_HASH_QUEUE_SIZE", 8)
+
+        with self._lock:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hasher")
+            # 실행 중(workers) + 대기(queue_size)를 넘는 요청은 바로 거절
+            self._slots = BoundedSemaphore(workers + queue_size)
+
+        @app.on_event("shutdown")
+        def shutdown_password_hasher():
+            self._executor.shutdown(wait=False)
+
+    def hash(self, password: str) -> bytes:
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt())
+
+    def check(self, password: str, hashed_password: str) -> bool:
+        return self._run(bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+    def _run(self, func: Callable, *args):
+        if self._executor is None:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+
+password_hasher = PasswordHasher()
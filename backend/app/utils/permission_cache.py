@@ -0,0 +1,129 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Optional
+
+from cachetools import TTLCache
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_MISSING = object()
+_request_stats: ContextVar[Optional[dict]] = ContextVar("permission_cache_request_stats", default=None)
+
+
+@dataclass(frozen=True)
+class PermissionInfo:
+    """
+    세션과 분리된 권한 정보 스냅샷(캐시 저장용)
+    """
+
+    user_id: int
+    user: str
+    transaction: str
+    invoice: str
+
+
+class PermissionCache:
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._lock = Lock()
+        self._cache = TTLCache(maxsize=1024, ttl=30)
+        self.hits = 0
+        self.misses = 0
+        self.saved_queries = 0
+        self._generation = 0
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Permission cache 초기화 함수
+        :param app: FastAPI 인스턴스
+        :param kwargs:
+        :return:
+        """
+        ttl = kwargs.setdefault("PERMISSION_CACHE_TTL", 30)
+        maxsize = kwargs.setdefault("PERMISSION_CACHE_SIZE", 1024)
+        is_debug = kwargs.setdefault("DEBUG", False)
+
+        with self._lock:
+            self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+        @app.middleware("http")
+        async def permission_cache_stats(request: Request, call_next):
+            stats = {"hits": 0, "saved_queries": 0}
+            token = _request_stats.set(stats)
+            try:
+                response = await call_next(request)
+            finally:
+                _request_stats.reset(token)
+            if is_debug:
+                response.headers["X-Permission-Cache-Hits"] = str(stats["hits"])
+                response.headers["X-Permission-Cache-Saved-Queries"] = str(stats["saved_queries"])
+                response.headers["X-Permission-Cache-Hit-Rate"] = f"{self.hit_rate:.3f}"
+            return response
+
+    def get_or_load(self, user_id: int, loader: Callable[[], Optional[PermissionInfo]], query_count: int = 2):
+        """
+        캐시에 없으면 loader로 조회 후 저장
+        :param user_id:
+        :param loader: 권한 정보를 DB에서 조회하는 함수
+        :param query_count: loader 1회 호출 시 발생하는 쿼리 수(절약 쿼리 집계용)
+        :return:
+        """
+        with self._lock:
+            cached = self._cache.get(user_id, _MISSING)
+            if cached is not _MISSING:
+                saved = query_count if cached is not None else 1
+                self.hits += 1
+                self.saved_queries += saved
+                stats = _request_stats.get()
+                if stats is not None:
+                    stats["hits"] += 1
+                    stats["saved_queries"] += saved
+                return cached
+            self.misses += 1
+            generation = self._generation
+
+        result = loader()
+        with self._lock:
+            # 조회 도중 invalidate가 발생했다면 이전 값일 수 있으므로 저장하지 않음
+            if generation == self._generation:
+                self._cache[user_id] = result
+        return result
+
+    def invalidate(self, user_id: int = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(user_id, None)
+
+    def invalidate_on_commit(self, session: Session, user_id: int = None) -> None:
+        """
+        session이 커밋된 뒤 무효화
+        커밋 전에 지우면 그 사이 다른 요청이 커밋 전(이전) 권한을 다시 읽어 TTL 동안 캐시할 수 있다.
+        """
+        event.listen(session, "after_commit", lambda _: self.invalidate(user_id), once=True)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                size=len(self._cache),
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=self.hit_rate,
+                saved_queries=self.saved_queries,
+            )
+
+
+permission_cache = PermissionCache()
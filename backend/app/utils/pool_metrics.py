@@ -0,0 +1,130 @@
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+_checkout_started_at: ContextVar[Optional[float]] = ContextVar("pool_metrics_checkout_started_at", default=None)
+
+
+class _InstrumentedPoolMixin:
+    """
+    커넥션 체크아웃 시작 시각 기록 (대기 시간은 PoolMetrics의 checkout 이벤트에서 계산)
+    """
+
+    def connect(self):
+        token = _checkout_started_at.set(perf_counter())
+        try:
+            return super().connect()
+        finally:
+            _checkout_started_at.reset(token)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolMetrics:
+    """
+    커넥션 풀 지표 (체크아웃 대기, 사용 중/overflow 수, pre-ping 비용, 신규 연결/무효화 횟수)
+    /metrics에 Prometheus 형식으로 출력된다.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._engines = {}
+        self._stats = {}
+
+    def instrument(self, engine: Engine, name: str, pre_ping: bool = False):
+        """
+        엔진 등록 (create_engine에 poolclass=InstrumentedQueuePool 지정 필요)
+        pre_ping이면 SQLAlchemy의 pool_pre_ping 대신 checkout 이벤트에서 ping해 비용을 따로 집계한다.
+        (create_engine은 pool_pre_ping=False로 생성)
+        """
+        with self._lock:
+            self._engines[name] = engine
+            self._stats.setdefault(name, self._empty_stats())
+
+        @event.listens_for(engine, "connect")
+        def connect(dbapi_connection, connection_record):
+            # 방금 연결한 커넥션은 ping하지 않음 (pool_pre_ping과 같은 동작)
+            connection_record.info["pool_metrics_fresh"] = True
+            self._increase(name, "connects", 1)
+
+        @event.listens_for(engine, "checkout")
+        def checkout(dbapi_connection, connection_record, connection_proxy):
+            checked_out_at = perf_counter()
+            started_at = _checkout_started_at.get()
+            wait = checked_out_at - started_at if started_at is not None else 0.0
+
+            is_fresh = connection_record.info.pop("pool_metrics_fresh", False)
+            if pre_ping and not is_fresh and not engine.dialect.do_ping(dbapi_connection):
+                # 끊어진 연결이면 풀의 연결을 모두 무효화하고 새 연결로 다시 체크아웃 (pool_pre_ping과 같은 동작)
+                raise exc.InvalidatePoolError()
+            self.observe_checkout(name, wait, perf_counter() - checked_out_at if pre_ping else 0.0)
+
+        @event.listens_for(engine, "invalidate")
+        def invalidate(dbapi_connection, connection_record, exception):
+            self._increase(name, "invalidations", 1)
+
+    def observe_checkout(self, name: str, wait: float, pre_ping: float):
+        with self._lock:
+            stats = self._stats.setdefault(name, self._empty_stats())
+            stats["checkouts"] += 1
+            stats["wait"] += wait
+            stats["wait_max"] = max(stats["wait_max"], wait)
+            stats["pre_ping"] += pre_ping
+
+    def stats(self) -> dict:
+        with self._lock:
+            engines = dict(self._engines)
+            result = {name: dict(stats) for name, stats in self._stats.items()}
+
+        for name, engine in engines.items():
+            pool = engine.pool
+            if isinstance(pool, QueuePool):
+                result[name].update(
+                    size=pool.size(), checked_out=pool.checkedout(), overflow=max(0, pool.overflow())
+                )
+        return result
+
+    def render(self) -> list:
+        metrics = (
+            ("db_pool_size", "gauge", "size", "Configured pool size"),
+            ("db_pool_checked_out", "gauge", "checked_out", "Connections currently in use"),
+            ("db_pool_overflow", "gauge", "overflow", "Overflow connections currently open"),
+            ("db_pool_checkouts_total", "counter", "checkouts", "Connection checkouts"),
+            ("db_pool_checkout_wait_seconds_sum", "counter", "wait", "Time spent waiting for a pooled connection"),
+            ("db_pool_checkout_wait_seconds_max", "gauge", "wait_max", "Longest checkout wait since start"),
+            ("db_pool_pre_ping_seconds_sum", "counter", "pre_ping", "Time spent in pre-ping on checkout"),
+            ("db_pool_connects_total", "counter", "connects", "New DBAPI connections opened"),
+            ("db_pool_invalidations_total", "counter", "invalidations", "Connections invalidated"),
+        )
+        stats = self.stats()
+        lines = []
+        for metric_name, metric_type, field, description in metrics:
+            lines.append(f"# HELP {metric_name} {description}")
+            lines.append(f"# TYPE {metric_name} {metric_type}")
+            for name, pool_stats in sorted(stats.items()):
+                if field in pool_stats:
+                    lines.append(f'{metric_name}{{pool="{name}"}} {pool_stats[field]}')
+        return lines
+
+    def _increase(self, name: str, field: str, value):
+        with self._lock:
+            stats = self._stats.setdefault(name, self._empty_stats())
+            stats[field] += value
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return dict(checkouts=0, wait=0.0, wait_max=0.0, pre_ping=0.0, connects=0, invalidations=0)
+
+
+pool_metrics = PoolMetrics()
@@ -0,0 +1,215 @@
+from contextvars import ContextVar
+import logging
+import re
+from threading import Lock
+from time import perf_counter
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_request_stats: ContextVar[Optional[dict]] = ContextVar("query_metrics_request_stats", default=None)
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+SLOWEST_STATEMENT_LENGTH = 200
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _one_line(statement: str) -> str:
+    return re.sub(r"\s+", " ", statement).strip()[:SLOWEST_STATEMENT_LENGTH]
+
+
+class QueryMetrics:
+    """
+    요청별 SQL 실행 횟수/시간 측정
+    before/after_cursor_execute 이벤트로 요청 단위 쿼리 수, 총 DB 시간, 가장 느린 쿼리를 기록하고
+    DEBUG 모드에서는 응답 헤더로, 그 외에는 Prometheus 형식(/metrics)으로 노출한다.
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._lock = Lock()
+        self._apps = set()
+        self._engines = set()
+        self._collectors = []
+        self._route_names = {}
+        self._requests = {}
+        self._routes = {}
+        self._slow_query_ms = None
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        Query metrics 초기화 함수 (SQLAlchemy.init_app에서 호출)
+        :param app: FastAPI 인스턴스
+        :param kwargs:
+        :return:
+        """
+        metrics_path = kwargs.setdefault("QUERY_METRICS_PATH", "/metrics")
+        self._slow_query_ms = kwargs.setdefault("QUERY_METRICS_SLOW_QUERY_MS", None)
+        is_debug = kwargs.setdefault("DEBUG", False)
+
+        # 테스트에서 db.init_app을 다시 호출해도 미들웨어가 중복 등록되지 않도록 함
+        if id(app) in self._apps:
+            return
+        self._apps.add(id(app))
+
+        @app.middleware("http")
+        async def query_metrics_middleware(request: Request, call_next):
+            # catch-all SPA 라우트보다 먼저 처리해야 하므로 라우터 대신 미들웨어에서 응답
+            if metrics_path and request.url.path == metrics_path:
+                return PlainTextResponse(self.render(), media_type="text/plain; version=0.0.4")
+
+            stats = {"count": 0, "total": 0.0, "slowest": 0.0, "slowest_statement": ""}
+            token = _request_stats.set(stats)
+            started_at = perf_counter()
+            try:
+                response = await call_next(request)
+            finally:
+                _request_stats.reset(token)
+
+            # StreamingResponse(CSV 내보내기 등)는 본문 전송 중에도 SQL을 실행하므로 본문을 다 보낸 뒤에 기록
+            response.body_iterator = self._observe_after_body(
+                response.body_iterator, request, response.status_code, started_at, stats
+            )
+            # 헤더는 본문보다 먼저 전송되므로 본문 생성 중 실행된 SQL은 헤더 값에 포함되지 않음
+            if is_debug:
+                response.headers["X-DB-Query-Count"] = str(stats["count"])
+                response.headers["X-DB-Query-Time-Ms"] = f"{stats['total'] * 1000:.2f}"
+                response.headers["X-DB-Slowest-Query-Ms"] = f"{stats['slowest'] * 1000:.2f}"
+                if stats["slowest_statement"]:
+                    response.headers["X-DB-Slowest-Query"] = stats["slowest_statement"].encode(
+                        "latin-1", "replace"
+                    ).decode("latin-1")
+            return response
+
+    async def _observe_after_body(
+        self, body_iterator: AsyncIterator, request: Request, status_code: int, started_at: float, stats: dict
+    ) -> AsyncIterator:
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            self.observe(request.method, self.route_name(request), status_code, perf_counter() - started_at, stats)
+
+    def instrument(self, engine: Engine):
+        """
+        엔진에 cursor 실행 이벤트 등록 (AsyncEngine은 sync_engine을 전달)
+        """
+        if id(engine) in self._engines:
+            return
+        self._engines.add(id(engine))
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started_at", []).append(perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = perf_counter() - conn.info["query_started_at"].pop()
+            if self._slow_query_ms is not None and elapsed * 1000 >= self._slow_query_ms:
+                logging.warning(f"Slow query ({elapsed * 1000:.1f}ms): {_one_line(statement)}")
+
+            stats = _request_stats.get()
+            if stats is None:
+                return
+            stats["count"] += 1
+            stats["total"] += elapsed
+            if elapsed > stats["slowest"]:
+                stats["slowest"] = elapsed
+                stats["slowest_statement"] = _one_line(statement)
+
+    def register_collector(self, collector: Callable[[], list]):
+        """
+        /metrics에 추가로 출력할 지표 함수 등록 (Prometheus 형식 문자열 목록을 반환)
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def route_name(self, request: Request) -> str:
+        """
+        실제 경로 대신 라우트 경로(/api/transaction/{transaction_id})를 라벨로 사용해 라벨 수를 제한
+        """
+        endpoint = request.scope.get("endpoint")
+        if endpoint is None:
+            return "other"
+        route_name = self._route_names.get(endpoint)
+        if route_name is None:
+            route_name = next(
+                (route.path for route in request.app.routes if getattr(route, "endpoint", None) is endpoint), "other"
+            )
+            self._route_names[endpoint] = route_name
+        return route_name
+
+    def observe(self, method: str, route: str, status_code: int, elapsed: float, stats: dict):
+        with self._lock:
+            key = (method, route, str(status_code))
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            route_stats = self._routes.get((method, route))
+            if route_stats is None:
+                route_stats = self._routes[(method, route)] = {
+                    "requests": 0,
+                    "duration": 0.0,
+                    "queries": 0,
+                    "query_duration": 0.0,
+                    "buckets": [0] * len(QUERY_COUNT_BUCKETS),
+                }
+            route_stats["requests"] += 1
+            route_stats["duration"] += elapsed
+            route_stats["queries"] += stats["count"]
+            route_stats["query_duration"] += stats["total"]
+            for index, bucket in enumerate(QUERY_COUNT_BUCKETS):
+                if stats["count"] <= bucket:
+                    route_stats["buckets"][index] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            requests = dict(self._requests)
+            routes = {key: dict(value, buckets=list(value["buckets"])) for key, value in self._routes.items()}
+
+        lines = [
+            "# HELP http_requests_total Total HTTP requests",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(requests.items()):
+            labels = f'method="{method}",route="{_escape_label(route)}",status="{status_code}"'
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        metrics = (
+            ("http_request_duration_seconds_sum", "duration", "Total request time"),
+            ("db_queries_total", "queries", "Total SQL statements executed"),
+            ("db_query_duration_seconds_sum", "query_duration", "Total SQL execution time"),
+        )
+        for name, field, description in metrics:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            for (method, route), route_stats in sorted(routes.items()):
+                lines.append(f'{name}{{method="{method}",route="{_escape_label(route)}"}} {route_stats[field]}')
+
+        lines.append("# HELP db_queries_per_request SQL statements per request")
+        lines.append("# TYPE db_queries_per_request histogram")
+        for (method, route), route_stats in sorted(routes.items()):
+            labels = f'method="{method}",route="{_escape_label(route)}"'
+            for bucket, count in zip(QUERY_COUNT_BUCKETS, route_stats["buckets"]):
+                lines.append(f'db_queries_per_request_bucket{{{labels},le="{bucket}"}} {count}')
+            lines.append(f'db_queries_per_request_bucket{{{labels},le="+Inf"}} {route_stats["requests"]}')
+            lines.append(f"db_queries_per_request_sum{{{labels}}} {route_stats['queries']}")
+            lines.append(f"db_queries_per_request_count{{{labels}}} {route_stats['requests']}")
+
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._routes.clear()
+
+
+query_metrics = QueryMetrics()
@@ -0,0 +1,95 @@
+from os import path, stat
+import re
+from threading import Lock
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response
+
+from app.utils.http_cache import choose_encoding, compress_variants, encoding_etag, is_not_modified, make_etag
+from app.utils.static_files import versioned_url
+
+ASSET_URL_PATTERN = re.compile(rb'((?:src|href)=")(/(?:build|static)/[^"?#]+)(")')
+
+
+class SpaShell:
+    """
+    SPA index.html 메모리 캐시
+    서버 구동 시 한 번 읽어 원본/압축 본문과 ETag를 보관하고, 요청마다 디스크를 읽지 않는다.
+    SPA_SHELL_RELOAD가 켜져 있으면 mtime이 바뀐 경우에만 다시 읽는다.
+    """
+
+    def __init__(self, app: FastAPI = None, **kwargs):
+        self._lock = Lock()
+        self._index_html_path = None
+        self._templates_dir = None
+        self._reload = False
+        self._entry = None
+        if app is not None:
+            self.init_app(app=app, **kwargs)
+
+    def init_app(self, app: FastAPI, **kwargs):
+        """
+        SPA shell 초기화 함수
+        :param app: FastAPI 인스턴스
+        :param kwargs:
+        :return:
+        """
+        base_dir = kwargs.get("BASE_DIR")
+        reload = kwargs.setdefault("SPA_SHELL_RELOAD", False)
+
+        with self._lock:
+            self._templates_dir = path.join(base_dir, "app", "templates")
+            self._index_html_path = path.join(self._templates_dir, "index.html")
+            self._reload = reload
+            self._entry = self._load()
+
+    def response(self, request: Request) -> Response:
+        entry = self._get_entry()
+        encoding = choose_encoding(request.headers.get("accept-encoding"), entry["variants"].keys())
+        # 배포 후 새 번들을 바로 받도록 항상 재검증(no-cache)하고, 변경이 없으면 304로 응답
+        headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding", "ETag": entry["etags"][encoding]}
+
+        # 다른 인코딩의 ETag로 304를 주면 클라이언트가 캐시한 (다른 인코딩의) 본문을 그대로 쓰게 되므로 선택된 인코딩만 비교
+        if is_not_modified(request.headers.get("if-none-match"), [entry["etags"][encoding]]):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is None:
+            return HTMLResponse(content=entry["content"], status_code=200, headers=headers)
+
+        headers["Content-Encoding"] = encoding
+        return HTMLResponse(content=entry["variants"][encoding], status_code=200, headers=headers)
+
+    def _get_entry(self) -> dict:
+        entry = self._entry
+        if entry is not None and (not self._reload or entry["mtime"] == self._get_mtime()):
+            return entry
+
+        with self._lock:
+            if self._entry is None or self._entry["mtime"] != self._get_mtime():
+                self._entry = self._load()
+            return self._entry
+
+    def _get_mtime(self) -> Optional[int]:
+        try:
+            return stat(self._index_html_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self) -> dict:
+        mtime = self._get_mtime()
+        with open(self._index_html_path, "rb") as f:
+            content = f.read()
+
+        # 번들 URL에 내용 해시를 붙여 정적 파일을 immutable로 캐시할 수 있게 함
+        content = ASSET_URL_PATTERN.sub(
+            lambda match: match[1] + versioned_url(self._templates_dir, match[2].decode()).encode() + match[3], content
+        )
+        etag = make_etag(content)
+        variants = compress_variants(content)
+        etags = {encoding: encoding_etag(etag, encoding) for encoding in variants}
+        etags[None] = etag
+        return dict(mtime=mtime, content=content, variants=variants, etags=etags)
+
+
+spa_shell = SpaShell()
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from hashlib import sha256
+from mimetypes import guess_type
+import os
+import re
+import stat
+from threading import Lock
+from typing import Optional
+
+import anyio
+from cachetools import TTLCache
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+
+from app.utils.http_cache import ENCODING_PRIORITY, choose_encoding, encoding_etag, is_not_modified
+
+# bundle.3f9a1c2e.js, chunk-5d41402a.css 처럼 파일명에 내용 해시가 포함된 경우
+FINGERPRINT_PATTERN = re.compile(r"[.-][0-9a-f]{8,}\.[0-9a-z]+$")
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+VERSION_HASH_LENGTH = 12
+
+
+@dataclass(frozen=True)
+class StaticFileInfo:
+    """
+    정적 파일 메타데이터 (stat, 해시, 미리 압축된 파일 정보)
+    """
+
+    full_path: str
+    stat_result: os.stat_result
+    media_type: str
+    etag: str
+    version: str
+    fingerprinted: bool
+    variants: dict
+
+
+def hash_file(full_path: str) -> str:
+    digest = sha256()
+    with open(full_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def versioned_url(directory: str, url: str) -> str:
+    """
+    /build/bundle.js -> /build/bundle.js?v=<내용 해시>
+    파일명에 해시가 없는 번들도 URL이 내용에 따라 바뀌므로 immutable로 캐시할 수 있음
+    """
+    full_path = os.path.join(directory, url.lstrip("/"))
+    try:
+        return f"{url}?v={hash_file(full_path)[:VERSION_HASH_LENGTH]}"
+    except OSError:
+        return url
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    정적 파일 서빙
+    - 빌드 시 생성한 .br/.gz 파일이 있으면 Accept-Encoding에 맞춰 대신 전송
+    - 파일명 또는 ?v= 쿼리에 내용 해시가 있으면 Cache-Control: immutable, 그 외는 no-cache(ETag 재검증)
+    - If-None-Match/If-Modified-Since 조건부 요청에 304 응답
+    - 파일 메타데이터는 TTL 캐시에 보관해 요청마다 stat/해시 계산을 하지 않음
+    """
+
+    def __init__(self, *, cache_ttl: int = 60, cache_size: int = 512, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = Lock()
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        with self._lock:
+            info = self._cache.get(path)
+        if info is None:
+            info = await anyio.to_thread.run_sync(self.get_file_info, path)
+            if info is None:
+                # 디렉토리, 404 등은 기존 StaticFiles 처리를 따름
+                return await super().get_response(path, scope)
+            with self._lock:
+                self._cache[path] = info
+
+        return self.cached_file_response(info, scope)
+
+    def get_file_info(self, path: str) -> Optional[StaticFileInfo]:
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return None
+
+        variants = {}
+        for encoding in ENCODING_PRIORITY:
+            variant_path = full_path + PRECOMPRESSED_SUFFIXES[encoding]
+            try:
+                variant_stat = os.stat(variant_path)
+            except OSError:
+                continue
+            # 원본보다 오래된 압축 파일은 이전 빌드 결과이므로 사용하지 않음
+            if stat.S_ISREG(variant_stat.st_mode) and variant_stat.st_mtime >= stat_result.st_mtime:
+                variants[encoding] = (variant_path, variant_stat)
+
+        content_hash = hash_file(full_path)
+        return StaticFileInfo(
+            full_path=full_path,
+            stat_result=stat_result,
+            media_type=guess_type(full_path)[0] or "text/plain",
+            etag=f'"{content_hash[:32]}"',
+            version=content_hash[:VERSION_HASH_LENGTH],
+            fingerprinted=FINGERPRINT_PATTERN.search(os.path.basename(full_path)) is not None,
+            variants=variants,
+        )
+
+    def cached_file_response(self, info: StaticFileInfo, scope: Scope) -> Response:
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"), info.variants.keys())
+        is_immutable = info.fingerprinted or QueryParams(scope["query_string"]).get("v") == info.version
+
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if is_immutable else REVALIDATE_CACHE_CONTROL,
+            "ETag": encoding_etag(info.etag, encoding),
+            "Last-Modified": formatdate(info.stat_result.st_mtime, usegmt=True),
+        }
+        if info.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if self.is_not_modified_info(info, request_headers, encoding):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is None:
+            full_path, stat_result = info.full_path, info.stat_result
+        else:
+            full_path, stat_result = info.variants[encoding]
+            headers["Content-Encoding"] = encoding
+
+        return FileResponse(
+            full_path,
+            headers=headers,
+            media_type=info.media_type,
+            stat_result=stat_result,
+            method=scope["method"],
+        )
+
+    def is_not_modified_info(self, info: StaticFileInfo, request_headers: Headers, encoding: Optional[str]) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match가 있으면 If-Modified-Since는 무시 (RFC 7232), 선택된 인코딩의 ETag만 비교
+            return is_not_modified(if_none_match, [encoding_etag(info.etag, encoding)])
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= int(info.stat_result.st_mtime)
+        except (TypeError, ValueError):
+            return False
@@ -18,7 +18,6 @@ export SUPERUSER_PW=superuser_password
 export SUPERUSER_NAME=superuser_name
 export SUPERUSER_ROLE=superuser_role
 
-pytest ./app/tests/test_dashboard.py -vv
-pytest ./app/tests/test_transaction.py -vv
-pytest ./app/tests/test_user.py -vv
-pytest ./app/tests/test_user_role.py -vv
+# -n: pytest-xdist 워커 수 (워커마다 MYSQL_DATABASE_gw0, ... 스키마 사용)
+# --dist loadfile: 모듈 데이터(module_data, seed_data)를 워커마다 중복해서 만들지 않도록 파일 단위로 분배
+pytest ./app/tests -vv -n auto --dist loadfile
@@ -18,6 +18,15 @@ until [ -f ./frontend/deploy/public/build/bundle.js ]; do
 done;
 
 sudo cp -r ./frontend/deploy/public/* ./backend/app/templates/
+
+echo [+] Precompressing static files
+for file in $(find ./backend/app/templates -type f \( -name "*.js" -o -name "*.css" -o -name "*.map" -o -name "*.svg" \)); do
+    sudo gzip -9 -k -f "$file"
+    if command -v brotli > /dev/null; then
+        sudo brotli -q 11 -k -f "$file"
+    fi
+done
+
 sudo chown -R $(id -u):$(id -g) ./frontend/deploy/public
 sudo chown -R $(id -u):$(id -g) ./backend/app/templates
 